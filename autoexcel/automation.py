@@ -0,0 +1,153 @@
+import importlib.metadata
+import logging
+import os
+import shutil
+import sys
+from contextlib import contextmanager
+
+from autoexcel import config
+
+logger = logging.getLogger(__name__)
+
+# Bump to regenerate every cached type library wrapper on the next run
+GENCACHE_VERSION = 1
+
+# win32com.client once imported (see get_win32)
+win32_client = None
+
+
+def gencache_dir():
+    """
+    Directory of the wrappers win32com generates from Excel's type library.
+
+    A subdirectory of ``autoexcel_config.automation.gencache_dir`` per
+    ``GENCACHE_VERSION``, Python and pywin32 version, so an upgrade starts
+    from an empty cache instead of loading wrappers generated by another
+    version.
+    """
+    settings = None
+    if config.autoexcel_config is not None:
+        settings = config.autoexcel_config.automation
+    base_dir = None if settings is None else settings.gencache_dir
+    if not base_dir:
+        base_dir = os.path.join(config.data_dir, "cache", "gen_py")
+    try:
+        pywin32_version = importlib.metadata.version("pywin32")
+    except importlib.metadata.PackageNotFoundError:
+        pywin32_version = "unknown"
+    python_version = f"{sys.version_info.major}.{sys.version_info.minor}"
+    return os.path.join(
+        base_dir, f"v{GENCACHE_VERSION}-py{python_version}-pywin32-{pywin32_version}"
+    )
+
+
+def get_win32():
+    """
+    ``win32com.client``, imported on the first COM operation.
+
+    The generated wrappers are kept in ``gencache_dir`` across runs, so only
+    the first run after an install or upgrade pays for generating them.
+
+    Raises:
+        ImportError: When pywin32 is not installed.
+    """
+    global win32_client
+    if win32_client is not None:
+        return win32_client
+
+    try:
+        import win32com
+    except ImportError as e:
+        raise ImportError(
+            "Excel automation needs pywin32 and Excel (Windows only); "
+            "use headless=True to build the workbook with openpyxl"
+        ) from e
+
+    if "win32com.client" in sys.modules:
+        # gencache has loaded its index already; keep the directory it uses
+        logger.debug(f"win32com already imported, gencache at {win32com.__gen_path__}")
+    else:
+        path = gencache_dir()
+        os.makedirs(path, exist_ok=True)
+        win32com.__gen_path__ = path
+        gen_py = sys.modules.get("win32com.gen_py")
+        if gen_py is not None:
+            gen_py.__path__ = [path]
+        logger.debug(f"win32com gencache at {path}")
+
+    import win32com.client
+
+    win32_client = win32com.client
+    return win32_client
+
+
+class Constants:
+    """``win32com.client.constants``, importing win32com on the first lookup."""
+
+    def __getattr__(self, name):
+        return getattr(get_win32().constants, name)
+
+
+constants = Constants()
+
+
+def clear_gencache():
+    """Remove the generated wrappers, and their modules, from the gencache."""
+    win32 = get_win32()
+    import win32com
+
+    for name in [name for name in sys.modules if name.startswith("win32com.gen_py.")]:
+        del sys.modules[name]
+    path = win32com.__gen_path__
+    for entry in os.scandir(path):
+        if entry.is_dir():
+            shutil.rmtree(entry.path)
+        else:
+            os.remove(entry.path)
+    win32.gencache.Rebuild()
+
+
+def excel_application(early_bound=True, new_instance=False):
+    """
+    An Excel application.
+
+    Early bound (``gencache.EnsureDispatch``), Excel's constants are available
+    through ``constants``. A cache left by an interrupted run or a different
+    Excel fails to load; it is cleared and the wrappers generated again.
+
+    Args:
+        early_bound (bool): Use the generated wrappers rather than late binding.
+        new_instance (bool): Start a separate Excel process (``DispatchEx``)
+            rather than connecting to a running one, as pooled workers do.
+    """
+    win32 = get_win32()
+    excel = "Excel.Application"
+    if new_instance:
+        # The ProgID connects to a running Excel; DispatchEx always starts one
+        excel = win32.DispatchEx(excel)._oleobj_
+    if not early_bound:
+        return win32.Dispatch(excel)
+    try:
+        return win32.gencache.EnsureDispatch(excel)
+    except AttributeError as e:
+        logger.warning(f"Regenerating the Excel type library cache ({e})")
+        clear_gencache()
+        return win32.gencache.EnsureDispatch(excel)
+
+
+@contextmanager
+def com_apartment():
+    """
+    COM initialized on the calling thread for the block.
+
+    The main thread is initialized when pythoncom is imported; worker threads
+    that drive Excel need this around their COM calls.
+    """
+    get_win32()
+    import pythoncom
+
+    pythoncom.CoInitialize()
+    try:
+        yield
+    finally:
+        pythoncom.CoUninitialize()
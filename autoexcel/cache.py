@@ -0,0 +1,178 @@
+import hashlib
+import json
+import logging
+import os
+import uuid
+
+import pandas as pd
+
+from autoexcel import config
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of cached frames changes so stale entries are ignored
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 2 * 1024**3
+FILE_FORMATS = {"feather": ".feather", "parquet": ".parquet"}
+
+
+class IngestCache:
+    """
+    Content-addressed cache of parsed raw Excel files.
+
+    Entries are keyed by the SHA-256 of the file content plus the reader
+    options, stored as Feather or Parquet files in ``cache_dir`` and evicted
+    least-recently-used first once the directory grows past ``max_bytes``.
+
+    Args:
+        cache_dir (str): Directory holding the cached frames.
+        max_bytes (int): Size bound of the cache directory.
+        file_format (str): ``"feather"`` or ``"parquet"``.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, file_format="feather"):
+        if file_format not in FILE_FORMATS:
+            raise ValueError(
+                f"Unknown cache format {file_format!r}, expected one of {list(FILE_FORMATS)}"
+            )
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.file_format = file_format
+        self.extension = FILE_FORMATS[file_format]
+
+    def key(self, path, **options):
+        """Cache key for the content of ``path`` read with ``options``."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        digest.update(
+            json.dumps(
+                {"version": CACHE_VERSION, "options": options},
+                sort_keys=True,
+                default=str,
+            ).encode()
+        )
+        return digest.hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key + self.extension)
+
+    def get(self, key):
+        """Cached frame for ``key``, or None on a miss."""
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            if self.file_format == "feather":
+                df = pd.read_feather(path)
+            else:
+                df = pd.read_parquet(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            self.remove(path)
+            return None
+
+        # Mark as recently used for eviction
+        os.utime(path)
+        logger.debug(f"Ingest cache hit: {path}")
+        return df
+
+    def put(self, key, df):
+        """
+        Store ``df`` under ``key`` and evict old entries.
+
+        Frames Arrow cannot represent (e.g. mixed-type object columns) are not
+        cached; a warning is logged and the run carries on uncached.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(key)
+        # Write to a temporary file first so readers never see a partial entry
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            if self.file_format == "feather":
+                df.reset_index(drop=True).to_feather(tmp_path)
+            else:
+                df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except (ValueError, TypeError, NotImplementedError) as e:
+            logger.warning(f"Could not cache frame for key {key}: {e}")
+            self.remove(tmp_path)
+            return None
+
+        logger.debug(f"Ingest cache store: {path}")
+        self.evict()
+        return path
+
+    def entries(self):
+        """Cache entries as ``(path, size, last_used)``, least recently used first."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(self.extension):
+                stat = entry.stat()
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda x: x[2])
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits ``max_bytes``."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            logger.debug(f"Evicting ingest cache entry: {path}")
+            self.remove(path)
+            total -= size
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            self.remove(path)
+
+    @staticmethod
+    def remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def get_ingest_cache():
+    """
+    Ingest cache described by ``autoexcel_config.ingest_cache``.
+
+    The cached frames are copies of the raw exports, so the cache is off by
+    default and only runs in a ``cache_dir`` the user set, as an absolute
+    path (not one that follows the working directory).
+
+    Returns:
+        IngestCache or None: None when the cache is disabled or pyarrow, which
+        Feather and Parquet need, is not installed.
+
+    Raises:
+        ValueError: The cache is enabled without an absolute ``cache_dir``.
+    """
+    settings = None
+    if config.autoexcel_config is not None:
+        settings = config.autoexcel_config.ingest_cache
+    if settings is None or not settings.enabled:
+        return None
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        logger.debug("pyarrow is not installed; ingest cache disabled.")
+        return None
+
+    cache_dir = os.path.expanduser(settings.cache_dir or "")
+    if not os.path.isabs(cache_dir):
+        raise ValueError(
+            "The ingest cache needs an absolute autoexcel_config.ingest_cache.cache_dir, "
+            f"got {settings.cache_dir!r}"
+        )
+    return IngestCache(
+        cache_dir,
+        max_bytes=settings.max_bytes or DEFAULT_MAX_BYTES,
+        file_format=settings.format or "feather",
+    )
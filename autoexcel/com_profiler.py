@@ -0,0 +1,246 @@
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from autoexcel import config
+
+logger = logging.getLogger(__name__)
+# Profiles go to the timing logger of the logging config
+timing_logger = logging.getLogger("timing")
+
+# Values returned as they are rather than wrapped: what COM hands back that is
+# not an object (pywintypes.datetime is a datetime)
+PLAIN_TYPES = (
+    str, bytes, int, float, complex, bool, type(None), tuple, list, dict, date, datetime
+)
+
+
+class ComProfiler:
+    """
+    Records the COM calls made through the objects it wraps.
+
+    Every property get and set and every method call on a wrapped object
+    (see ``ComProxy``) is timed and counted under its call path, the members
+    it went through, e.g. ``CreatePivotTable().PivotFields().PivotItems().Visible``
+    (calls end with ``()``, their arguments are left out). Objects returned
+    by a call are wrapped in turn, with the path extended.
+
+    Args:
+        depth (int): Trailing members of a path recorded (None for all); the
+            objects a path starts from are many calls away from the
+            application.
+        trace (bool): Keep every call as a trace event (see ``write_trace``).
+    """
+
+    def __init__(self, depth=4, trace=True):
+        self.depth = depth
+        self.trace = trace
+        self.calls = {}
+        self.events = []
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+
+    def wrap(self, obj, name="Application"):
+        """``obj`` behind a recording proxy, its paths starting at ``name``."""
+        return ComProxy(obj, (name,), self)
+
+    def record(self, path, kind, start, end):
+        if self.depth is not None:
+            path = path[-self.depth :]
+        key = ".".join(path)
+        entry = self.calls.get(key)
+        if entry is None:
+            entry = self.calls[key] = [kind, 0, 0.0]
+        entry[1] += 1
+        entry[2] += end - start
+        if self.trace:
+            self.events.append((key, kind, start, end, threading.get_ident()))
+
+    @contextmanager
+    def span(self, name):
+        """Trace event spanning the block, e.g. one table, around the calls it makes."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.trace:
+                end = time.perf_counter()
+                self.events.append((name, "span", start, end, threading.get_ident()))
+
+    @property
+    def total_calls(self):
+        return sum(count for _, count, _ in self.calls.values())
+
+    @property
+    def total_seconds(self):
+        return sum(seconds for _, _, seconds in self.calls.values())
+
+    def hot_spots(self, top=20):
+        """
+        The ``top`` call paths by total time.
+
+        Returns:
+            list: ``(path, kind, count, total seconds)``, slowest first.
+        """
+        rows = [(path, *entry) for path, entry in self.calls.items()]
+        return sorted(rows, key=lambda row: row[3], reverse=True)[:top]
+
+    def report(self, top=20):
+        """Hot-spot report: the ``top`` call paths by total time, as text."""
+        total_seconds = self.total_seconds or 1
+        lines = [
+            f"COM calls: {self.total_calls:,} in {self.total_seconds:.3f} s",
+            f"{'total s':>10} {'share':>6} {'calls':>9} {'mean ms':>9}  kind  path",
+        ]
+        for path, kind, count, seconds in self.hot_spots(top):
+            lines.append(
+                f"{seconds:10.3f} {seconds / total_seconds:6.1%} {count:9,} "
+                f"{seconds / count * 1000:9.3f}  {kind:<4}  {path}"
+            )
+        return "\n".join(lines)
+
+    def write_trace(self, path):
+        """
+        Write the calls as a JSON trace.
+
+        The Trace Event Format of Chrome's about:tracing and Perfetto: one
+        complete event (``"ph": "X"``) per call and span, in microseconds.
+        """
+        events = [
+            {
+                "name": name,
+                "cat": kind,
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": self.pid,
+                "tid": tid,
+            }
+            for name, kind, start, end, tid in self.events
+        ]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
+
+
+class ComProxy:
+    """
+    Transparent stand-in for a COM object that records its calls in a ``ComProfiler``.
+
+    Attribute gets and sets, calls and iteration go to the wrapped object;
+    proxies passed as arguments are unwrapped first.
+    """
+
+    __slots__ = ("_target", "_path", "_profiler")
+
+    def __init__(self, target, path, profiler):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_path", path)
+        object.__setattr__(self, "_profiler", profiler)
+
+    def __getattr__(self, name):
+        profiler = self._profiler
+        start = time.perf_counter()
+        value = getattr(self._target, name)
+        end = time.perf_counter()
+        path = self._path + (name,)
+        if inspect.ismethod(value) or inspect.isbuiltin(value):
+            # Reaching a method is not a call to Excel; calling it is
+            return ComProxy(value, path, profiler)
+        profiler.record(path, "get", start, end)
+        return wrap_result(value, path, profiler)
+
+    def __setattr__(self, name, value):
+        start = time.perf_counter()
+        setattr(self._target, name, unwrap(value))
+        self._profiler.record(self._path + (name,), "set", start, time.perf_counter())
+
+    def __call__(self, *args, **kwargs):
+        args = [unwrap(arg) for arg in args]
+        kwargs = {name: unwrap(value) for name, value in kwargs.items()}
+        start = time.perf_counter()
+        value = self._target(*args, **kwargs)
+        end = time.perf_counter()
+        path = self._path[:-1] + (self._path[-1] + "()",)
+        self._profiler.record(path, "call", start, end)
+        return wrap_result(value, path, self._profiler)
+
+    def __iter__(self):
+        path = self._path[:-1] + (self._path[-1] + "[]",)
+        iterator = iter(self._target)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self._profiler.record(path, "call", start, time.perf_counter())
+            yield wrap_result(item, path, self._profiler)
+
+    def __len__(self):
+        return len(self._target)
+
+    def __bool__(self):
+        return bool(self._target)
+
+    def __repr__(self):
+        return f"<ComProxy {'.'.join(self._path)}: {self._target!r}>"
+
+
+def wrap_result(value, path, profiler):
+    if isinstance(value, PLAIN_TYPES):
+        return value
+    return ComProxy(value, path, profiler)
+
+
+def unwrap(value):
+    return value._target if isinstance(value, ComProxy) else value
+
+
+def get_profiler_settings():
+    """
+    COM profiler settings from ``autoexcel_config.automation.profiler``.
+
+    Returns:
+        ConfigDict or None: None when profiling is off.
+    """
+    settings = None
+    if config.autoexcel_config is not None and config.autoexcel_config.automation is not None:
+        settings = config.autoexcel_config.automation.profiler
+    if settings is None or not settings.enabled:
+        return None
+    return settings
+
+
+def profiled_job(job):
+    """
+    ``job(excel)`` run against a profiled ``excel``, with profiling on.
+
+    Once the job ends, the hot-spot report of its calls is logged and, with
+    a ``trace_dir``, their trace is written there. With profiling off (see
+    ``get_profiler_settings``) ``job`` is returned as it is.
+    """
+    settings = get_profiler_settings()
+    if settings is None:
+        return job
+    profiler = ComProfiler(depth=settings.depth or None, trace=bool(settings.trace_dir))
+    name = getattr(job, "__name__", "job")
+
+    def profiled(excel):
+        try:
+            with profiler.span(name):
+                return job(profiler.wrap(excel))
+        finally:
+            timing_logger.info(f"COM profile of {name}:\n{profiler.report(settings.top or 20)}")
+            if profiler.trace:
+                stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+                path = os.path.join(settings.trace_dir, f"{name}-{stamp}.json")
+                timing_logger.info(f"COM trace of {name}: {profiler.write_trace(path)}")
+
+    return profiled
@@ -0,0 +1,228 @@
+import atexit
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+
+from autoexcel import config
+from autoexcel.automation import com_apartment, excel_application
+from autoexcel.com_profiler import profiled_job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_JOBS = 20
+
+# Pool of autoexcel_config.automation.pool, started on first use (see get_excel_pool)
+excel_pool = None
+excel_pool_lock = threading.Lock()
+
+
+def start_excel():
+    """A separate, early-bound Excel instance for a pool worker."""
+    return excel_application(new_instance=True)
+
+
+class ExcelPool:
+    """
+    Long-lived Excel instances that run jobs from a local queue.
+
+    Each worker thread owns one instance, started as soon as the worker is
+    (and again right after it is recycled), so jobs do not wait for Excel to
+    start. A job is a callable taking the application; it opens, saves and
+    closes its own workbooks. Workbooks a job leaves open are closed without
+    saving before the next job. An instance is quit and replaced after
+    ``max_jobs`` jobs, or once it stops responding (Excel crashed or was
+    closed).
+
+    Args:
+        size (int): Workers, i.e. Excel instances running jobs in parallel.
+        max_jobs (int): Jobs an instance runs before it is replaced.
+        start (callable): Starts an application (default ``start_excel``).
+        apartment (callable): Context manager a worker runs in (default
+            ``com_apartment``, which initializes COM on the worker thread).
+    """
+
+    def __init__(self, size=1, max_jobs=DEFAULT_MAX_JOBS, start=start_excel, apartment=None):
+        if size < 1:
+            raise ValueError(f"Excel pool size must be at least 1, got {size}")
+        self.size = size
+        self.max_jobs = max_jobs
+        self.start = start
+        self.apartment = apartment or com_apartment
+        self.jobs = queue.Queue()
+        self.started = 0
+        self.recycled = 0
+        self.closed = False
+        self.lock = threading.Lock()
+        self.workers = [
+            threading.Thread(target=self.work, name=f"excel-worker-{i}", daemon=True)
+            for i in range(size)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, job):
+        """
+        Queue ``job(excel)``.
+
+        Returns:
+            concurrent.futures.Future: The job's result or exception.
+        """
+        if self.closed:
+            raise RuntimeError("Excel pool is closed")
+        future = Future()
+        self.jobs.put((future, job))
+        return future
+
+    def run(self, job):
+        """Run ``job(excel)`` on a pooled instance and return its result."""
+        return self.submit(job).result()
+
+    def close(self):
+        """Finish the queued jobs, then quit the instances."""
+        if self.closed:
+            return
+        self.closed = True
+        for _ in self.workers:
+            self.jobs.put(None)
+        for worker in self.workers:
+            worker.join()
+
+    def start_instance(self):
+        try:
+            excel = self.start()
+        except Exception as e:
+            logger.error(f"Could not start Excel: {e}")
+            return None
+        with self.lock:
+            self.started += 1
+        logger.debug(f"{threading.current_thread().name}: Excel started")
+        return excel
+
+    def stop_instance(self, excel):
+        try:
+            excel.Quit()
+        except Exception as e:
+            logger.debug(f"{threading.current_thread().name}: Excel did not quit: {e}")
+
+    def reset(self, excel):
+        """
+        Close the workbooks a job left open, without saving.
+
+        Returns:
+            bool: False when the instance no longer responds.
+        """
+        try:
+            workbooks = excel.Workbooks
+            while workbooks.Count:
+                logger.warning("Closing a workbook left open by a job, without saving")
+                workbooks(1).Close(SaveChanges=False)
+        except Exception as e:
+            logger.warning(f"{threading.current_thread().name}: Excel not responding: {e}")
+            return False
+        return True
+
+    def work(self):
+        """Worker loop: run queued jobs on this worker's instance until ``close``."""
+        try:
+            with self.apartment():
+                self.run_jobs()
+        except Exception as e:
+            logger.error(f"{threading.current_thread().name} failed: {e}")
+            # Fail the jobs this worker takes instead of leaving them waiting
+            while True:
+                item = self.jobs.get()
+                if item is None:
+                    break
+                future, _ = item
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(e)
+
+    def run_jobs(self):
+        excel = self.start_instance()
+        jobs_run = 0
+        while True:
+            item = self.jobs.get()
+            if item is None:
+                break
+            future, job = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            if excel is None:
+                excel = self.start_instance()
+                jobs_run = 0
+                if excel is None:
+                    future.set_exception(RuntimeError("Could not start Excel"))
+                    continue
+
+            try:
+                result = job(excel)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            jobs_run += 1
+
+            if not self.reset(excel) or jobs_run >= self.max_jobs:
+                logger.debug(
+                    f"{threading.current_thread().name}: recycling Excel after "
+                    f"{jobs_run} jobs"
+                )
+                self.stop_instance(excel)
+                with self.lock:
+                    self.recycled += 1
+                excel = None if self.closed else self.start_instance()
+                jobs_run = 0
+
+        if excel is not None:
+            self.stop_instance(excel)
+
+
+def get_excel_pool():
+    """
+    Excel pool described by ``autoexcel_config.automation.pool``, started on first use.
+
+    Returns:
+        ExcelPool or None: None when the pool is disabled (``size`` 0).
+    """
+    global excel_pool
+    settings = None
+    if config.autoexcel_config is not None and config.autoexcel_config.automation is not None:
+        settings = config.autoexcel_config.automation.pool
+    if settings is None or not settings.size:
+        return None
+
+    with excel_pool_lock:
+        if excel_pool is None or excel_pool.closed:
+            excel_pool = ExcelPool(
+                size=settings.size, max_jobs=settings.max_jobs or DEFAULT_MAX_JOBS
+            )
+            atexit.register(excel_pool.close)
+    return excel_pool
+
+
+def run_excel_job(job, early_bound=True):
+    """
+    Run ``job(excel)`` on an Excel application and return its result.
+
+    With the pool enabled the job runs on a warm pooled (early-bound)
+    instance. Otherwise Excel is started for the job and quit afterwards.
+    With ``autoexcel_config.automation.profiler`` enabled its COM calls are
+    profiled (see ``autoexcel.com_profiler``).
+    """
+    job = profiled_job(job)
+    pool = get_excel_pool()
+    if pool is not None:
+        return pool.run(job)
+
+    excel = excel_application(early_bound=early_bound)
+    try:
+        return job(excel)
+    finally:
+        excel.Quit()
@@ -2,40 +2,111 @@ import argparse
 import logging
 import os
 import re
-import shutil
 import time
 import traceback
+from contextlib import contextmanager
 from datetime import datetime
 from typing import List
 
 import numpy as np
 import pandas as pd
-import win32com
-from openpyxl.styles import Font, PatternFill
+from openpyxl import Workbook, load_workbook
 from openpyxl.utils import get_column_letter
-
-if os.path.exists(win32com.__gen_path__):
-    shutil.rmtree(win32com.__gen_path__)
-
-import win32com.client as win32
-
-win32c = win32.constants
+from openpyxl.worksheet.worksheet import Worksheet
 
 from autoexcel import config
+from autoexcel.automation import constants as win32c
+from autoexcel.cache import get_ingest_cache
+from autoexcel.excel_pool import run_excel_job
+from autoexcel.pivot import autofit_columns, item_filters, present_items, source_frame
+from autoexcel.pivot import pivot_table as static_pivot_table
+from autoexcel.pipeline import derived_columns, plan_outputs
+from autoexcel.readers import read_excel, resolve_engine
+from autoexcel.reports import get_report_spec, plan_report
+from autoexcel.schema import apply_schema, get_sharepoint_schema, log_memory_report
+from autoexcel.stats import STATISTICS, group_statistics, statistics_rows, write_statistics
+from autoexcel.timing import timed_run, timed_stage
+from autoexcel.utils.dataframe_utils import categorize_delinquency
+from autoexcel.utils.date_utils import get_business_calendar, networkdays_columns
+from autoexcel.writers import (
+    HEADER_STYLE,
+    column_styles,
+    compact_workbook,
+    format_sheet,
+    get_output_settings,
+    register_named_styles,
+    write_workbook_streaming,
+)
 
 logger = logging.getLogger(__name__)
 
-
+# Raw export columns read by preprocess_data
+PIPELINE_COLUMNS = [
+    "#",
+    "Negotiator",
+    "Status",
+    "Agreement Type",
+    "High Priority",
+    "Date Assigned",
+    "Deadline Date",
+    "Date Received at OSP",
+    "Date Received at WVU",
+    "FE Date",
+]
+
+# Date columns the data sheets hold as mm/dd/yyyy text rather than dates;
+# Date Assigned and FE Date are written as dates (see format_text_dates)
+TEXT_DATE_COLUMNS = [
+    "Deadline Date",
+    "Date Received at OSP",
+    "Date Received at WVU",
+    "Today's Date",
+]
+
+# XlCalculation value of manual recalculation. win32com only exposes it as a
+# constant once Excel's type library is generated (gencache.EnsureDispatch).
+XL_CALCULATION_MANUAL = -4135
+
+# Excel PivotCaches by (workbook, source sheet, source range), with the workbook
+# and the fields grouped on each cache (see get_excel_pivot_cache)
+excel_pivot_caches = {}
+
+
+@timed_run
 def fy_analysis(
     raw_dir,
     processed_dir,
     assigned_date_filter=[datetime(2023, 7, 1), None],
     old_negotiators=None,
+    low_memory=False,
+    headless=False,
+    outputs=None,
 ):
     """
     Process FY analysis using the most recent raw data file and template file.
+
+    With ``low_memory`` the data sheets are streamed to the workbook instead
+    of built in memory (see ``write_output``).
+    With ``headless`` the analytics sheets are built with openpyxl as static
+    tables (see ``autoexcel.pivot``) instead of PivotTables through Excel. The
+    time statistics sheet (standard deviations, medians and percentiles the
+    pivots lack) is computed from the processed data (see ``autoexcel.stats``)
+    when requested in ``outputs``.
+
+    ``outputs`` names the sheets to produce, e.g. ``["Caseload Analysis"]``
+    (see ``autoexcel.pipeline.resolve_outputs``); by default the data sheets
+    and the analytics and caseload sheets. Only the raw columns, preprocessing stages and data sheets
+    they need are read, computed and written (see
+    ``autoexcel.pipeline.plan_outputs``): data sheets that only feed pivot
+    tables hold just the columns those read, and headless static tables are
+    computed from memory without them.
     """
     os.makedirs(processed_dir, exist_ok=True)
+    plan = plan_outputs(
+        outputs,
+        sheet_names={"fy": get_fy_sheet_name(), "active": "Active Assignments"},
+        pivot_sheets=not headless,
+    )
 
     # Find most recent raw data and processed files
     raw_xlsx = get_latest_file(
@@ -68,26 +139,75 @@ def fy_analysis(
         raise FileNotFoundError("Could not find required input files")
 
     # Read the data from the Excel file
-    df = read_data(raw_xlsx)
+    df = read_data(raw_xlsx, usecols=plan["usecols"])
 
     # Process the data
-    df_processed, df_active_assignments = preprocess_data(df, assigned_date_filter)
+    df_processed, df_active_assignments = preprocess_data(
+        df, assigned_date_filter, columns=plan["derived"]
+    )
+    del df
+
+    # Years of the grouped date fields, from memory rather than the sheet
+    years = get_frame_years(df_processed, ["FE Date", "Date Assigned"])
+
+    # Only old negotiators the data has are hidden, item by item, in the pivot tables
+    if old_negotiators:
+        old_negotiators = present_items(df_processed["Negotiator"], old_negotiators)
+        logger.debug(f"Old negotiators in the data: {old_negotiators}")
 
     # Write the processed data to Excel
-    write_output(df_processed, df_active_assignments, output_filename)
+    if plan["sheets"]:
+        write_output(
+            df_processed,
+            df_active_assignments,
+            output_filename,
+            streaming=low_memory,
+            sheets=plan["sheets"],
+        )
 
-    excel = win32.gencache.EnsureDispatch("Excel.Application")
-    excel.Visible = True  # False
+    # Statistics tables, and tables without a data sheet, read the processed data in memory
+    frames = {"fy": df_processed}
+    if "active" in plan["frames"]:
+        frames["active"] = df_active_assignments
+
+    def create_reports(wb):
+        for name in plan["reports"]:
+            if name == "fy_analytics":
+                logger.info(f"Unselecting old negotiators: {old_negotiators}")
+            create_report_ws(
+                wb,
+                name,
+                old_negotiators=old_negotiators,
+                years=years,
+                date=formatted_date,
+                frames=frames,
+            )
 
-    wb = excel.Workbooks.Open(os.path.abspath(output_filename))
-    create_fy_analytics_ws(wb, old_negotiators=old_negotiators)
-    create_caseload_analysis_ws(
-        wb, date=formatted_date, old_negotiators=old_negotiators
-    )
+    if plan["reports"] and (headless or not plan["sheets"]):
+        # Excel is only needed for PivotTables, which are built over a data sheet
+        if plan["sheets"]:
+            wb = load_workbook(output_filename)
+        else:
+            wb = Workbook()
+            wb.remove(wb.active)
+        create_reports(wb)
+        wb.save(output_filename)
+    elif plan["reports"]:
+
+        def build_reports(excel):
+            excel.Visible = True  # False
+
+            wb = excel.Workbooks.Open(os.path.abspath(output_filename))
+            try:
+                with excel_session(excel):
+                    create_reports(wb)
+                wb.Save()
+            finally:
+                release_excel_pivot_caches(wb)
+            wb.Close()
 
-    wb.Save()
-    wb.Close()
-    excel.Quit()
+        # On a warm pooled Excel when autoexcel_config.automation.pool is enabled
+        run_excel_job(build_reports)
 
     logger.info(
         f"Process completed. The processed data has been saved to {output_filename}"
@@ -129,11 +249,13 @@ def get_latest_file(directory, pattern):
     return latest_file
 
 
+@timed_run
 def fy_analysis_from_template(
     raw_xlsx,
     template_xlsx,
     processed_dir="fy_analysis_processed",
     assigned_date_filter=[datetime(2023, 7, 1), None],
+    low_memory=False,
 ):
     os.makedirs(processed_dir, exist_ok=True)
 
@@ -142,13 +264,16 @@ def fy_analysis_from_template(
 
     # Process the data
     df_processed, df_active_assignments = preprocess_data(df, assigned_date_filter)
+    del df
 
     # Output filename
     raw_date = os.path.basename(raw_xlsx).split(".")[0].split()[-1]
     output_filename = os.path.join(processed_dir, f"Data Analysis {raw_date}.xlsx")
 
     # Write the processed data to Excel
-    write_output(df_processed, df_active_assignments, output_filename)
+    write_output(
+        df_processed, df_active_assignments, output_filename, streaming=low_memory
+    )
 
     # Copy worksheets
 
@@ -167,14 +292,82 @@ def fy_analysis_from_template(
     )
 
 
-def read_data(raw_xlsx):
-    """Reads data from the raw Excel file."""
-    df = pd.read_excel(raw_xlsx)
+@timed_stage
+def read_data(raw_xlsx, engine=None, usecols=None, dtype=None, use_cache=True):
+    """
+    Reads data from the raw Excel file and applies the SharePoint schema.
+
+    With the ingest cache enabled (see ``autoexcel.cache``), parsed frames are
+    kept so rereading an unchanged file skips the Excel parse.
+
+    Args:
+        raw_xlsx (str): Path to the raw Excel file.
+        engine (str, optional): Reader engine (see ``autoexcel.readers``).
+            Defaults to ``autoexcel_config.reader.engine``.
+        usecols (list, optional): Columns to read. Defaults to
+            ``PIPELINE_COLUMNS`` when ``autoexcel_config.reader.prune_columns``
+            is set, otherwise every column.
+        dtype (dict, optional): Per-column dtype hints for the reader.
+        use_cache (bool): Read from and store into the ingest cache when it is
+            enabled in the configuration.
+
+    Returns:
+        pd.DataFrame: The schema-cast data.
+    """
+    reader_settings = None
+    if config.autoexcel_config is not None:
+        reader_settings = config.autoexcel_config.reader
+    if engine is None and reader_settings is not None:
+        engine = reader_settings.engine
+    engine = resolve_engine(engine)
+    if usecols is None and reader_settings is not None and reader_settings.prune_columns:
+        usecols = PIPELINE_COLUMNS
+
+    cache = get_ingest_cache() if use_cache else None
+    if cache is not None:
+        schema_columns, max_category_ratio = get_sharepoint_schema()
+        cache_key = cache.key(
+            raw_xlsx,
+            engine=engine,
+            usecols=usecols,
+            dtype=dtype,
+            schema=schema_columns,
+            max_category_ratio=max_category_ratio,
+        )
+        df = cache.get(cache_key)
+        if df is not None:
+            logger.info(f"Loaded {raw_xlsx} from the ingest cache")
+            return df
+
+    df = read_excel(raw_xlsx, engine=engine, usecols=usecols, dtype=dtype)
+    if logger.isEnabledFor(logging.DEBUG):
+        df, memory_report = apply_schema(df, report=True)
+        log_memory_report(memory_report)
+    else:
+        df = apply_schema(df)
+
+    if cache is not None:
+        cache.put(cache_key, df)
     return df
 
 
-def preprocess_data(df, assigned_date_filter):
-    """Processes the DataFrame according to specified steps."""
+@timed_stage
+def preprocess_data(df, assigned_date_filter, columns=None):
+    """
+    Processes the DataFrame according to specified steps.
+
+    Args:
+        df (pd.DataFrame): Raw SharePoint data from ``read_data``.
+        assigned_date_filter (list): ``[start, end]`` bounds on "Date Assigned";
+            ``end`` may be None.
+        columns (list, optional): Derived columns to add (see
+            ``autoexcel.pipeline.DERIVED_COLUMNS``), with those they are
+            computed from; the other stages are skipped. Defaults to all.
+
+    Returns:
+        tuple: ``(df_processed, df_active_assignments)``, date columns as
+        datetime64 at midnight.
+    """
     logger.info("Preprocessing data.")
     df = df.copy()
 
@@ -184,6 +377,7 @@ def preprocess_data(df, assigned_date_filter):
         df.insert(0, "#", [1] * len(df))
 
     # Add new columns
+    derived = derived_columns(columns)
     new_columns = [
         "Time to Assignment",
         "Time to Execution",
@@ -192,86 +386,84 @@ def preprocess_data(df, assigned_date_filter):
         "Delinquency",
     ]
     for col in new_columns:
-        df[col] = None
+        if col in derived:
+            df[col] = None
 
     # Ensure date columns are in datetime format
     date_cols = ["Date Assigned", "Date Received at OSP", "FE Date"]
     for col in date_cols:
-        df[col] = pd.to_datetime(df[col])
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col])
 
-    # Filter data based on assigned date
-    df = filter_assigned_date(
+    # Filter data based on assigned date and exclude certain 'Negotiator' values
+    # in a single selection
+    keep = assigned_date_mask(
         df,
         start_fiscal_year=assigned_date_filter[0],
         end_fiscal_year=assigned_date_filter[1],
     )
+    keep &= ~df["Negotiator"].isin(["COE", "NCE", "OGC"])
+    df = df[keep]
+
+    # Calculate time metrics. Missing dates propagate as <NA>.
+    calendar = get_business_calendar()
+    if "Time to Assignment" in derived:
+        df["Time to Assignment"] = networkdays_columns(
+            df["Date Received at OSP"], df["Date Assigned"], calendar=calendar
+        )
+    if "Time to Execution" in derived:
+        df["Time to Execution"] = networkdays_columns(
+            df["Date Assigned"], df["FE Date"], calendar=calendar
+        )
+    if "Today's Date" in derived:
+        df["Today's Date"] = pd.to_datetime("today").normalize()
+    if "Time Since Assignment" in derived:
+        df["Time Since Assignment"] = networkdays_columns(
+            df["Date Assigned"],
+            df["Today's Date"],
+            mask=~df["Status"].isin(["Completed", "Duplicate", "Withdrawn"]),
+            calendar=calendar,
+        )
 
-    # Exclude certain 'Negotiator' values
-    df = df[~df["Negotiator"].isin(["COE", "NCE", "OGC"])]
-
-    # Calculate time metrics
-    df["Time to Assignment"] = df.apply(
-        lambda row: networkdays(row["Date Received at OSP"], row["Date Assigned"]),
-        axis=1,
-    )
-    df["Time to Execution"] = df.apply(
-        lambda row: (
-            networkdays(row["Date Assigned"], row["FE Date"])
-            if pd.notna(row["FE Date"])
-            else None
-        ),
-        axis=1,
-    )
-    df["Today's Date"] = pd.to_datetime("today").normalize()
-    df["Time Since Assignment"] = df.apply(
-        lambda row: (
-            networkdays(row["Date Assigned"], row["Today's Date"])
-            if not row["Status"] in ["Completed", "Duplicate", "Withdrawn"]
-            else None
-        ),
-        axis=1,
-    )
-
-    # Format date columns
-    date_cols_formatted = [
+    # Dates stay datetime64, cut to the day; write_output formats them
+    date_cols_normalized = [
         "Date Assigned",
         "Deadline Date",
         "Date Received at OSP",
         "Date Received at WVU",
         "FE Date",
-        "Today's Date",
     ]
-    for col in date_cols_formatted:
+    for col in date_cols_normalized:
         if col in df.columns:
-            df[col] = df[col].dt.strftime("%m/%d/%Y")
+            df[col] = df[col].dt.normalize()
 
     # Sort and categorize
-    df = df.sort_values(by="Time Since Assignment", ascending=False)
-    df["Delinquency"] = df["Time Since Assignment"].apply(categorize_delinquency)
-
-    df["is_SharePointError"] = pd.notna(df["Time to Execution"]) & df["Status"].isin(
-        [
-            "In Progress",
-            "Initial Review",
-            "Out for Signature",
-            "Other Internal Department",
-            "Assigned",
-            "Out for Redline",
-        ]
-    )
+    if "Time Since Assignment" in derived:
+        df = df.sort_values(by="Time Since Assignment", ascending=False)
+    if "Delinquency" in derived:
+        df["Delinquency"] = categorize_delinquency(df["Time Since Assignment"])
+
+    if "is_SharePointError" in derived:
+        df["is_SharePointError"] = pd.notna(df["Time to Execution"]) & df["Status"].isin(
+            [
+                "In Progress",
+                "Initial Review",
+                "Out for Signature",
+                "Other Internal Department",
+                "Assigned",
+                "Out for Redline",
+            ]
+        )
 
-    # Clear Delinquency and Time Since Assignment if SharePoint error detected
-    df.loc[df["is_SharePointError"], ["Delinquency", "Time Since Assignment"]] = None
+        # Clear Delinquency and Time Since Assignment if SharePoint error detected
+        cleared = [col for col in ("Delinquency", "Time Since Assignment") if col in derived]
+        if cleared:
+            df.loc[df["is_SharePointError"], cleared] = None
 
-    # Create copies for different outputs
-    df_original = df.copy()
-    df_active_assignments = df_original.copy()
-    df_active_assignments = df_active_assignments[
-        ~df_active_assignments["Status"].isin(["Completed", "Duplicate", "Withdrawn"])
-    ]
+    active_mask = ~df["Status"].isin(["Completed", "Duplicate", "Withdrawn"])
 
     logger.info("Preprocessing complete.")
-    return df_original, df_active_assignments
+    return df, df[active_mask]
 
 
 def get_current_fiscal_year():
@@ -285,132 +477,169 @@ def get_current_fiscal_year():
     return fiscal_year, fiscal_year_start
 
 
+def get_fy_sheet_name():
+    """Name of the current fiscal year's SharePoint data sheet, e.g. ``"FY 24-25 SharePoint"``."""
+    fiscal_year, _ = get_current_fiscal_year()
+    return f"FY {str(fiscal_year-1)[-2:]}-{str(fiscal_year)[-2:]} SharePoint"
+
+
 def filter_assigned_date(df, start_fiscal_year, end_fiscal_year):
     logger.debug("Filtering assigned date.")
-    df = df[df["Date Assigned"] >= start_fiscal_year]
-    if end_fiscal_year:
-        df = df[df["Date Assigned"] < end_fiscal_year]
+    df = df[assigned_date_mask(df, start_fiscal_year, end_fiscal_year)]
     logger.debug("Filtering assigned date complete.")
     return df
 
 
-def networkdays(start_date, end_date):
+def assigned_date_mask(df, start_fiscal_year, end_fiscal_year):
+    """Boolean mask of rows whose "Date Assigned" is in ``[start, end)``."""
+    mask = df["Date Assigned"] >= start_fiscal_year
+    if end_fiscal_year:
+        mask &= df["Date Assigned"] < end_fiscal_year
+    return mask
+
+
+def networkdays(start_date, end_date, calendar=None):
     if pd.isnull(start_date) or pd.isnull(end_date):
         return None
 
-    # Convert dates to datetime.date objects in correct format
-    start = pd.to_datetime(start_date).date()
-    end = pd.to_datetime(end_date).date()
+    if calendar is None:
+        calendar = get_business_calendar()
 
-    return np.busday_count(start, end) + 1  # Include end date
+    # Convert dates to datetime64 days
+    start = pd.Timestamp(start_date).to_datetime64()
+    end = pd.Timestamp(end_date).to_datetime64()
 
+    return int(calendar.busday_count(start, end)[0]) + 1  # Include end date
 
-def categorize_delinquency(days):
-    if pd.isnull(days):
-        return None
-    elif days >= 90:
-        return ">= 90 Days"
-    elif days >= 60:
-        return ">= 60 Days"
-    elif days >= 30:
-        return ">= 30 Days"
-    elif days < 30:
-        return "< 30 Days"
-    else:
-        return ""
 
+@timed_stage
+def write_output(
+    df_original,
+    df_active_assignments,
+    output_filename,
+    streaming=False,
+    compact=None,
+    sheets=None,
+):
+    """
+    Writes the processed data to an Excel file with formatting.
 
-def write_output(df_original, df_active_assignments, output_filename):
-    """Writes the processed data to an Excel file with formatting."""
+    Args:
+        df_original (pd.DataFrame): Processed data for the FY SharePoint sheet.
+        df_active_assignments (pd.DataFrame): Data for the Active Assignments sheet.
+        output_filename (str): Path of the workbook to write.
+        streaming (bool): Write with a write-only workbook, emitting values and
+            formatting in one pass instead of building every cell in memory
+            and formatting it afterwards. The output is the same.
+        compact (bool, optional): Store repeated strings once and recompress
+            the file (see ``writers.compact_workbook``). Defaults to
+            ``autoexcel_config.output.compact``.
+        sheets (dict, optional): Data sheets to write, ``{"fy": columns,
+            "active": columns}`` (see ``autoexcel.pipeline.plan_outputs``),
+            None standing for every column. Defaults to both sheets in full.
+    """
 
     # logger.debug('Writing output to Excel.')
     logger.info(f"Writing output to {output_filename}")
-    with pd.ExcelWriter(output_filename, engine="openpyxl") as writer:
-        fiscal_year, _ = get_current_fiscal_year()
-        fy_sheet_name = (
-            f"FY {str(fiscal_year-1)[-2:]}-{str(fiscal_year)[-2:]} SharePoint"
-        )
+    fy_sheet_name = get_fy_sheet_name()
+    if sheets is None:
+        sheets = {"fy": None, "active": None}
+
+    def sheet_columns(df, source):
+        columns = sheets[source]
+        if columns is None:
+            return df
+        return df[[col for col in df.columns if col in set(columns)]]
+
+    # Date cells get their number format from the writers (writers.DATETIME_FORMAT)
+    fy = active = None
+    if "fy" in sheets:
+        fy = format_text_dates(sheet_columns(df_original, "fy"))
+    if "active" in sheets:
+        active = format_text_dates(sheet_columns(df_active_assignments, "active"))
+
+    if streaming:
+        data_sheets = []
+        if fy is not None:
+            data_sheets.append((fy_sheet_name, fy, None))
+        if active is not None:
+            data_sheets.append(("Active Assignments", active, None))
+        write_workbook_streaming(data_sheets, output_filename)
+    else:
+        write_output_sheets(fy, active, output_filename, fy_sheet_name)
 
+    compact_default, compress_level = get_output_settings()
+    if compact is None:
+        compact = compact_default
+    if compact:
+        compact_workbook(output_filename, compress_level=compress_level)
+
+    logger.debug("Writing output to Excel complete.")
+
+
+def write_output_sheets(df_original, df_active_assignments, output_filename, fy_sheet_name):
+    """
+    Write and format the data sheets with pandas' openpyxl writer.
+
+    A sheet whose frame is None is not written.
+    """
+    with pd.ExcelWriter(output_filename, engine="openpyxl") as writer:
         # Write data to worksheets
-        # Convert date columns to datetime before writing
-        date_columns = ["Date Assigned", "FE Date"]
+        if df_original is not None:
+            df_original.to_excel(writer, index=False, sheet_name=fy_sheet_name)
+            format_worksheet(writer.sheets[fy_sheet_name], df_original)
 
-        df_original_copy = df_original.copy()
-        df_active_copy = df_active_assignments.copy()
+        if df_active_assignments is not None:
+            df_active_assignments.to_excel(writer, index=False, sheet_name="Active Assignments")
+            format_worksheet(writer.sheets["Active Assignments"], df_active_assignments)
 
-        for col in date_columns:
-            if col in df_original_copy.columns:
-                df_original_copy[col] = pd.to_datetime(df_original_copy[col])
-            if col in df_active_copy.columns:
-                df_active_copy[col] = pd.to_datetime(df_active_copy[col])
 
-        df_original_copy.to_excel(writer, index=False, sheet_name=fy_sheet_name)
-        df_active_copy.to_excel(writer, index=False, sheet_name="Active Assignments")
+def format_text_dates(df, columns=TEXT_DATE_COLUMNS):
+    """
+    Return ``df`` with its datetime64 ``columns`` as mm/dd/yyyy text, copying no other column.
 
-        # Apply formatting
-        for sheet_name, df in zip(
-            [fy_sheet_name, "Active Assignments"], [df_original, df_active_assignments]
-        ):
-            worksheet = writer.sheets[sheet_name]
-            format_worksheet(worksheet, df)
+    This is how the data sheets have always held these columns; the other
+    date columns are written as dates. Missing dates stay missing.
+    """
+    formatted = {
+        col: df[col].dt.strftime("%m/%d/%Y")
+        for col in columns
+        if col in df.columns and pd.api.types.is_datetime64_any_dtype(df[col])
+    }
+    if not formatted:
+        return df
 
-    logger.debug("Writing output to Excel complete.")
+    df = df.copy(deep=False)
+    for col, values in formatted.items():
+        df[col] = values
+    return df
 
 
 def format_worksheet(worksheet, df):
-    """Applies formatting to the Excel worksheet."""
+    """
+    Applies formatting to the Excel worksheet.
+
+    Row height, column styles and the Delinquency fills are set once per
+    sheet or column (see ``writers.format_sheet``); the cells pandas wrote
+    only get their shared named style.
+
+    That last step is deliberately left per cell, so it is O(cells): Excel
+    applies a column style only to cells the sheet does not hold, and
+    conditional formatting cannot set the wrap text the data cells need.
+    The streaming writer (``write_output(streaming=True)``) gives each cell
+    its style as it is written instead of in a second pass.
+    """
     logger.debug("Formatting worksheet.")
-    # Set default row height
-    worksheet.sheet_format.defaultRowHeight = 15
+    register_named_styles(worksheet.parent)
+    format_sheet(worksheet, df, worksheet.max_row - 1)
 
-    # Apply auto-filter
-    max_column = get_column_letter(worksheet.max_column)
-    worksheet.auto_filter.ref = f"A1:{max_column}1"
+    for cell in worksheet[1]:
+        cell.style = HEADER_STYLE
 
-    # Format header
-    title_fill = PatternFill(
-        start_color="C0E6F4", end_color="C0E6F4", fill_type="solid"
-    )
-    non_bold_font = Font(bold=False)
-
-    # Apply wrap text to all cells while keeping row height at 15
-    for row in worksheet.iter_rows():
-        for cell in row:
-            cell.alignment = cell.alignment.copy(wrapText=True)
-            cell.parent.row_dimensions[cell.row].height = 15
-
-    for col in range(1, worksheet.max_column + 1):
-        cell = worksheet.cell(row=1, column=col)
-        cell.fill = title_fill
-        cell.font = non_bold_font
-
-    # Apply conditional formatting for 'Delinquency'
-    red_fill = PatternFill(
-        start_color="FFFF0000", end_color="FFFF0000", fill_type="solid"
-    )
-    orange_fill = PatternFill(
-        start_color="FFFFA500", end_color="FFFFA500", fill_type="solid"
-    )
-    yellow_fill = PatternFill(
-        start_color="FFFFFF00", end_color="FFFFFF00", fill_type="solid"
-    )
-    white_fill = PatternFill(
-        start_color="FFFFFFFF", end_color="FFFFFFFF", fill_type="solid"
-    )
-    if "Delinquency" in df.columns:
-        delinquency_col_idx = df.columns.get_loc("Delinquency") + 1
-        delinquency_col_letter = get_column_letter(delinquency_col_idx)
-
-        for idx, cell in enumerate(worksheet[delinquency_col_letter][1:], start=2):
-            delinquency_value = cell.value
-            if delinquency_value == ">= 90 Days":
-                cell.fill = red_fill
-            elif delinquency_value == ">= 60 Days":
-                cell.fill = orange_fill
-            elif delinquency_value == ">= 30 Days":
-                cell.fill = yellow_fill
-            elif delinquency_value == "< 30 Days":
-                cell.fill = white_fill
+    # Per cell on purpose: the column styles above do not reach existing cells
+    for col_idx, style in enumerate(column_styles(df), start=1):
+        for (cell,) in worksheet.iter_rows(min_row=2, min_col=col_idx, max_col=col_idx):
+            cell.style = style
     logger.debug("Formatting worksheet complete.")
 
 
@@ -419,34 +648,212 @@ def copy_excel_worksheet(
 ):
     """Copies worksheets from the source Excel file to the target Excel file."""
     logger.debug("Copying worksheets.")
-    from win32com.client import Dispatch
 
-    # print(dir(win32c))
-    xl = Dispatch("Excel.Application")
-    xl.Visible = False
+    def copy_worksheets(xl):
+        xl.Visible = False
 
-    fiscal_year, _ = get_current_fiscal_year()
+        soruce_wb = xl.Workbooks.Open(Filename=os.path.abspath(source_excel_path))
+        target_wb = xl.Workbooks.Open(Filename=os.path.abspath(target_excel_path))
+        logger.debug(
+            f"Attempting to copy worksheets from {source_excel_path} to {target_excel_path}"
+        )
+        try:
+            with excel_session(xl):
+                for worksheet_name in worksheet_names:
+                    logger.debug(f"Attempting to copy worksheet {worksheet_name}")
+                    source_ws = soruce_wb.Worksheets(worksheet_name)
+                    source_ws.Copy(Before=target_wb.Worksheets(1))
+                    logger.debug(f"Successfully copied worksheet {worksheet_name}")
 
-    soruce_wb = xl.Workbooks.Open(Filename=os.path.abspath(source_excel_path))
-    target_wb = xl.Workbooks.Open(Filename=os.path.abspath(target_excel_path))
-    logger.debug(
-        f"Attempting to copy worksheets from {source_excel_path} to {target_excel_path}"
-    )
+        except Exception as e:
+            logger.exception(e)
+        finally:
+            soruce_wb.Close(SaveChanges=False)
+            target_wb.Close(SaveChanges=True)
+
+    run_excel_job(copy_worksheets, early_bound=False)
+
+    logger.debug("Copying worksheets complete.")
+
+
+def get_worksheet(wb, name):
+    """Worksheet ``name`` of an Excel (COM) or openpyxl workbook."""
+    if isinstance(wb, Workbook):
+        return wb[name]
+    return wb.Sheets(name)
+
+
+def add_worksheet(wb, name):
+    """Add a worksheet named ``name`` in front of the others, as ``Sheets.Add`` does."""
+    if isinstance(wb, Workbook):
+        return wb.create_sheet(name, 0)
+    wb.Sheets.Add().Name = name
+    return wb.Sheets(name)
+
+
+def autofit_worksheet(ws):
+    if isinstance(ws, Worksheet):
+        autofit_columns(ws)
+    else:
+        ws.Columns.AutoFit()
+
+
+def get_years(values):
+    """Years (as strings) of the dates in ``values``, blanks skipped."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return {str(year) for year in pd.Series(values).dropna().dt.year.unique()}
+    values = pd.Series(values, dtype=object).dropna()
+    values = values[values != ""]
+    # Parse the distinct values only
+    dates = pd.DatetimeIndex(pd.to_datetime(pd.unique(values)))
+    return {str(year) for year in dates.year.unique()}
+
+
+def get_frame_years(df, column_names):
+    """``{column: years}`` of the date columns ``column_names`` of ``df`` (see ``get_years``)."""
+    return {name: get_years(df[name]) for name in column_names if name in df.columns}
+
+
+def read_worksheet_column(ws, column_name):
+    """
+    Values below the header ``column_name`` of an Excel (COM) data sheet.
+
+    The header row and the column are each read with one ``Range.Value``
+    call instead of a round-trip per cell.
+
+    Returns:
+        numpy.ndarray: Object array of the column's values, or None if no
+        header cell is ``column_name``.
+    """
+    used_range = ws.UsedRange
+    n_rows = used_range.Rows.Count
+    last_col = get_column_letter(used_range.Columns.Count)
+    header = np.asarray(ws.Range(f"A1:{last_col}1").Value, dtype=object).reshape(-1)
+    matches = np.flatnonzero(header == column_name)
+    if not len(matches):
+        return None
+    if n_rows < 2:
+        return np.empty(0, dtype=object)
+
+    col = get_column_letter(matches[0] + 1)
+    return np.asarray(ws.Range(f"{col}2:{col}{n_rows}").Value, dtype=object).reshape(-1)
+
+
+def read_worksheet_frame(ws):
+    """Data sheet ``ws`` of an Excel (COM) or openpyxl workbook as a DataFrame, read in one call."""
+    if isinstance(ws, Worksheet):
+        return source_frame(ws)
+    values = ws.UsedRange.Value
+    if not isinstance(values, tuple):
+        return pd.DataFrame(columns=[values])
+    return pd.DataFrame(list(values[1:]), columns=list(values[0]))
+
+
+def get_worksheet_years(ws, column_name):
+    """Years (as strings) of the dates in column ``column_name`` of a data sheet."""
+    if isinstance(ws, (Worksheet, pd.DataFrame)):
+        df = source_frame(ws)
+        values = df[column_name] if column_name in df.columns else None
+    else:
+        values = read_worksheet_column(ws, column_name)
+    if values is None:
+        return set()
+    return get_years(values)
+
+
+@contextmanager
+def excel_session(excel):
+    """
+    Batch the COM calls made inside the block on Excel application ``excel``.
+
+    Screen updating, events and automatic calculation are suspended while the
+    block runs and restored afterwards, so Excel does not redraw or recompute
+    after every call. Save the workbook after the block: the calculation mode
+    is stored in the file.
+    """
+    settings = {
+        "ScreenUpdating": False,
+        "EnableEvents": False,
+        "Calculation": XL_CALCULATION_MANUAL,
+    }
+    previous = {name: getattr(excel, name) for name in settings}
+    for name, value in settings.items():
+        setattr(excel, name, value)
     try:
-        for worksheet_name in worksheet_names:
-            logger.debug(f"Attempting to copy worksheet {worksheet_name}")
-            source_ws = soruce_wb.Worksheets(worksheet_name)
-            source_ws.Copy(Before=target_wb.Worksheets(1))
-            logger.debug(f"Successfully copied worksheet {worksheet_name}")
-
-    except Exception as e:
-        logger.exception(e)
+        yield excel
     finally:
-        soruce_wb.Close(SaveChanges=False)
-        target_wb.Close(SaveChanges=True)
-        xl.Quit()
+        for name, value in previous.items():
+            setattr(excel, name, value)
 
-    logger.debug("Copying worksheets complete.")
+
+def set_thin_borders(cell_range):
+    """Thin black borders on every cell of Excel range ``cell_range``."""
+    borders = cell_range.Borders
+    borders.LineStyle = win32c.xlContinuous
+    borders.Color = 0x000000  # Black
+    borders.Weight = win32c.xlThin
+
+
+def write_excel_title(pt_ws, title, start_row, start_col, width):
+    """Write a table's title over the two rows from ``start_row``, merged across its width."""
+    first_col = get_column_letter(start_col)
+    last_col = get_column_letter(start_col + width - 1)
+    header_range = pt_ws.Range(f"{first_col}{start_row}:{last_col}{start_row + 1}")
+    header_range.Merge()
+    header_range.Value = title
+    font = header_range.Font
+    font.Bold = True
+    font.Size = 12
+    font.Name = "Aptos Narrow"
+    font.ColorIndex = win32c.xlThemeColorAccent6  # Green Accent 6
+    header_range.HorizontalAlignment = win32c.xlCenter  # Center align
+    header_range.VerticalAlignment = win32c.xlCenter  # Middle align
+    header_range.WrapText = True  # Wrap text
+
+    # Add black border to header
+    set_thin_borders(header_range)
+
+
+def write_excel_footer(pt_ws, footer_text, row, start_col, width):
+    """Write a table's footer in ``row``, merged across its width."""
+    first_col = get_column_letter(start_col)
+    last_col = get_column_letter(start_col + width - 1)
+    footer_range = pt_ws.Range(f"{first_col}{row}:{last_col}{row}")
+    footer_range.Merge()
+    footer_range.Value = footer_text
+    font = footer_range.Font
+    font.Size = 11
+    font.Name = "Aptos Narrow"
+    footer_range.HorizontalAlignment = win32c.xlLeft
+    set_thin_borders(footer_range)
+
+
+def get_excel_pivot_cache(wb, ws):
+    """
+    PivotCache over the used range of ``ws``, shared by the PivotTables built on it.
+
+    Excel snapshots the source data once per cache, so tables on the same
+    sheet and range reuse one cache instead of each creating their own. Date
+    grouping belongs to the cache and is shared too: the returned set holds
+    the fields already grouped, which later tables leave as they are.
+
+    Returns:
+        tuple: The PivotCache and the set of its grouped fields.
+    """
+    source = ws.UsedRange
+    key = (id(wb), ws.Name, source.Address)
+    if key not in excel_pivot_caches:
+        pc = wb.PivotCaches().Create(SourceType=win32c.xlDatabase, SourceData=source)
+        excel_pivot_caches[key] = (wb, pc, set())
+    _, pc, grouped_fields = excel_pivot_caches[key]
+    return pc, grouped_fields
+
+
+def release_excel_pivot_caches(wb):
+    """Drop the PivotCaches of ``wb`` from the registry, before it is closed."""
+    # A copy of the items: pooled workers may register caches meanwhile
+    for key in [key for key, entry in list(excel_pivot_caches.items()) if entry[0] is wb]:
+        del excel_pivot_caches[key]
 
 
 def pivot_table(
@@ -483,24 +890,56 @@ def pivot_table(
     footer_text = text to add to the footer of the pivot table (default None)
     visible_items = dictionary of items to make visible in pivot table (default None)
     show_detail_items = dictionary of items to show detail for in pivot table (default None)
+
+    With an openpyxl workbook the table is computed and written without Excel
+    (see ``autoexcel.pivot.pivot_table``).
+    Through Excel, tables on the same source sheet and range share one
+    PivotCache (see ``get_excel_pivot_cache``). The PivotTable and its fields
+    are resolved once and its layout is computed once, after all fields and
+    items are set (``ManualUpdate``); run it inside ``excel_session``.
     """
+    if isinstance(wb, Workbook):
+        # No Excel: compute the table with pandas and write it statically
+        return static_pivot_table(
+            wb,
+            ws1,
+            pt_ws,
+            ws_name,
+            pt_name,
+            pt_rows,
+            pt_cols,
+            pt_filters,
+            pt_fields,
+            start_row=start_row,
+            start_col=start_col,
+            apply_grouping=apply_grouping,
+            pt_visible_rows=pt_visible_rows,
+            footer_text=footer_text,
+            visible_items=visible_items,
+            show_detail_items=show_detail_items,
+            sorting_items=sorting_items,
+            header_size=header_size,
+        )
+
     header_row_size = header_size[0]
     header_col_size = header_size[1]
 
     # pivot table location - add 1 to account for title
     pt_loc_row = start_row + len(pt_filters) + header_row_size
 
-    # grab the pivot table source data
-    pc = wb.PivotCaches().Create(SourceType=win32c.xlDatabase, SourceData=ws1.UsedRange)
+    # grab the pivot table source data, shared with the other tables on it
+    pc, grouped_fields = get_excel_pivot_cache(wb, ws1)
 
-    # create the pivot table object
-    pc.CreatePivotTable(
+    # create the pivot table object, resolved once along with its fields
+    pt = pc.CreatePivotTable(
         TableDestination=f"{ws_name}!R{pt_loc_row}C{start_col}", TableName=pt_name
     )
+    pivot_fields = {}
 
-    # selecte the pivot table work sheet and location to create the pivot table
-    pt_ws.Select()
-    pt_ws.Cells(pt_loc_row, start_col).Select()
+    def pivot_field(name):
+        if name not in pivot_fields:
+            pivot_fields[name] = pt.PivotFields(name)
+        return pivot_fields[name]
 
     # Grouping date fields
     for field_list, field_r in (
@@ -509,7 +948,7 @@ def pivot_table(
         (pt_cols, win32c.xlColumnField),
     ):
         for i, value in enumerate(field_list):
-            pf = pt_ws.PivotTables(pt_name).PivotFields(value)
+            pf = pivot_field(value)
             pf.Orientation = field_r
             pf.Position = i + 1
 
@@ -520,7 +959,7 @@ def pivot_table(
             #     except Exception as e:
             #         logger.debug(e)
             #         logger.debug(f"Could not group field: {value}")
-            if apply_grouping:
+            if apply_grouping and value not in grouped_fields:
                 if any(
                     date_key in value.lower()
                     for date_key in ["date", "months", "years"]
@@ -529,41 +968,29 @@ def pivot_table(
                     try:
                         # Group by months, quarters, and years
                         pf.AutoGroup()  # Auto group the dates
+                        grouped_fields.add(value)
                     except Exception as e:
                         logger.debug(e)
                         logger.debug(f"Could not group field: {value}")
-    # List all field names
-    logger.debug("All available pivot table fields:")
-    for field in pt_ws.PivotTables(pt_name).PivotFields():
-        logger.debug(f"Field name: {field.Name}")
 
-    # Visible Items. This will select and deselect items in the pivot table
-    if visible_items:
-        for field_name, field_items in visible_items.items():
-            for item in field_items:
-                item_name = item[0]  # String
-                item_show_detail = item[1]  # boolean
-                logger.debug(
-                    f"Field Name: {field_name}, Item Name: {item_name}, Show Detail: {item_show_detail}"
-                )
-                try:
-                    pt_ws.PivotTables(pt_name).PivotFields(field_name).PivotItems(
-                        item_name
-                    ).Visible = item_show_detail
-                except Exception as e:
-                    logger.debug(e)
-                    logger.debug(f"Could not set visible item: {item_name}")
+    # The layout is recomputed once, when the fields and items are all set
+    pt.ManualUpdate = True
+
+    # List all field names
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("All available pivot table fields:")
+        for field in pt.PivotFields():
+            logger.debug(f"Field name: {field.Name}")
 
     # Hide all fields
-    for field in pt_ws.PivotTables(pt_name).VisibleFields:
-        name = field.Name
-        logger.debug(f"Hiding field: {name}")
+    for field in pt.VisibleFields:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Hiding field: {field.Name}")
         try:
-            pf = pt_ws.PivotTables(pt_name).PivotFields(name)
-            pf.Orientation = win32c.xlHidden
+            field.Orientation = win32c.xlHidden
         except Exception as e:
             logger.debug(e)
-            logger.debug(f"Could not hide field: {name}")
+            logger.debug(f"Could not hide field: {field.Name}")
 
     # Set the visible rows
     if pt_visible_rows is None:
@@ -573,12 +1000,23 @@ def pivot_table(
     for x in pt_visible_rows:
         logger.debug(f"Setting visible row: {x}")
         try:
-            pf = pt_ws.PivotTables(pt_name).PivotFields(x)
-            pf.Orientation = win32c.xlRowField
+            pivot_field(x).Orientation = win32c.xlRowField
         except Exception as e:
             logger.debug(e)
             logger.debug(f"Could not set visible row: {x}")
 
+    # Visible Items. This will deselect items in the pivot table, on the fields of
+    # its final layout only: Excel does not filter on the others
+    layout_fields = list(pt_filters) + list(pt_visible_rows) + list(pt_cols)
+    for field_name, hidden_items in item_filters(visible_items, layout_fields).items():
+        for item_name in hidden_items:
+            logger.debug(f"Field Name: {field_name}, Item Name: {item_name}, Visible: False")
+            try:
+                pivot_field(field_name).PivotItems(item_name).Visible = False
+            except Exception as e:
+                logger.debug(e)
+                logger.debug(f"Could not set visible item: {item_name}")
+
     # Show Detail Items. This will show or hide the detail rows in the pivot table
     if show_detail_items:
         for field_name, field_items in show_detail_items.items():
@@ -589,9 +1027,7 @@ def pivot_table(
                     f"Field Name: {field_name}, Item Name: {item_name}, Show Detail: {item_show_detail}"
                 )
                 try:
-                    pt_ws.PivotTables(pt_name).PivotFields(field_name).PivotItems(
-                        item_name
-                    ).ShowDetail = item_show_detail
+                    pivot_field(field_name).PivotItems(item_name).ShowDetail = item_show_detail
                 except Exception as e:
                     logger.debug(e)
                     logger.debug(f"Could not set show detail item: {item_name}")
@@ -599,28 +1035,28 @@ def pivot_table(
     # Sets the Values of the pivot table
     for field in pt_fields:
         try:
-            pt_ws.PivotTables(pt_name).AddDataField(
-                pt_ws.PivotTables(pt_name).PivotFields(field[0]), field[1], field[2]
-            ).NumberFormat = field[3]
+            pt.AddDataField(pivot_field(field[0]), field[1], field[2]).NumberFormat = field[3]
         except Exception as e:
             logger.debug(e)
             logger.debug(f"Could not add data field: {field[0]}")
 
-    pt_ws.PivotTables(pt_name).ShowValuesRow = False
-    pt_ws.PivotTables(pt_name).ColumnGrand = True
+    pt.ShowValuesRow = False
+    pt.ColumnGrand = True
 
     # Sorting items after applying Values
     if sorting_items:
         for field_name, sorting_item in sorting_items.items():
             sorting_order = sorting_item[1]
             sorting_field = sorting_item[0]
-            pt_ws.PivotTables(pt_name).PivotFields(field_name).AutoSort(
-                sorting_order, sorting_field
-            )
+            pivot_field(field_name).AutoSort(sorting_order, sorting_field)
+
+    pt.ManualUpdate = False
 
     # Get the dimensions of the pivot table
-    width = pt_ws.PivotTables(pt_name).TableRange1.Columns.Count
-    height = pt_ws.PivotTables(pt_name).TableRange1.Rows.Count
+    table_range = pt.TableRange2
+    body_range = pt.TableRange1
+    width = body_range.Columns.Count
+    height = body_range.Rows.Count
 
     logger.debug(f"Pivot table dim: {width} x {height}")
     logger.debug(f"Start Row: {start_row}, Start Col: {start_col}")
@@ -629,567 +1065,208 @@ def pivot_table(
     logger.debug("Formating Table")
 
     # Add Header to the pivot table
-    header_range = pt_ws.Range(
-        pt_ws.Cells(start_row, start_col),
-        pt_ws.Cells(start_row + 1, start_col + width - 1),
-    )
-    header_range.Merge()
-    header_range.Value = pt_name
-    header_range.Font.Bold = True
-    header_range.Font.Size = 12
-    header_range.Font.Name = "Aptos Narrow"
-    header_range.Font.ColorIndex = win32c.xlThemeColorAccent6  # Green Accent 6
-    header_range.HorizontalAlignment = win32c.xlCenter  # Center align
-    header_range.VerticalAlignment = win32c.xlCenter  # Middle align
-    header_range.WrapText = True  # Wrap text
-
-    # Add black border to header
-    header_range.Borders.LineStyle = win32c.xlContinuous
-    header_range.Borders.Color = 0x000000  # Black
-    header_range.Borders.Weight = win32c.xlThin
+    write_excel_title(pt_ws, pt_name, start_row, start_col, width)
     height += 2
-    # Merge cells across the table width
 
     # Add footer below pivot table
     if footer_text:
-        pt = pt_ws.PivotTables(pt_name)
-        lastRow = pt.TableRange2.Row + pt.TableRange2.Rows.Count
-
-        footer_range = pt_ws.Range(
-            pt_ws.Cells(lastRow, start_col), pt_ws.Cells(lastRow, start_col + width - 1)
-        )
-        footer_range.Merge()
-        footer_range.Value = footer_text
-        footer_range.Font.Size = 11
-        footer_range.Font.Name = "Aptos Narrow"
-        footer_range.HorizontalAlignment = win32c.xlLeft
-        footer_range.Borders.LineStyle = win32c.xlContinuous
-        footer_range.Borders.Color = 0x000000  # Black
-        footer_range.Borders.Weight = win32c.xlThin
+        lastRow = table_range.Row + table_range.Rows.Count
+        write_excel_footer(pt_ws, footer_text, lastRow, start_col, width)
         height += 1
 
     # Add black borders to all cells in pivot table
-    pt_range = pt_ws.PivotTables(pt_name).TableRange2
-    pt_range.Borders.LineStyle = win32c.xlContinuous
-    pt_range.Borders.Color = 0x000000  # Black
-    pt_range.Borders.Weight = win32c.xlThin
-
-    # pt_ws.PivotTables(pt_name)
+    set_thin_borders(table_range)
 
     return (width, height)
 
 
-def create_caseload_analysis_ws(wb, date=None, old_negotiators=None):
-    ws_active = wb.Sheets("Active Assignments")
-    if date is None:
-        date = datetime.today().strftime("%m/%d/%Y")
-
-    ws_caseload_name = "Caseload_Analysis"
-    wb.Sheets.Add().Name = ws_caseload_name
-    ws_caseload = wb.Sheets(ws_caseload_name)
+def statistics_table(
+    wb,
+    ws1,
+    pt_ws,
+    ws_name,
+    pt_name,
+    pt_rows,
+    fields,
+    statistics=STATISTICS,
+    start_row=1,
+    start_col=1,
+    visible_items=None,
+    approximate=False,
+    number_format="0.0",
+    footer_text=None,
+    frame=None,
+):
+    """
+    Write a table of group statistics (see ``autoexcel.stats.group_statistics``).
 
-    current_row = 1
-    current_col = 1
-    seperation_of_pivot_tables = 2
+    Counterpart of ``pivot_table`` for statistics Excel's pivots lack
+    (standard deviation, min, max, median, percentiles): the statistics of
+    ``fields`` by the items of ``pt_rows``, with a grand total row, under the
+    pivot tables' title header and footer. They are computed in memory from
+    ``frame``, or from source sheet ``ws1`` read in one call, and written as
+    values. ``ws_name`` is unused.
 
-    pt_name = f"Caseload Analysis {date}"
-    pt_rows = ["Negotiator"]
-    pt_cols = []
-    pt_filters = []
+    Returns:
+        tuple: ``(width, height)`` of the table, title and footer included.
+    """
+    df = frame if frame is not None else read_worksheet_frame(ws1)
+    options = {"visible_items": visible_items, "approximate": approximate}
+    table = group_statistics(df, pt_rows, fields, statistics, **options)
+    totals = group_statistics(df, [], fields, statistics, filter_fields=pt_rows, **options)
+
+    if isinstance(pt_ws, Worksheet):
+        return write_statistics(
+            pt_ws,
+            table,
+            pt_name,
+            start_row=start_row,
+            start_col=start_col,
+            totals=totals,
+            number_format=number_format,
+            footer_text=footer_text,
+        )
 
-    show_detail_items = None
-    visible_items = {}
-    if old_negotiators:
-        visible_items["Negotiator"] = [
-            (negotiator, False) for negotiator in old_negotiators
-        ]
-    visible_items["FE Date"] = [("(blank)", False)]
-    visible_items["High Priority"] = [("(blank)", False)]
-
-    pt_fields = [["#", "Open Cases in SharePoint", win32c.xlSum, "0"]]
-
-    logger.info(f"Creating pivot table: {pt_name}")
-    pivot_table(
-        wb,
-        ws_active,
-        ws_caseload,
-        ws_caseload_name,
-        pt_name,
-        pt_rows,
-        pt_cols,
-        pt_filters,
-        pt_fields,
-        start_row=current_row,
-        start_col=current_col,
-        show_detail_items=show_detail_items,
-        visible_items=visible_items,
+    header, rows, columns = statistics_rows(table, totals)
+    n_keys = len(header) - len(columns)
+    width = len(header)
+    first_row = start_row + 2
+    last_row = first_row + len(rows)
+    first_col = get_column_letter(start_col)
+    last_col = get_column_letter(start_col + width - 1)
+
+    # All values in one call, then a call per column format and for the bold rows
+    table_range = pt_ws.Range(f"{first_col}{first_row}:{last_col}{last_row}")
+    table_range.Value = tuple(
+        tuple(value.to_pydatetime() if isinstance(value, pd.Timestamp) else value for value in row)
+        for row in [header] + rows
     )
+    for offset, statistic in enumerate(columns, start=n_keys):
+        col = get_column_letter(start_col + offset)
+        pt_ws.Range(f"{col}{first_row + 1}:{col}{last_row}").NumberFormat = (
+            "0" if statistic == "count" else number_format
+        )
+    pt_ws.Range(f"{first_col}{first_row}:{last_col}{first_row}").Font.Bold = True
+    pt_ws.Range(f"{first_col}{last_row}:{last_col}{last_row}").Font.Bold = True
+    set_thin_borders(table_range)
 
-    ws_caseload.Columns.AutoFit()
-
-
-def create_fy_analytics_ws(wb, old_negotiators=None):
-    ws_active = wb.Sheets("Active Assignments")
-    ws_sharepoint = wb.Sheets("FY 24-25 SharePoint")
-    # ws2_name = "FY_24-25_Analytics"
-    ws2_name = "FY_24_25_Analytics"
-    wb.Sheets.Add().Name = ws2_name
-    ws2 = wb.Sheets(ws2_name)
-
-    visible_items = {}
-    if old_negotiators:
-        visible_items["Negotiator"] = [
-            (negotiator, False) for negotiator in old_negotiators
-        ]
-    visible_items["FE Date"] = [("(blank)", False)]
-    visible_items["High Priority"] = [("(blank)", False)]
-
-    logger.info(f"Unselecting old negotiators: {old_negotiators}")
+    write_excel_title(pt_ws, pt_name, start_row, start_col, width)
+    height = len(rows) + 3
+    if footer_text:
+        write_excel_footer(pt_ws, footer_text, start_row + height, start_col, width)
+        height += 1
 
-    ####################################################################################################################################################
-    current_row = 1
-    current_col = 1
-    seperation_of_pivot_tables = 2
-
-    pt_name = "Active Caseload by Negotiator, Status, Agreement Type, and Delinquency"
-    pt_rows = ["Negotiator", "Status", "Agreement Type", "Delinquency"]
-    grouping_list = ["FE Date", "Date Assigned"]
-    pt_cols = []
-    pt_filters = []
-
-    show_detail_items = {
-        "Months (Date Assigned)": [
-            ("Jan", False),
-            ("Feb", False),
-            ("Mar", False),
-            ("Apr", False),
-            ("May", False),
-            ("Jun", False),
-            ("Jul", False),
-            ("Aug", False),
-            ("Sep", False),
-            ("Oct", False),
-            ("Nov", False),
-            ("Dec", False),
-        ]
-    }
-    # 'Years (Date Assigned)': [('2023',False)]}
-
-    pt_fields = [["#", "Sum of #", win32c.xlSum, "0"]]
-
-    logger.info(f"Creating pivot table: {pt_name}")
-    pivot_table(
-        wb,
-        ws_active,
-        ws2,
-        ws2_name,
-        pt_name,
-        pt_rows,
-        pt_cols,
-        pt_filters,
-        pt_fields,
-        start_row=current_row,
-        start_col=current_col,
-        apply_grouping=True,
-        show_detail_items=show_detail_items,
-        visible_items=visible_items,
-    )
+    logger.debug(f"Statistics table dim: {width} x {height}")
+    return (width, height)
 
-    ####################################################################################################################################################
-
-    current_row = 1
-    current_col = 4
-    seperation_of_pivot_tables = 2
-
-    pt_name = "Executed Agreements by Negotiator"
-    pt_rows = ["Negotiator", "FE Date", "Date Assigned"]
-    # grouping_list = ['FE Date', 'Date Assigned']
-    pt_cols = []
-    pt_filters = []
-    pt_fields = [["#", "Sum of #", win32c.xlSum, "0"]]
-    pt_visible_rows = ["Negotiator", "Years (FE Date)", "Months (FE Date)", "FE Date"]
-
-    show_detail_items = {
-        "Months (FE Date)": [
-            ("Jan", False),
-            ("Feb", False),
-            ("Mar", False),
-            ("Apr", False),
-            ("May", False),
-            ("Jun", False),
-            ("Jul", False),
-            ("Aug", False),
-            ("Sep", False),
-            ("Oct", False),
-            ("Nov", False),
-            ("Dec", False),
-        ]
-    }
 
-    # Get unique FE dates from SharePoint worksheet
-    fe_dates = set()
-    fe_date_col = None
-    for col in range(1, ws_sharepoint.UsedRange.Columns.Count + 1):
-        if ws_sharepoint.Cells(1, col).Value == "FE Date":
-            fe_date_col = col
-            break
-
-    if fe_date_col:
-        for row in range(2, ws_sharepoint.UsedRange.Rows.Count + 1):
-            date_val = ws_sharepoint.Cells(row, fe_date_col).Value
-            if date_val not in fe_dates and date_val:
-                fe_dates.add(str(date_val.year))
-
-    max_year = 0
-    for year in fe_dates:
-        max_year = max(max_year, int(year))
-    show_detail_items["Years (FE Date)"] = [
-        (str(year), year == str(max_year)) for year in fe_dates
-    ]
+def get_report_sources(wb, frames=None):
+    """
+    Data sheets of ``wb`` by the ``source`` names of report specs, looked up on first use.
 
-    logger.info(f"Creating pivot table: {pt_name}")
-    pivot_table(
-        wb,
-        ws_sharepoint,
-        ws2,
-        ws2_name,
-        pt_name,
-        pt_rows,
-        pt_cols,
-        pt_filters,
-        pt_fields,
-        start_row=current_row,
-        start_col=current_col,
-        apply_grouping=True,
-        pt_visible_rows=pt_visible_rows,
-        show_detail_items=show_detail_items,
-        visible_items=visible_items,
-    )
+    An openpyxl workbook without the sheet of a source in ``frames`` uses the
+    frame instead.
+    """
+    sheet_names = {"active": "Active Assignments", "fy": get_fy_sheet_name()}
+    frames = frames or {}
+    sources = {}
 
-    ####################################################################################################################################################
-
-    current_row = 1
-    current_col = 7
-    seperation_of_pivot_tables = 2
-
-    pt_name = "New Assignments by Negotiator"
-    pt_rows = ["Negotiator", "FE Date", "Date Assigned"]
-    pt_cols = []
-    pt_filters = []
-    pt_fields = [["#", "Sum of #", win32c.xlSum, "0"]]
-    pt_visible_rows = [
-        "Negotiator",
-        "Years (Date Assigned)",
-        "Months (Date Assigned)",
-        "Date Assigned",
-    ]
+    def source(name):
+        if name not in sources:
+            sheet_name = sheet_names[name]
+            if isinstance(wb, Workbook) and sheet_name not in wb.sheetnames and name in frames:
+                sources[name] = frames[name]
+            else:
+                sources[name] = get_worksheet(wb, sheet_name)
+        return sources[name]
 
-    show_detail_items = {
-        "Months (Date Assigned)": [
-            ("Jan", False),
-            ("Feb", False),
-            ("Mar", False),
-            ("Apr", False),
-            ("May", False),
-            ("Jun", False),
-            ("Jul", False),
-            ("Aug", False),
-            ("Sep", False),
-            ("Oct", False),
-            ("Nov", False),
-            ("Dec", False),
-        ]
-    }
+    return source
 
-    date_assigned_dates = set()
-    date_assigned_col = None
-    for col in range(1, ws_sharepoint.UsedRange.Columns.Count + 1):
-        if ws_sharepoint.Cells(1, col).Value == "Date Assigned":
-            date_assigned_col = col
-            break
-
-    if date_assigned_col:
-        for row in range(2, ws_sharepoint.UsedRange.Rows.Count + 1):
-            date_val = ws_sharepoint.Cells(row, date_assigned_col).Value
-            if date_val not in date_assigned_dates and date_val:
-                date_assigned_dates.add(str(date_val.year))
-
-    max_year = 0
-    for year in date_assigned_dates:
-        max_year = max(max_year, int(year))
-    show_detail_items["Years (Date Assigned)"] = [
-        (str(year), year == str(max_year)) for year in date_assigned_dates
-    ]
 
-    logger.info(f"Creating pivot table: {pt_name}")
-    pivot_table(
-        wb,
-        ws_sharepoint,
-        ws2,
-        ws2_name,
-        pt_name,
-        pt_rows,
-        pt_cols,
-        pt_filters,
-        pt_fields,
-        start_row=current_row,
-        start_col=current_col,
-        apply_grouping=True,
-        pt_visible_rows=pt_visible_rows,
-        visible_items=visible_items,
-        show_detail_items=show_detail_items,
-    )
+@timed_stage(detail="name")
+def create_report_ws(wb, name, old_negotiators=None, years=None, date=None, frames=None):
+    """
+    Add the sheet of report ``name`` (see ``autoexcel_config.reports``) to ``wb``.
 
-    ####################################################################################################################################################
-
-    current_row = 1
-    current_col = 10
-    seperation_of_pivot_tables = 2
-
-    pt_name = "Delinquency by Negotiator"
-    pt_rows = ["Negotiator", "Delinquency"]
-    pt_cols = []
-    pt_filters = []
-    pt_fields = [["#", "Sum of #", win32c.xlSum, "0"]]
-
-    prev_width, prev_height = pivot_table(
-        wb,
-        ws_active,
-        ws2,
-        ws2_name,
-        pt_name,
-        pt_rows,
-        pt_cols,
-        pt_filters,
-        pt_fields,
-        start_row=current_row,
-        start_col=current_col,
-        visible_items=visible_items,
-    )
-    current_row += prev_height + seperation_of_pivot_tables
-
-    pt_name = "Total Assignments By Delinquency"
-    pt_rows = ["Delinquency"]
-    pt_cols = []
-    pt_filters = []
-    pt_fields = [["#", "Sum of #", win32c.xlSum, "0"]]
-
-    prev_width, prev_height = pivot_table(
-        wb,
-        ws_active,
-        ws2,
-        ws2_name,
-        pt_name,
-        pt_rows,
-        pt_cols,
-        pt_filters,
-        pt_fields,
-        start_row=current_row,
-        start_col=current_col,
-        visible_items=visible_items,
-    )
-    current_row += prev_height + seperation_of_pivot_tables
-
-    pt_name = "Average Time to Assignment by Month"
-    pt_rows = ["Delinquency", "FE Date", "Date Assigned"]
-    pt_cols = []
-    pt_filters = []
-    pt_fields = [["Time to Assignment", "Average of TTA*", win32c.xlAverage, "0"]]
-    pt_visible_rows = [
-        "Years (Date Assigned)",
-        "Months (Date Assigned)",
-        "Date Assigned",
-    ]
-    footer_text = "*Data is skewed due to reassignments"
-
-    show_detail_items = {
-        "Months (Date Assigned)": [
-            ("Jan", False),
-            ("Feb", False),
-            ("Mar", False),
-            ("Apr", False),
-            ("May", False),
-            ("Jun", False),
-            ("Jul", False),
-            ("Aug", False),
-            ("Sep", False),
-            ("Oct", False),
-            ("Nov", False),
-            ("Dec", False),
-        ]
-    }
+    The tables of each column are stacked top to bottom, ``spacing`` rows
+    apart, and the next column starts one column right of the widest table.
+    Tables over the same data share their aggregations (see
+    ``autoexcel.reports.plan_report``).
 
-    logger.info(f"Creating pivot table: {pt_name}")
-    pivot_table(
-        wb,
-        ws_sharepoint,
-        ws2,
-        ws2_name,
-        pt_name,
-        pt_rows,
-        pt_cols,
-        pt_filters,
-        pt_fields,
-        start_row=current_row,
-        start_col=current_col,
-        apply_grouping=True,
-        pt_visible_rows=pt_visible_rows,
-        footer_text=footer_text,
-        visible_items=visible_items,
-        show_detail_items=show_detail_items,
-    )
+    Args:
+        wb: Excel (COM) or openpyxl workbook with the data sheets.
+        name (str): Report name.
+        old_negotiators (list): Negotiators hidden in the tables.
+        years (dict): Years of the FY data sheet's date columns (see
+            ``get_frame_years``); those it lacks are read from the sheet.
+        date (str): Date in the titles of the report's tables.
+        frames (dict): DataFrames of the data sheets by source name
+            (``"fy"``, ``"active"``), for the statistics tables to compute
+            from memory, and for the pivot tables of an openpyxl workbook
+            without the sheet; other sources are read from their sheet.
+    """
+    frames = frames or {}
+    spec = get_report_spec(name)
+    source = get_report_sources(wb, frames)
+    years = dict(years or {})
+    for table in spec["tables"]:
+        column_name = table.get("expand_latest_year")
+        if column_name and column_name not in years:
+            years[column_name] = get_worksheet_years(source(table["source"]), column_name)
+
+    parameters = {"old_negotiators": old_negotiators or [], "date": date}
+    plan = plan_report(spec, parameters, years)
+    ws_name = plan["sheet"]
+    ws = add_worksheet(wb, ws_name)
 
-    ####################################################################################################################################################
+    current_col = 1
+    for tables in plan["columns"]:
+        current_row = 1
+        column_width = 0
+        for table in tables:
+            arguments = table["arguments"]
+            if table["kind"] == "statistics":
+                logger.info(f"Creating statistics table: {arguments['pt_name']}")
+                arguments = {**arguments, "frame": frames.get(table["source"])}
+                build_table = statistics_table
+            else:
+                logger.info(f"Creating pivot table: {arguments['pt_name']}")
+                build_table = pivot_table
+            width, height = build_table(
+                wb,
+                source(table["source"]),
+                ws,
+                ws_name,
+                start_row=current_row,
+                start_col=current_col,
+                **arguments,
+            )
+            current_row += height + plan["spacing"]
+            column_width = max(column_width, width)
+        current_col += column_width + 1
 
-    current_row = 1
-    current_col = 13
-    seperation_of_pivot_tables = 2
-    pt_name = "Time to Assignment and Time to Completion Analysis by Negotiator"
-    pt_rows = [
-        "Negotiator",
-        "FE Date",
-        "Date Assigned",
-        "Time to Assignment",
-        "Time to Execution",
-    ]
-    pt_cols = []
-    pt_filters = []
-    pt_fields = [
-        ["Time to Assignment", "Average of TTA*", win32c.xlAverage, "0"],
-        ["Time to Execution", "Average of TTE*", win32c.xlAverage, "0"],
-    ]
-    pt_visible_rows = ["Negotiator"]
-
-    show_detail_items = {
-        "Negotiator": [
-            ("David WomoChil", False),
-            ("Jocelyn Phares", False),
-            ("Julie Bonasso", False),
-            ("Justin Miller", False),
-            ("Laken Dillon", False),
-            ("Matthew Nesmith", False),
-            ("Rachel Hanisch", False),
-            ("Stephanie Harrod", False),
-            ("Waynell Henson", False),
-        ]
-    }
+    autofit_worksheet(ws)
 
-    footer_text = "* TTA = Time to Assignment, TTE = Time to Execution"
-    logger.info(f"Creating pivot table: {pt_name}")
-    prev_width, prev_height = pivot_table(
-        wb,
-        ws_sharepoint,
-        ws2,
-        ws2_name,
-        pt_name,
-        pt_rows,
-        pt_cols,
-        pt_filters,
-        pt_fields,
-        start_row=current_row,
-        start_col=current_col,
-        apply_grouping=True,
-        pt_visible_rows=pt_visible_rows,
-        footer_text=footer_text,
-        show_detail_items=show_detail_items,
-        visible_items=visible_items,
-    )
-    current_row += prev_height + seperation_of_pivot_tables
 
-    pt_name = "High Priority Assignment Analysis by Negotiator"
-    pt_rows = [
-        "Negotiator",
-        "FE Date",
-        "Date Assigned",
-        "Time to Assignment",
-        "Time to Execution",
-        "High Priority",
-    ]
-    pt_cols = []
-    pt_filters = []
-    pt_fields = [
-        ["#", "Sum of #", win32c.xlSum, "0"],
-        ["Time to Assignment", "Average of TTA*", win32c.xlAverage, "0"],
-        ["Time to Execution", "Average of TTE*", win32c.xlAverage, "0"],
-    ]
-    pt_visible_rows = ["Negotiator", "High Priority"]
-    footer_text = "* TTA = Time to Assignment, TTE = Time to Execution"
-
-    show_detail_items = {
-        "Negotiator": [
-            ("David WomoChil", False),
-            ("Jocelyn Phares", False),
-            ("Julie Bonasso", False),
-            ("Justin Miller", False),
-            ("Laken Dillon", False),
-            ("Matthew Nesmith", False),
-            ("Rachel Hanisch", False),
-            ("Stephanie Harrod", False),
-            ("Waynell Henson", False),
-        ]
-    }
+@timed_stage
+def create_caseload_analysis_ws(wb, date=None, old_negotiators=None):
+    """Add the caseload analysis sheet, dated ``date`` (default today), to ``wb``."""
+    if date is None:
+        date = datetime.today().strftime("%m/%d/%Y")
+    create_report_ws(wb, "caseload_analysis", old_negotiators=old_negotiators, date=date)
 
-    # show_detail_items =
-    logger.info(f"Creating pivot table: {pt_name}")
-    prev_width, prev_height = pivot_table(
-        wb,
-        ws_sharepoint,
-        ws2,
-        ws2_name,
-        pt_name,
-        pt_rows,
-        pt_cols,
-        pt_filters,
-        pt_fields,
-        start_row=current_row,
-        start_col=current_col,
-        apply_grouping=True,
-        pt_visible_rows=pt_visible_rows,
-        footer_text=footer_text,
-        show_detail_items=show_detail_items,
-        visible_items=visible_items,
-    )
-    current_row += prev_height + seperation_of_pivot_tables
 
-    pt_name = "Average Time to Execution by Agreement Type"
-    pt_rows = [
-        "Negotiator",
-        "FE Date",
-        "Date Assigned",
-        "Time to Execution",
-        "Agreement Type",
-    ]
-    pt_cols = []
-    pt_filters = []
-    pt_fields = [["Time to Execution", "Average of TTE*", win32c.xlAverage, "0"]]
-    pt_visible_rows = ["Agreement Type"]
-    footer_text = "* TTE = Time to Execution"
-
-    sorting_items = {"Agreement Type": ("Average of TTE*", win32c.xlAscending)}
-
-    logger.info(f"Creating pivot table: {pt_name}")
-    prev_width, prev_height = pivot_table(
-        wb,
-        ws_sharepoint,
-        ws2,
-        ws2_name,
-        pt_name,
-        pt_rows,
-        pt_cols,
-        pt_filters,
-        pt_fields,
-        start_row=current_row,
-        start_col=current_col,
-        apply_grouping=True,
-        pt_visible_rows=pt_visible_rows,
-        footer_text=footer_text,
-        show_detail_items=show_detail_items,
-        visible_items=visible_items,
-        sorting_items=sorting_items,
-    )
-    current_row += prev_height
+@timed_stage
+def create_fy_analytics_ws(wb, old_negotiators=None, years=None):
+    """
+    Add the FY analytics sheet to ``wb``.
 
-    ws2.Columns.AutoFit()
+    ``years`` maps "FE Date" and "Date Assigned" to the years of the FY data
+    sheet (see ``get_frame_years``), computed from the DataFrame it was
+    written from; columns it lacks are read from the sheet.
+    """
+    logger.info(f"Unselecting old negotiators: {old_negotiators}")
+    create_report_ws(wb, "fy_analytics", old_negotiators=old_negotiators, years=years)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,154 @@
+import logging
+
+from autoexcel.reports import get_report_spec, report_requirements
+
+logger = logging.getLogger(__name__)
+
+# Data sheet outputs, by the source names of the report specs
+DATA_OUTPUTS = ("fy", "active")
+
+# Reports fy_analysis builds, in build order (each sheet goes in front)
+REPORT_OUTPUTS = ("time_statistics", "fy_analytics", "caseload_analysis")
+
+# Outputs of a run that does not name them: the time statistics sheet is only
+# built on request
+DEFAULT_OUTPUTS = DATA_OUTPUTS + ("fy_analytics", "caseload_analysis")
+
+# Raw columns every run reads: the assigned-date and negotiator filters and
+# the status that selects the active assignments
+FILTER_COLUMNS = ("Date Assigned", "Negotiator", "Status")
+
+# Columns preprocess_data derives, in the order it adds them, with the
+# columns each is computed from
+DERIVED_COLUMNS = {
+    "Time to Assignment": ("Date Received at OSP", "Date Assigned"),
+    "Time to Execution": ("Date Assigned", "FE Date"),
+    "Today's Date": (),
+    "Time Since Assignment": ("Date Assigned", "Status", "Today's Date", "is_SharePointError"),
+    "Delinquency": ("Time Since Assignment", "is_SharePointError"),
+    "is_SharePointError": ("Time to Execution", "Status"),
+}
+
+
+def column_closure(columns):
+    """``columns`` with every column they are derived from, recursively."""
+    closure = set()
+    pending = list(columns)
+    while pending:
+        name = pending.pop()
+        if name not in closure:
+            closure.add(name)
+            pending.extend(DERIVED_COLUMNS.get(name, ()))
+    return closure
+
+
+def derived_columns(columns=None):
+    """Derived columns needed for ``columns`` (default all), in the order they are added."""
+    if columns is None:
+        return list(DERIVED_COLUMNS)
+    closure = column_closure(columns)
+    return [name for name in DERIVED_COLUMNS if name in closure]
+
+
+def raw_columns(columns):
+    """Raw export columns needed for ``columns``, the filter columns included."""
+    closure = column_closure(list(columns) + list(FILTER_COLUMNS))
+    return sorted(name for name in closure if name not in DERIVED_COLUMNS)
+
+
+def output_names(sheet_names=None):
+    """
+    Output names by their accepted spellings.
+
+    Outputs are named by their report or source name (``"caseload_analysis"``,
+    ``"active"``) or their sheet name (``"Caseload Analysis"``, ``"Active
+    Assignments"``), in any case, with spaces, dashes or underscores.
+    """
+    names = {}
+
+    def add(spelling, name):
+        names[spelling.lower().replace(" ", "_").replace("-", "_")] = name
+
+    for name in DATA_OUTPUTS + REPORT_OUTPUTS:
+        add(name, name)
+    for name in REPORT_OUTPUTS:
+        add(get_report_spec(name)["sheet"], name)
+    for source, sheet_name in (sheet_names or {}).items():
+        add(sheet_name, source)
+    return names
+
+
+def resolve_outputs(outputs=None, sheet_names=None):
+    """
+    Canonical names of the requested ``outputs``, in build order.
+
+    Args:
+        outputs (list, optional): Output names (see ``output_names``).
+            Defaults to ``DEFAULT_OUTPUTS``, every data sheet and report but
+            the time statistics.
+        sheet_names (dict): Data sheet names by source name.
+
+    Raises:
+        ValueError: For an unknown output name.
+    """
+    if outputs is None:
+        return list(DEFAULT_OUTPUTS)
+    if isinstance(outputs, str):
+        outputs = [outputs]
+    names = output_names(sheet_names)
+    requested = set()
+    for output in outputs:
+        name = names.get(str(output).lower().replace(" ", "_").replace("-", "_"))
+        if name is None:
+            expected = sorted(set(names.values()))
+            raise ValueError(f"Unknown output {output!r}, expected one of {expected}")
+        requested.add(name)
+    return [name for name in DATA_OUTPUTS + REPORT_OUTPUTS if name in requested]
+
+
+def plan_outputs(outputs=None, sheet_names=None, pivot_sheets=True):
+    """
+    Minimal work of a run producing ``outputs``.
+
+    Data sheet outputs need every column. Reports need the columns of their
+    tables (see ``autoexcel.reports.report_requirements``) and, with
+    ``pivot_sheets`` (Excel builds PivotTables over a sheet), a data sheet of
+    those columns for each pivot source. Otherwise their sources come from
+    memory and no data sheet is written.
+
+    Returns:
+        dict: ``outputs`` (canonical names), ``reports`` (in build order),
+        ``sheets`` (``{source: columns}`` of the data sheets to write, None
+        for every column), ``frames`` (sources the reports read from memory),
+        ``derived`` (the derived columns to compute, None for all) and
+        ``usecols`` (the raw columns to read, None for all).
+    """
+    outputs = resolve_outputs(outputs, sheet_names)
+    reports = [name for name in outputs if name in REPORT_OUTPUTS]
+    sheets = {source: None for source in outputs if source in DATA_OUTPUTS}
+    frames = set()
+    columns = set()
+    for name in reports:
+        for source, requirement in report_requirements(get_report_spec(name)).items():
+            columns |= requirement["columns"]
+            if source in sheets and sheets[source] is None:
+                continue
+            if requirement["sheet"] and pivot_sheets:
+                sheets[source] = sorted(set(sheets.get(source) or ()) | requirement["columns"])
+            else:
+                frames.add(source)
+
+    every_column = any(sheet_columns is None for sheet_columns in sheets.values())
+    plan = {
+        "outputs": outputs,
+        "reports": reports,
+        "sheets": {source: sheets[source] for source in DATA_OUTPUTS if source in sheets},
+        "frames": sorted(frames),
+        "derived": None if every_column else derived_columns(columns),
+        "usecols": None if every_column else raw_columns(columns),
+    }
+    logger.debug(
+        f"Planned outputs {outputs}: sheets {plan['sheets']}, frames {plan['frames']}, "
+        f"derived columns {plan['derived']}, raw columns {plan['usecols']}"
+    )
+    return plan
@@ -0,0 +1,673 @@
+import logging
+import weakref
+from copy import copy
+
+import numpy as np
+import pandas as pd
+from openpyxl.styles import Alignment, Border, Font, Side
+from openpyxl.utils import get_column_letter
+
+from autoexcel.writers import EXCEL_DATE_FORMAT
+
+logger = logging.getLogger(__name__)
+
+# Excel enumeration values (XlConsolidationFunction, XlSortOrder). They are the
+# values win32com exposes as constants, so both pivot_table backends accept them.
+XL_SUM = -4157
+XL_AVERAGE = -4106
+XL_COUNT = -4112
+XL_MAX = -4136
+XL_MIN = -4139
+XL_ASCENDING = 1
+XL_DESCENDING = 2
+
+BLANK_ITEM = "(blank)"
+ROW_LABELS = "Row Labels"
+COLUMN_LABELS = "Column Labels"
+GRAND_TOTAL = "Grand Total"
+DATE_GROUP_KEYS = ("date", "months", "years")
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+TITLE_FONT = Font(name="Aptos Narrow", size=12, bold=True, color="FF008000")
+FOOTER_FONT = Font(name="Aptos Narrow", size=11)
+THIN_BLACK = Side(style="thin", color="FF000000")
+CELL_BORDER = Border(left=THIN_BLACK, right=THIN_BLACK, top=THIN_BLACK, bottom=THIN_BLACK)
+
+# Source sheets read into frames, kept while the worksheet is alive
+source_frames = weakref.WeakKeyDictionary()
+
+# Pivot fields, data values and grouped totals computed over each source frame,
+# by id() of the frame, kept while the frame is alive (see shared_results)
+frame_results = {}
+
+
+def source_frame(ws1):
+    """
+    Pivot source data as a DataFrame.
+
+    Args:
+        ws1 (pd.DataFrame or Worksheet): The source frame, or an openpyxl
+            worksheet with the header in row 1. Worksheets are read once.
+    """
+    if isinstance(ws1, pd.DataFrame):
+        return ws1
+    if ws1 not in source_frames:
+        rows = ws1.iter_rows(values_only=True)
+        header = next(rows, ())
+        source_frames[ws1] = pd.DataFrame(list(rows), columns=list(header))
+    return source_frames[ws1]
+
+
+def shared_results(df):
+    """
+    Results computed over source frame ``df``, shared by every table built on it.
+
+    Tables on the same data reuse its pivot fields and any grouped totals
+    with the same keys, filters and data fields, so each is computed once.
+    Source frames are not modified once read.
+    """
+    key = id(df)
+    if key not in frame_results:
+        frame_results[key] = {}
+        weakref.finalize(df, frame_results.pop, key, None)
+    return frame_results[key]
+
+
+def item_sort_key(value):
+    """Excel's default item order: numbers and dates first, then text, case-insensitive."""
+    if isinstance(value, (bool, np.bool_)):
+        return (2, str(value).lower())
+    if isinstance(value, (int, float, np.number)):
+        return (0, float(value))
+    if isinstance(value, pd.Timestamp):
+        return (1, value.value)
+    return (2, str(value).lower())
+
+
+def blank_mask(values):
+    """Blank cells of a source column: missing values and, in text columns, empty strings."""
+    blank = values.isna().to_numpy()
+    if values.dtype == object or isinstance(values.dtype, pd.StringDtype):
+        blank = blank | (values == "").to_numpy(dtype=bool, na_value=False)
+    return blank
+
+
+def present_items(values, items):
+    """Pivot items of ``items`` that occur in source column ``values`` (``"(blank)"`` for blanks)."""
+    values = pd.Series(values)
+    blank = blank_mask(values)
+    labels = {str(value) for value in pd.unique(values[~blank])}
+    if blank.any():
+        labels.add(BLANK_ITEM)
+    return [item for item in items if str(item) in labels]
+
+
+def to_dates(values):
+    """A date column as a datetime64 Series, blank cells as NaT."""
+    values = pd.Series(values).reset_index(drop=True)
+    values = values.where(~blank_mask(values)).infer_objects()
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values)
+
+
+def field_items(values):
+    """
+    Pivot items of a source column as an ordered Categorical.
+
+    Blank cells (missing values and empty strings) become the ``"(blank)"``
+    item, which sorts last as in Excel.
+    """
+    values = pd.Series(values).reset_index(drop=True)
+    blank = blank_mask(values)
+    # Sort the distinct values only, then renumber the codes
+    codes, uniques = pd.factorize(values.where(~blank) if blank.any() else values)
+    order = sorted(range(len(uniques)), key=lambda i: item_sort_key(uniques[i]))
+    categories = [uniques[i] for i in order]
+    position = np.empty(len(uniques) + 1, dtype=np.int64)
+    position[order] = np.arange(len(order))
+    position[-1] = len(order)
+    if blank.any():
+        categories.append(BLANK_ITEM)
+    return pd.Categorical.from_codes(position[codes], categories=categories, ordered=True)
+
+
+def date_group_items(values):
+    """
+    Years, Months and day items of a date column, as Excel's AutoGroup makes them.
+
+    Returns:
+        tuple: ``(years, months, days)`` ordered Categoricals.
+    """
+    dates = to_dates(values)
+    # Label the distinct dates only
+    codes, uniques = pd.factorize(dates)
+    blank = codes < 0
+
+    def grouped(labels, categories):
+        present = set(labels)
+        categories = [c for c in categories if c in present]
+        position = {category: i for i, category in enumerate(categories)}
+        label_codes = np.array([position[label] for label in labels] + [len(categories)])
+        if blank.any():
+            categories.append(BLANK_ITEM)
+        return pd.Categorical.from_codes(label_codes[codes], categories=categories, ordered=True)
+
+    years = [str(year) for year in uniques.year]
+    months = [MONTHS[month - 1] for month in uniques.month]
+    days = [f"{day}-{month}" for day, month in zip(uniques.day, months)]
+    day_order = [f"{day}-{month}" for month in MONTHS for day in range(1, 32)]
+    return (
+        grouped(years, sorted(set(years))),
+        grouped(months, list(MONTHS)),
+        grouped(days, day_order),
+    )
+
+
+def groups_dates(name, values):
+    """Whether AutoGroup groups field ``name``: a date column whose name mentions a date."""
+    if not any(key in name.lower() for key in DATE_GROUP_KEYS):
+        return False
+    return pd.api.types.is_datetime64_any_dtype(pd.Series(values).infer_objects())
+
+
+def pivot_fields(df, names, apply_grouping):
+    """
+    Pivot fields available for ``names``, keyed by field name.
+
+    With ``apply_grouping``, date fields whose name mentions a date gain the
+    ``"Years (<field>)"`` and ``"Months (<field>)"`` fields and the field
+    itself holds the days, like Excel's AutoGroup. Fields that are not
+    source columns are skipped, as Excel skips them.
+    """
+    results = shared_results(df)
+    fields = {}
+    for name in names:
+        if name in fields or name not in df.columns:
+            continue
+        key = ("fields", name, bool(apply_grouping))
+        if key not in results:
+            values = df[name]
+            if apply_grouping and groups_dates(name, values):
+                years, months, days = date_group_items(values)
+                results[key] = {
+                    f"Years ({name})": years,
+                    f"Months ({name})": months,
+                    name: days,
+                }
+            else:
+                results[key] = {name: field_items(values)}
+        fields.update(results[key])
+    return fields
+
+
+def data_values(df, source_field, function):
+    """Per-row numbers and counts for one data field, ready to be grouped."""
+    results = shared_results(df)
+    key = ("values", source_field, function == XL_COUNT)
+    if key not in results:
+        values = df[source_field]
+        if function == XL_COUNT:
+            results[key] = (~blank_mask(values)).astype("float64"), np.ones(len(values))
+        else:
+            numbers = pd.to_numeric(values, errors="coerce").astype("float64").to_numpy()
+            results[key] = numbers, (~np.isnan(numbers)).astype("float64")
+    return results[key]
+
+
+def aggregate(values, counts, function):
+    """Finish a grouped sum, count, min or max into the data field's value."""
+    if function == XL_AVERAGE:
+        return values / counts if counts else "#DIV/0!"
+    if function in (XL_MAX, XL_MIN) and not counts:
+        return 0
+    return values
+
+
+def item_filters(visible_items, layout_fields):
+    """
+    Items of ``visible_items`` that filter a pivot table's data.
+
+    Excel only filters on fields in the table's layout: hidden items of any
+    other field have no effect and are left out.
+
+    Returns:
+        dict: ``{field: hidden item labels}`` of the layout fields hiding items.
+    """
+    filters = {}
+    for field_name, field_items in (visible_items or {}).items():
+        hidden = {str(item) for item, visible in field_items if not visible}
+        if hidden and field_name in layout_fields:
+            filters[field_name] = hidden
+    return filters
+
+
+def group_totals(frame, names, data_fields):
+    """
+    Grouped sums, counts, minima or maxima of a pivot table's data fields.
+
+    Args:
+        frame (pd.DataFrame): Item codes of the grouping fields (``k<field>``)
+            and per-row numbers and counts of the data fields (``v<j>``, ``n<j>``).
+        names (list): Fields to group by; no fields gives the grand total.
+        data_fields (list): The table's data fields.
+
+    Returns:
+        dict: Totals (``v<j>``, ``n<j>``) by tuple of item codes.
+    """
+    if not names:
+        totals = {}
+        for j, (_, _, function, _) in enumerate(data_fields):
+            if function in (XL_MAX, XL_MIN):
+                reduce = np.nanmax if function == XL_MAX else np.nanmin
+                v = frame[f"v{j}"].to_numpy()
+                totals[f"v{j}"] = reduce(v) if (~np.isnan(v)).any() else np.nan
+            else:
+                totals[f"v{j}"] = np.nansum(frame[f"v{j}"].to_numpy())
+            totals[f"n{j}"] = frame[f"n{j}"].sum()
+        return {(): totals}
+    how = {}
+    for j, (_, _, function, _) in enumerate(data_fields):
+        how[f"v{j}"] = {XL_MAX: "max", XL_MIN: "min"}.get(function, "sum")
+        how[f"n{j}"] = "sum"
+    result = frame.groupby([f"k{name}" for name in names], sort=False).agg(how)
+    return {
+        (key if isinstance(key, tuple) else (key,)): row
+        for key, row in zip(result.index, result[list(how)].to_dict("records"))
+    }
+
+
+def pivot_layout(
+    df,
+    pt_rows,
+    pt_cols,
+    pt_filters,
+    pt_fields,
+    apply_grouping=False,
+    pt_visible_rows=None,
+    visible_items=None,
+    show_detail_items=None,
+    sorting_items=None,
+):
+    """
+    Compute a pivot table's cells in Excel's compact layout.
+
+    Hidden ``visible_items`` filter the data only for fields in the layout,
+    collapsed ``show_detail_items`` hide their children, and items are sorted
+    ascending unless ``sorting_items`` sorts them by a data field, as in
+    Excel. Column fields are laid out flat, one column per item combination,
+    without column subtotals.
+
+    Returns:
+        dict: ``pages`` (``(field, selection)`` per page field), ``header``
+        (header rows), ``body`` (``(depth, label, values)`` per row, grand
+        total last), ``number_formats`` (per data field) and ``row_depth``
+        (number of row fields).
+    """
+    if pt_visible_rows is None:
+        pt_visible_rows = pt_rows
+    fields = pivot_fields(
+        df, list(pt_filters) + list(pt_rows) + list(pt_cols) + list(pt_visible_rows), apply_grouping
+    )
+    row_fields = [f for f in pt_visible_rows if f in fields]
+    col_fields = [f for f in pt_cols if f in fields]
+    page_fields = [f for f in pt_filters if f in fields]
+    data_fields = [f for f in pt_fields if f[0] in df.columns]
+    for name in set(pt_visible_rows) - set(fields):
+        logger.debug(f"Could not set visible row: {name}")
+
+    hidden = item_filters(visible_items, row_fields + col_fields + page_fields)
+    collapsed = {
+        field_name: {str(item) for item, show in field_items if not show}
+        for field_name, field_items in (show_detail_items or {}).items()
+    }
+
+    # Grouped totals are shared with the other tables on the same data that
+    # group by the same keys with the same filters and data fields
+    results = shared_results(df)
+    filter_key = tuple(sorted((name, tuple(sorted(items))) for name, items in hidden.items()))
+    data_key = tuple((source_field, function) for source_field, _, function, _ in data_fields)
+
+    def masked_values():
+        key = ("masked", bool(apply_grouping), filter_key, data_key)
+        if key not in results:
+            # Hidden items filter the data of the fields in the layout
+            mask = np.ones(len(df), dtype=bool)
+            for field_name, items in hidden.items():
+                categories = fields[field_name].categories
+                codes = [i for i, item in enumerate(categories) if str(item) in items]
+                mask &= ~np.isin(fields[field_name].codes, codes)
+            columns = {}
+            for j, (source_field, _, function, _) in enumerate(data_fields):
+                values, counts = data_values(df, source_field, function)
+                columns[f"v{j}"] = values[mask]
+                columns[f"n{j}"] = counts[mask]
+            results[key] = mask, columns
+        return results[key]
+
+    # One groupby per row depth gives every item's subtotal
+    def grouped(names):
+        key = ("totals", tuple(names), bool(apply_grouping), filter_key, data_key)
+        if key not in results:
+            mask, columns = masked_values()
+            keys = {f"k{name}": np.asarray(fields[name].codes)[mask] for name in names}
+            results[key] = group_totals(pd.DataFrame({**keys, **columns}), names, data_fields)
+        return results[key]
+
+    def cell_values(totals):
+        if totals is None:
+            return [None] * len(data_fields)
+        return [
+            aggregate(totals[f"v{j}"], totals[f"n{j}"], function)
+            for j, (_, _, function, _) in enumerate(data_fields)
+        ]
+
+    depth_totals = [grouped(row_fields[:depth]) for depth in range(len(row_fields) + 1)]
+    col_keys = []
+    if col_fields:
+        col_totals = [grouped(row_fields[:depth] + col_fields) for depth in range(len(row_fields) + 1)]
+        col_keys = sorted({key[-len(col_fields):] for key in col_totals[0]})
+
+    children = [{} for _ in row_fields]
+    for depth, name in enumerate(row_fields):
+        for key in depth_totals[depth + 1]:
+            children[depth].setdefault(key[:-1], []).append(key[-1])
+
+    captions = [caption for _, caption, _, _ in data_fields]
+
+    def sort_children(depth, codes, prefix):
+        name = row_fields[depth]
+        if sorting_items and name in sorting_items:
+            caption, order = sorting_items[name]
+            if caption in captions:
+                j = captions.index(caption)
+
+                def by_value(code):
+                    value = cell_values(depth_totals[depth + 1][prefix + (code,)])[j]
+                    return (isinstance(value, str), value if not isinstance(value, str) else 0)
+
+                return sorted(codes, key=by_value, reverse=order == XL_DESCENDING)
+        return sorted(codes)
+
+    # Rows of the compact layout: (depth, label, key)
+    layout = []
+
+    def walk(depth, prefix):
+        if depth == len(row_fields):
+            return
+        name = row_fields[depth]
+        categories = fields[name].categories
+        for code in sort_children(depth, children[depth].get(prefix, []), prefix):
+            label = categories[code]
+            layout.append((depth, label, prefix + (code,)))
+            if str(label) not in collapsed.get(name, set()):
+                walk(depth + 1, prefix + (code,))
+
+    walk(0, ())
+
+    # Header rows and the value columns of each layout row
+    n_data = len(data_fields)
+    if col_fields:
+        col_labels = [
+            " - ".join(str(fields[name].categories[code]) for name, code in zip(col_fields, key))
+            for key in col_keys
+        ]
+        if n_data == 1:
+            header_rows = [
+                [captions[0], COLUMN_LABELS] + [None] * len(col_keys),
+                [ROW_LABELS] + col_labels + [GRAND_TOTAL],
+            ]
+        else:
+            header_rows = [
+                [None, COLUMN_LABELS] + [None] * ((len(col_keys) + 1) * n_data - 1),
+                [None]
+                + [label if j == 0 else None for label in col_labels for j in range(n_data)]
+                + [f"Total {caption}" for caption in captions],
+                [ROW_LABELS] + captions * len(col_keys) + [None] * n_data,
+            ]
+    else:
+        header_rows = [[ROW_LABELS] + captions]
+
+    def row_values(key):
+        values = []
+        for col_key in col_keys:
+            values += cell_values(col_totals[len(key)].get(key + col_key))
+        return values + cell_values(depth_totals[len(key)].get(key))
+
+    body = [(depth, label, row_values(key)) for depth, label, key in layout]
+    body.append((0, GRAND_TOTAL, row_values(())))
+
+    pages = []
+    for name in page_fields:
+        shown = [c for c in fields[name].categories if str(c) not in hidden.get(name, set())]
+        if len(shown) == len(fields[name].categories):
+            selection = "(All)"
+        elif len(shown) == 1:
+            selection = shown[0]
+        else:
+            selection = "(Multiple Items)"
+        pages.append((name, selection))
+
+    return {
+        "pages": pages,
+        "header": header_rows,
+        "body": body,
+        "number_formats": [number_format for _, _, _, number_format in data_fields],
+        "row_depth": len(row_fields),
+    }
+
+
+def pivot_table(
+    wb,
+    ws1,
+    pt_ws,
+    ws_name,
+    pt_name,
+    pt_rows,
+    pt_cols,
+    pt_filters,
+    pt_fields,
+    start_row=1,
+    start_col=1,
+    apply_grouping=False,
+    pt_visible_rows=None,
+    footer_text=None,
+    visible_items=None,
+    show_detail_items=None,
+    sorting_items=None,
+    header_size=(2, 0),
+):
+    """
+    Headless counterpart of ``autoexcel.main.pivot_table``.
+
+    Computes the pivot with pandas groupby (see ``pivot_layout``) and writes
+    it to ``pt_ws`` as a static table in Excel's compact layout, with the
+    same title header, borders and footer as the COM version, so reports can
+    be built without Excel. Arguments are those of
+    ``autoexcel.main.pivot_table``; ``wb`` is an openpyxl workbook, ``ws1``
+    the source worksheet or DataFrame and ``pt_ws`` the target worksheet.
+    ``ws_name`` is unused.
+
+    Returns:
+        tuple: ``(width, height)`` of the table, title and footer included.
+    """
+    layout = pivot_layout(
+        source_frame(ws1),
+        pt_rows,
+        pt_cols,
+        pt_filters,
+        pt_fields,
+        apply_grouping=apply_grouping,
+        pt_visible_rows=pt_visible_rows,
+        visible_items=visible_items,
+        show_detail_items=show_detail_items,
+        sorting_items=sorting_items,
+    )
+    return write_layout(
+        pt_ws,
+        layout,
+        pt_name,
+        start_row=start_row,
+        start_col=start_col,
+        pt_loc_row=start_row + len(pt_filters) + header_size[0],
+        footer_text=footer_text,
+    )
+
+
+def cell_styler():
+    """
+    Bordered table cell styling that builds each distinct style once.
+
+    Assigning fonts and borders looks them up in the workbook's style tables
+    every time; cells styled like an earlier cell copy its style ids instead.
+    """
+    styles = {}
+
+    def style(cell, bold=False, indent=None, number_format=None):
+        key = (bold, indent, number_format)
+        if key in styles:
+            cell._style = copy(styles[key])
+            return
+        cell.font = Font(bold=bold)
+        cell.border = CELL_BORDER
+        if indent is not None:
+            cell.alignment = Alignment(horizontal="left", indent=indent)
+        if number_format is not None:
+            cell.number_format = number_format
+        styles[key] = copy(cell._style)
+
+    return style
+
+
+def write_layout(pt_ws, layout, pt_name, start_row, start_col, pt_loc_row, footer_text=None):
+    """
+    Write a ``pivot_layout`` to ``pt_ws`` with its title and footer.
+
+    The table's header row is ``pt_loc_row``; the title is merged over the
+    two rows from ``start_row``.
+
+    Returns:
+        tuple: ``(width, height)`` of the table, title and footer included.
+    """
+    header_rows = layout["header"]
+    body = layout["body"]
+    number_formats = layout["number_formats"]
+    n_data = len(number_formats)
+
+    width = len(header_rows[0])
+    height = len(header_rows) + len(body)
+
+    style = cell_styler()
+
+    # Page fields sit above the table
+    pages = layout["pages"]
+    for i, (name, selection) in enumerate(pages):
+        row = pt_loc_row - len(pages) + i
+        for offset, value in enumerate((name, selection)):
+            cell = pt_ws.cell(row=row, column=start_col + offset, value=value)
+            style(cell, bold=offset == 0)
+
+    row = pt_loc_row
+    for values in header_rows:
+        for offset, value in enumerate(values):
+            cell = pt_ws.cell(row=row, column=start_col + offset, value=value)
+            style(cell, bold=True)
+        row += 1
+
+    for depth, label, values in body:
+        is_parent = depth < layout["row_depth"] - 1 or label == GRAND_TOTAL
+        cell = pt_ws.cell(row=row, column=start_col, value=label)
+        is_date = isinstance(label, (pd.Timestamp, np.datetime64)) or hasattr(label, "strftime")
+        style(
+            cell,
+            bold=is_parent,
+            indent=depth,
+            number_format=EXCEL_DATE_FORMAT if is_date else None,
+        )
+        for offset, value in enumerate(values, start=1):
+            if isinstance(value, np.generic):
+                value = value.item()
+            if isinstance(value, float) and np.isnan(value):
+                value = None
+            cell = pt_ws.cell(row=row, column=start_col + offset, value=value)
+            style(cell, bold=is_parent, number_format=number_formats[(offset - 1) % n_data])
+        row += 1
+
+    logger.debug(f"Pivot table dim: {width} x {height}")
+
+    write_title(pt_ws, pt_name, start_row, start_col, width)
+    height += 2
+
+    if footer_text:
+        write_footer(pt_ws, footer_text, row, start_col, width)
+        height += 1
+
+    return (width, height)
+
+
+def write_title(pt_ws, title, start_row, start_col, width):
+    """Write a table's title over the two rows from ``start_row``, merged across its width."""
+    pt_ws.merge_cells(
+        start_row=start_row,
+        start_column=start_col,
+        end_row=start_row + 1,
+        end_column=start_col + width - 1,
+    )
+    pt_ws.cell(row=start_row, column=start_col, value=title)
+    for cells in pt_ws.iter_rows(
+        min_row=start_row,
+        max_row=start_row + 1,
+        min_col=start_col,
+        max_col=start_col + width - 1,
+    ):
+        for cell in cells:
+            cell.font = TITLE_FONT
+            cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+            cell.border = CELL_BORDER
+
+
+def write_footer(pt_ws, footer_text, row, start_col, width):
+    """Write a table's footer in ``row``, merged across its width."""
+    pt_ws.merge_cells(
+        start_row=row, start_column=start_col, end_row=row, end_column=start_col + width - 1
+    )
+    pt_ws.cell(row=row, column=start_col, value=footer_text)
+    for col in range(start_col, start_col + width):
+        cell = pt_ws.cell(row=row, column=col)
+        cell.font = FOOTER_FONT
+        cell.alignment = Alignment(horizontal="left")
+        cell.border = CELL_BORDER
+
+
+def autofit_columns(ws, min_width=8.43, padding=2):
+    """
+    Fit column widths to their contents, like Excel's ``Columns.AutoFit``.
+
+    Merged cells (the table titles and footers) are ignored, as in Excel.
+    """
+    merged = set()
+    for cell_range in ws.merged_cells.ranges:
+        for row in ws.iter_rows(
+            min_row=cell_range.min_row,
+            max_row=cell_range.max_row,
+            min_col=cell_range.min_col,
+            max_col=cell_range.max_col,
+        ):
+            merged.update(cell.coordinate for cell in row)
+
+    widths = {}
+    for row in ws.iter_rows():
+        for cell in row:
+            if cell.value is None or cell.coordinate in merged:
+                continue
+            if hasattr(cell.value, "strftime"):
+                length = len(EXCEL_DATE_FORMAT)
+            elif isinstance(cell.value, float):
+                length = len(f"{cell.value:.0f}")
+            else:
+                length = len(str(cell.value))
+            length += cell.alignment.indent or 0
+            widths[cell.column] = max(widths.get(cell.column, 0), length)
+
+    for column, length in widths.items():
+        ws.column_dimensions[get_column_letter(column)].width = max(min_width, length + padding)
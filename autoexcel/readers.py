@@ -0,0 +1,140 @@
+import importlib.util
+import logging
+from collections import defaultdict
+
+import pandas as pd
+from openpyxl import load_workbook
+
+logger = logging.getLogger(__name__)
+
+READER_ENGINES = ("openpyxl", "openpyxl_readonly", "calamine")
+
+
+def available_engines():
+    """Reader engines usable in this environment, in ``READER_ENGINES`` order."""
+    engines = ["openpyxl", "openpyxl_readonly"]
+    if importlib.util.find_spec("python_calamine") is not None:
+        engines.append("calamine")
+    return engines
+
+
+def resolve_engine(engine="openpyxl"):
+    """
+    Resolve ``engine`` to a concrete reader engine.
+
+    None is pandas' own openpyxl parser, the default. The faster engines are
+    opt-in: ``"auto"`` picks calamine, a native (Rust) parser, when
+    python-calamine is installed and otherwise openpyxl in read-only streaming
+    mode. See ``benchmarks/readers.py`` for the measurements.
+    """
+    if engine is None:
+        return "openpyxl"
+    if engine == "auto":
+        return "calamine" if "calamine" in available_engines() else "openpyxl_readonly"
+    if engine not in READER_ENGINES:
+        raise ValueError(
+            f"Unknown reader engine {engine!r}, expected one of {READER_ENGINES}"
+        )
+    if engine not in available_engines():
+        raise ImportError(f"The {engine} reader engine needs python-calamine installed")
+    return engine
+
+
+def read_excel(path, engine="openpyxl", usecols=None, dtype=None, sheet_name=0):
+    """
+    Read one worksheet into a DataFrame with a selectable reader engine.
+
+    Args:
+        path (str): Path to the Excel file.
+        engine (str): ``"openpyxl"``, ``"openpyxl_readonly"``, ``"calamine"``
+            or ``"auto"`` (see ``resolve_engine``).
+        usecols (list, optional): Header names to keep. Names missing from the
+            sheet are ignored. Defaults to every column.
+        dtype (dict, optional): Per-column dtype hints applied while reading.
+        sheet_name (str or int): Worksheet name or index.
+
+    Returns:
+        pd.DataFrame: The worksheet data, first row as header.
+    """
+    engine = resolve_engine(engine)
+    logger.debug(f"Reading {path} with the {engine} engine")
+
+    if engine == "openpyxl_readonly":
+        return read_excel_readonly(path, usecols=usecols, dtype=dtype, sheet_name=sheet_name)
+
+    if usecols is not None:
+        keep = set(usecols)
+        usecols = lambda column: column in keep  # noqa: E731
+    return pd.read_excel(
+        path, sheet_name=sheet_name, engine=engine, usecols=usecols, dtype=dtype
+    )
+
+
+def header_names(header):
+    """
+    Column names of a header row, as ``pd.read_excel`` gives them.
+
+    Blank headers become ``"Unnamed: <position>"`` and repeated names get a
+    ``.1``, ``.2``, ... suffix (skipping names the header already has), named
+    columns first, so no column is lost.
+    """
+    names = [name if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+    unnamed = [i for i, name in enumerate(header) if name is None]
+    counts = defaultdict(int)
+    for i in [i for i in range(len(names)) if header[i] is not None] + unnamed:
+        name = names[i]
+        count = counts[name]
+        while count > 0:
+            counts[names[i]] = count + 1
+            name = f"{names[i]}.{count}"
+            count = count + 1 if name in names else counts[name]
+        names[i] = name
+        counts[name] = count + 1
+    return names
+
+
+def read_excel_readonly(path, usecols=None, dtype=None, sheet_name=0):
+    """
+    Stream a worksheet with openpyxl in read-only mode.
+
+    Rows are pulled as plain values and only the ``usecols`` columns are kept,
+    so no cell objects are built for the rest of the sheet. Columns are named
+    as pandas names them (see ``header_names``).
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        rows = ws.iter_rows(values_only=True)
+        names = header_names(next(rows, ()))
+        keep = [
+            i for i, name in enumerate(names) if usecols is None or name in usecols
+        ]
+
+        columns = [[] for _ in keep]
+        n_rows = 0
+        last_non_empty = 0
+        for row in rows:
+            n_rows += 1
+            empty = True
+            for values, i in zip(columns, keep):
+                value = row[i] if i < len(row) else None
+                values.append(value)
+                if value is not None:
+                    empty = False
+            if not empty:
+                last_non_empty = n_rows
+    finally:
+        wb.close()
+
+    # Trailing blank rows are dropped, as pandas does
+    df = pd.DataFrame(
+        {names[i]: values[:last_non_empty] for values, i in zip(columns, keep)}
+    )
+    df = df.infer_objects()
+    # Match pandas, which reads fully blank columns as float NaN
+    blank = [col for col in df.columns if df[col].dtype == object and df[col].isna().all()]
+    if blank:
+        df = df.astype({col: "float64" for col in blank})
+    if dtype:
+        df = df.astype({col: typ for col, typ in dtype.items() if col in df.columns})
+    return df
@@ -0,0 +1,246 @@
+import logging
+
+from autoexcel import config
+from autoexcel.pivot import (
+    XL_ASCENDING,
+    XL_AVERAGE,
+    XL_COUNT,
+    XL_DESCENDING,
+    XL_MAX,
+    XL_MIN,
+    XL_SUM,
+    item_filters,
+)
+
+logger = logging.getLogger(__name__)
+
+# Report spec names of data field functions and sort orders
+FUNCTIONS = {
+    "sum": XL_SUM,
+    "average": XL_AVERAGE,
+    "count": XL_COUNT,
+    "max": XL_MAX,
+    "min": XL_MIN,
+}
+SORT_ORDERS = {"ascending": XL_ASCENDING, "descending": XL_DESCENDING}
+
+# Rows between the tables of a column, unless the report sets ``spacing``
+SPACING = 2
+
+
+def get_report_spec(name):
+    """
+    Report ``name`` from ``autoexcel_config.reports``.
+
+    Returns:
+        dict: The report's ``sheet``, ``spacing``, report-level ``hide`` and
+        ``tables`` specs.
+
+    Raises:
+        KeyError: If no report ``name`` is configured.
+    """
+    settings = None
+    if config.autoexcel_config is not None and config.autoexcel_config.reports is not None:
+        settings = config.autoexcel_config.reports[name]
+    if settings is None:
+        raise KeyError(f"Report {name!r} is not defined in autoexcel_config.reports")
+    return settings.to_dict()
+
+
+def hidden_items(hide, parameters):
+    """``visible_items`` of a ``hide`` spec; a parameter name stands for its list of items."""
+    visible_items = {}
+    for field_name, items in (hide or {}).items():
+        if isinstance(items, str):
+            items = parameters.get(items) or []
+        if items:
+            visible_items[field_name] = [(item, False) for item in items]
+    return visible_items
+
+
+def report_requirements(spec):
+    """
+    Source columns report ``spec`` reads, and whether it needs the data sheets.
+
+    Pivot tables read their row, column, filter and data fields from their
+    source sheet; statistics tables their row fields and ``fields``, which
+    can come from memory. Hidden items only filter fields in a table's
+    layout, so they add no columns.
+
+    Returns:
+        dict: ``{source: {"columns": set, "sheet": bool}}``; ``sheet`` is set
+        when a pivot table is built over the source.
+    """
+    requirements = {}
+    for table in spec["tables"]:
+        columns = set(table.get("rows") or [])
+        if "statistics" in table:
+            columns.update(table["fields"])
+        else:
+            columns.update(table.get("columns") or [])
+            columns.update(table.get("filters") or [])
+            columns.update(value[0] for value in table["values"])
+            if table.get("expand_latest_year"):
+                columns.add(table["expand_latest_year"])
+        requirement = requirements.setdefault(table["source"], {"columns": set(), "sheet": False})
+        requirement["columns"] |= columns
+        requirement["sheet"] |= "statistics" not in table
+    return requirements
+
+
+def table_hide(spec, report_hide=None):
+    """``hide`` spec of table ``spec``: the report's, updated with the table's own."""
+    return {**(report_hide or {}), **(spec.get("hide") or {})}
+
+
+def table_arguments(spec, report_hide=None, parameters=None, years=None):
+    """
+    ``pivot_table`` keyword arguments of table ``spec`` (see ``autoexcel_config.reports``).
+
+    Args:
+        spec (dict): The table spec.
+        report_hide (dict): Items hidden in every table of the report.
+        parameters (dict): Run parameters: lists of items a ``hide`` spec
+            names (``old_negotiators``) and values the title formats (``date``).
+        years (dict): Year labels of the date fields ``expand_latest_year``
+            names.
+    """
+    parameters = parameters or {}
+    years = years or {}
+
+    show_detail_items = {
+        field_name: [(item, False) for item in items]
+        for field_name, items in (spec.get("collapse") or {}).items()
+    }
+    field_name = spec.get("expand_latest_year")
+    if field_name:
+        field_years = years.get(field_name, set())
+        latest = str(max((int(year) for year in field_years), default=0))
+        show_detail_items[f"Years ({field_name})"] = [
+            (str(year), year == latest) for year in field_years
+        ]
+
+    return {
+        "pt_name": spec["title"].format(**parameters),
+        "pt_rows": list(spec.get("rows") or []),
+        "pt_cols": list(spec.get("columns") or []),
+        "pt_filters": list(spec.get("filters") or []),
+        "pt_fields": [
+            [field, caption, FUNCTIONS[function], number_format]
+            for field, caption, function, number_format in spec["values"]
+        ],
+        "apply_grouping": bool(spec.get("group_dates")),
+        "pt_visible_rows": spec.get("visible_rows"),
+        "footer_text": spec.get("footer"),
+        "visible_items": hidden_items(table_hide(spec, report_hide), parameters),
+        "show_detail_items": show_detail_items or None,
+        "sorting_items": {
+            field_name: (caption, SORT_ORDERS[order])
+            for field_name, (caption, order) in (spec.get("sort") or {}).items()
+        }
+        or None,
+    }
+
+
+def statistics_arguments(spec, report_hide=None, parameters=None):
+    """
+    ``statistics_table`` keyword arguments of a statistics table ``spec``.
+
+    A statistics table names the numeric ``fields`` described by the items
+    of its ``rows`` and the ``statistics`` computed (see
+    ``autoexcel.stats.group_statistics``) in place of ``values``.
+    """
+    parameters = parameters or {}
+    arguments = {
+        "pt_name": spec["title"].format(**parameters),
+        "pt_rows": list(spec.get("rows") or []),
+        "fields": list(spec["fields"]),
+        "visible_items": hidden_items(table_hide(spec, report_hide), parameters),
+        "approximate": bool(spec.get("approximate_quantiles")),
+        "footer_text": spec.get("footer"),
+    }
+    if spec.get("statistics"):
+        arguments["statistics"] = list(spec["statistics"])
+    if spec.get("number_format"):
+        arguments["number_format"] = spec["number_format"]
+    return arguments
+
+
+def table_groupings(source, arguments):
+    """
+    Groupings a table aggregates its data fields over, one per row depth.
+
+    Tables with equal groupings on the same source share the aggregation
+    (see ``autoexcel.pivot.shared_results``).
+    """
+    rows = arguments["pt_visible_rows"]
+    if rows is None:
+        rows = arguments["pt_rows"]
+    cols = arguments["pt_cols"]
+    layout_fields = list(arguments["pt_filters"]) + list(rows) + list(cols)
+    filters = tuple(
+        sorted(
+            (name, tuple(sorted(items)))
+            for name, items in item_filters(arguments["visible_items"], layout_fields).items()
+        )
+    )
+    data = tuple((field, function) for field, _, function, _ in arguments["pt_fields"])
+    groupings = []
+    for depth in range(len(rows) + 1):
+        for keys in {tuple(rows[:depth]), tuple(rows[:depth]) + tuple(cols)}:
+            groupings.append((source, arguments["apply_grouping"], keys, filters, data))
+    return groupings
+
+
+def plan_report(spec, parameters=None, years=None):
+    """
+    Plan the tables of report ``spec`` and how they share aggregations.
+
+    Tables are grouped by column (see ``autoexcel_config.reports``) in spec
+    order. Their positions follow from the sizes of the tables built before
+    them, so the plan only fixes the order. Tables with ``statistics`` are
+    statistics tables (see ``statistics_arguments``), the others pivot tables.
+
+    Returns:
+        dict: ``sheet``, ``spacing``, ``columns`` (per column, the tables as
+        ``{"source", "kind", "arguments"}``), ``fields`` (for each source field
+        encoding, the titles of the tables using it) and ``groupings`` (the
+        same for each distinct grouping).
+    """
+    columns = {}
+    fields = {}
+    groupings = {}
+    for table in spec["tables"]:
+        source = table["source"]
+        if "statistics" in table:
+            kind = "statistics"
+            arguments = statistics_arguments(table, spec.get("hide"), parameters)
+            layout_fields, apply_grouping = arguments["pt_rows"], False
+        else:
+            kind = "pivot"
+            arguments = table_arguments(table, spec.get("hide"), parameters, years)
+            layout_fields = arguments["pt_rows"] + arguments["pt_cols"] + arguments["pt_filters"]
+            apply_grouping = arguments["apply_grouping"]
+            for grouping in table_groupings(source, arguments):
+                groupings.setdefault(grouping, []).append(arguments["pt_name"])
+        columns.setdefault(table.get("column", 1), []).append(
+            {"source": source, "kind": kind, "arguments": arguments}
+        )
+        for name in dict.fromkeys(layout_fields):
+            fields.setdefault((source, name, apply_grouping), []).append(arguments["pt_name"])
+
+    n_uses = sum(len(titles) for titles in fields.values())
+    n_shared = sum(len(titles) > 1 for titles in groupings.values())
+    logger.debug(
+        f"Planned {len(spec['tables'])} tables in {len(columns)} columns: "
+        f"{len(fields)} field encodings for {n_uses} uses, "
+        f"{len(groupings)} groupings, {n_shared} shared"
+    )
+    spacing = spec.get("spacing")
+    return {
+        "sheet": spec["sheet"],
+        "spacing": SPACING if spacing is None else spacing,
+        "columns": [columns[column] for column in sorted(columns)],
+        "fields": fields,
+        "groupings": groupings,
+    }
@@ -0,0 +1,178 @@
+import logging
+import sys
+
+import numpy as np
+import pandas as pd
+
+from autoexcel import config
+
+logger = logging.getLogger(__name__)
+
+MAX_CATEGORY_RATIO = 0.5
+
+
+def get_sharepoint_schema():
+    """
+    Declared SharePoint export schema from ``autoexcel_config.sharepoint_schema``.
+
+    Returns:
+        tuple: ``(columns, max_category_ratio)`` where ``columns`` maps column
+        names to dtype strings.
+    """
+    settings = None
+    if config.autoexcel_config is not None:
+        settings = config.autoexcel_config.sharepoint_schema
+    if settings is None:
+        return {}, MAX_CATEGORY_RATIO
+
+    settings = settings.to_dict()
+    columns = settings.get("columns") or {}
+    max_category_ratio = settings.get("max_category_ratio")
+    if max_category_ratio is None:
+        max_category_ratio = MAX_CATEGORY_RATIO
+    return columns, max_category_ratio
+
+
+def resolve_dtype(series, dtype, max_category_ratio=MAX_CATEGORY_RATIO):
+    """
+    Dtype ``series`` will actually be cast to under the declared ``dtype``.
+
+    High-cardinality "category" columns stay as they are, since a category
+    with nearly one value per row costs more memory than the strings.
+    """
+    if dtype == "category" and len(series):
+        n_unique = series.nunique(dropna=True)
+        if n_unique / len(series) > max_category_ratio:
+            return series.dtype
+    return dtype
+
+
+def cast_column(series, dtype):
+    """Cast ``series`` to ``dtype`` ("category", "datetime64[...]" or a nullable Int)."""
+    dtype = str(dtype)
+    if dtype == "category":
+        return series.astype("category")
+    if dtype.startswith("datetime64"):
+        return pd.to_datetime(series).astype(dtype)
+    if dtype.startswith(("Int", "UInt")):
+        return pd.to_numeric(series).astype(dtype)
+    return series.astype(dtype)
+
+
+def estimate_column_memory(series, dtype):
+    """
+    Estimated bytes for ``series`` once cast to ``dtype``, without casting it.
+
+    Args:
+        series (pd.Series): Column as read.
+        dtype (str): Target dtype.
+
+    Returns:
+        int: Estimated bytes.
+    """
+    n_rows = len(series)
+    dtype = str(dtype)
+    if dtype == "category":
+        categories = series.dropna().unique()
+        n_categories = len(categories)
+        code_bytes = np.min_scalar_type(-max(n_categories, 1)).itemsize
+        category_bytes = sum(sys.getsizeof(value) for value in categories)
+        return n_rows * code_bytes + category_bytes + 8 * n_categories
+    if dtype.startswith("datetime64"):
+        return 8 * n_rows
+    if dtype.startswith(("Int", "UInt")):
+        # Values plus the boolean NA mask
+        return (pd.api.types.pandas_dtype(dtype).itemsize + 1) * n_rows
+    return int(series.memory_usage(deep=True, index=False))
+
+
+def apply_schema(df, columns=None, max_category_ratio=None, report=False):
+    """
+    Cast ``df`` to the declared SharePoint schema.
+
+    Columns that are not in the schema are left alone, and schema columns that
+    are missing from ``df`` are skipped. A column that cannot be cast is kept
+    as read and logged.
+
+    Args:
+        df (pd.DataFrame): Data as read from the raw export.
+        columns (dict, optional): Column to dtype mapping. Defaults to the
+            configured schema.
+        max_category_ratio (float, optional): Unique/row ratio above which a
+            "category" column is kept as is. Defaults to the configured ratio.
+        report (bool): Also return the per-column memory report.
+
+    Returns:
+        pd.DataFrame or tuple: The cast frame, or ``(df, report_df)`` if
+        ``report`` is True.
+    """
+    schema_columns, schema_ratio = get_sharepoint_schema()
+    if columns is None:
+        columns = schema_columns
+    if max_category_ratio is None:
+        max_category_ratio = schema_ratio
+
+    rows = []
+    cast = {}
+    for column, declared in columns.items():
+        if column not in df.columns:
+            continue
+        series = df[column]
+        dtype = resolve_dtype(series, declared, max_category_ratio)
+        if str(dtype) == str(series.dtype):
+            continue
+        try:
+            cast[column] = cast_column(series, dtype)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Could not cast column {column} to {dtype}: {e}")
+            continue
+
+        if report:
+            rows.append(
+                {
+                    "column": column,
+                    "dtype_before": str(series.dtype),
+                    "dtype_after": str(cast[column].dtype),
+                    "bytes_before": int(series.memory_usage(deep=True, index=False)),
+                    "bytes_estimated": estimate_column_memory(series, dtype),
+                    "bytes_actual": int(
+                        cast[column].memory_usage(deep=True, index=False)
+                    ),
+                }
+            )
+
+    if cast:
+        df = df.copy(deep=False)
+        for column, values in cast.items():
+            df[column] = values
+
+    if report:
+        return df, pd.DataFrame(
+            rows,
+            columns=[
+                "column",
+                "dtype_before",
+                "dtype_after",
+                "bytes_before",
+                "bytes_estimated",
+                "bytes_actual",
+            ],
+        )
+    return df
+
+
+def log_memory_report(report_df):
+    """Log a memory report from ``apply_schema(..., report=True)`` at debug level."""
+    if report_df.empty:
+        return
+    for row in report_df.itertuples(index=False):
+        logger.debug(
+            f"{row.column}: {row.dtype_before} -> {row.dtype_after}, "
+            f"{row.bytes_before:,} -> {row.bytes_actual:,} bytes "
+            f"(estimated {row.bytes_estimated:,})"
+        )
+    before = report_df["bytes_before"].sum()
+    after = report_df["bytes_actual"].sum()
+    logger.debug(
+        f"Schema columns: {before:,} -> {after:,} bytes ({before / max(after, 1):.1f}x)"
+    )
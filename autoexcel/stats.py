@@ -0,0 +1,339 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from autoexcel.pivot import (
+    GRAND_TOTAL,
+    cell_styler,
+    item_filters,
+    pivot_fields,
+    write_footer,
+    write_title,
+)
+
+logger = logging.getLogger(__name__)
+
+# Column captions of the statistics; quantiles are "median" or "p<percent>" (e.g. "p90")
+CAPTIONS = {
+    "count": "Count",
+    "sum": "Sum",
+    "mean": "Average",
+    "std": "StdDev",
+    "min": "Min",
+    "max": "Max",
+    "median": "Median",
+}
+STATISTICS = ("count", "mean", "std", "min", "max", "median")
+
+# Bins of the per-group histograms behind approximate quantiles
+QUANTILE_BINS = 512
+
+
+def quantile_of(statistic):
+    """Quantile (0 to 1) a statistic name stands for, or None if it is not a quantile."""
+    if statistic == "median":
+        return 0.5
+    if statistic.startswith("p"):
+        try:
+            percent = float(statistic[1:])
+        except ValueError:
+            percent = None
+        if percent is None or not 0 <= percent <= 100:
+            raise ValueError(f"Expected a percentile from p0 to p100, got {statistic!r}")
+        return percent / 100
+    if statistic not in CAPTIONS:
+        raise ValueError(f"Unknown statistic {statistic!r}, expected one of {list(CAPTIONS)}")
+    return None
+
+
+def statistic_caption(statistic):
+    """Column caption of a statistic (``"p90"`` is ``"P90"``)."""
+    return CAPTIONS.get(statistic, statistic.upper())
+
+
+def group_ids(df, keys, visible_items=None, filter_fields=None):
+    """
+    Dense group numbers of the rows of ``df`` grouped by ``keys``.
+
+    Key items are the pivot items of the columns (blanks as ``"(blank)"``),
+    so groups come in the order of a pivot table's rows. Rows with an item
+    of ``filter_fields`` (default ``keys``) hidden in ``visible_items`` (see
+    ``autoexcel.pivot.item_filters``) are left out.
+
+    Returns:
+        tuple: ``(rows, ids, index)``: the positions of the rows kept, their
+        group numbers and the labels of the groups. Without ``keys`` every
+        row is in the one group, labelled ``"Grand Total"``.
+    """
+    if filter_fields is None:
+        filter_fields = keys
+    fields = pivot_fields(df, list(keys) + list(filter_fields), apply_grouping=False)
+    missing = [name for name in keys if name not in fields]
+    if missing:
+        raise KeyError(f"Group keys not in the data: {missing}")
+
+    keep = np.ones(len(df), dtype=bool)
+    for field_name, items in item_filters(visible_items, list(fields)).items():
+        categories = fields[field_name].categories
+        codes = [i for i, item in enumerate(categories) if str(item) in items]
+        keep &= ~np.isin(fields[field_name].codes, codes)
+    rows = np.flatnonzero(keep)
+
+    if not keys:
+        return rows, np.zeros(len(rows), dtype=np.int64), pd.Index([GRAND_TOTAL])
+
+    # One code per combination of items, numbered in sorted order
+    sizes = [len(fields[name].categories) for name in keys]
+    codes = np.ravel_multi_index([np.asarray(fields[name].codes)[rows] for name in keys], sizes)
+    uniques, ids = np.unique(codes, return_inverse=True)
+    labels = np.unravel_index(uniques, sizes)
+    index = pd.MultiIndex.from_arrays(
+        [fields[name].categories[label] for name, label in zip(keys, labels)], names=keys
+    )
+    if len(keys) == 1:
+        index = index.get_level_values(0)
+    return rows, ids.reshape(-1), index
+
+
+def group_order(groups, n_groups, values=None):
+    """Positions sorting ``groups`` and, given ``values``, the values within each group."""
+    # Stable sorts of 16-bit integers are radix sorts
+    dtype = np.int16 if n_groups <= np.iinfo(np.int16).max else np.int64
+    if values is None:
+        return np.argsort(groups.astype(dtype), kind="stable")
+    order = np.argsort(values)
+    return order[np.argsort(groups[order].astype(dtype), kind="stable")]
+
+
+def exact_quantiles(values, starts, counts, q):
+    """Linearly interpolated quantile ``q`` of each group of ``values``, sorted within groups."""
+    result = np.full(len(counts), np.nan)
+    present = counts > 0
+    position = starts[present] + q * (counts[present] - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, starts[present] + counts[present] - 1)
+    fraction = position - lower
+    result[present] = values[lower] + (values[upper] - values[lower]) * fraction
+    return result
+
+
+def histogram_quantiles(values, groups, counts, minima, maxima, quantiles, bins):
+    """
+    Approximate quantiles of each group from fixed-width histograms.
+
+    Every group's histogram shares the bins spanning all ``values``, so the
+    histograms of chunks of the data add up and the error is at most one bin
+    width. Returns one array per quantile.
+    """
+    n_groups = len(counts)
+    low, high = np.min(values), np.max(values)
+    width = (high - low) / bins or 1.0
+    bin_of = np.minimum(((values - low) / width).astype(np.int64), bins - 1)
+    histograms = np.bincount(groups * bins + bin_of, minlength=n_groups * bins)
+    histograms = histograms.reshape(n_groups, bins)
+    cumulative = np.cumsum(histograms, axis=1)
+
+    results = []
+    for q in quantiles:
+        rank = q * (counts - 1)
+        # First bin holding the value at ``rank``, then interpolate within it
+        k = np.minimum((cumulative <= rank[:, None]).sum(axis=1), bins - 1)
+        rows = np.arange(n_groups)
+        in_bin = histograms[rows, k]
+        before = cumulative[rows, k] - in_bin
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fraction = (rank - before + 0.5) / in_bin
+        estimate = np.clip(low + (k + fraction) * width, minima, maxima)
+        results.append(np.where(counts > 0, estimate, np.nan))
+    return results
+
+
+def field_statistics(values, ids, n_groups, statistics, approximate=False, bins=QUANTILE_BINS):
+    """
+    ``statistics`` of ``values`` for each of ``n_groups`` groups numbered by ``ids``.
+
+    Missing values are skipped. The values are sorted by group and, for exact
+    quantiles, by value within each group; one pass over the sorted values
+    then gives every statistic. The standard deviation is the sample one
+    (Excel's StdDev).
+
+    Returns:
+        dict: One array per statistic, NaN for groups without values.
+    """
+    valid = ~np.isnan(values)
+    groups, values = ids[valid], values[valid]
+    quantiles = {statistic: quantile_of(statistic) for statistic in statistics}
+    exact = not approximate and any(q is not None for q in quantiles.values())
+    order = group_order(groups, n_groups, values if exact else None)
+    groups, values = groups[order], values[order]
+
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+    sums = np.bincount(groups, weights=values, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(present, sums / counts, np.nan)
+        deviations = values - means[groups]
+        squares = np.bincount(groups, weights=deviations * deviations, minlength=n_groups)
+        stds = np.where(counts > 1, np.sqrt(squares / (counts - 1)), np.nan)
+
+    minima = np.full(n_groups, np.nan)
+    maxima = np.full(n_groups, np.nan)
+    if present.any():
+        if exact:
+            minima[present] = values[starts[present]]
+            maxima[present] = values[starts[present] + counts[present] - 1]
+        else:
+            minima[present] = np.minimum.reduceat(values, starts[present])
+            maxima[present] = np.maximum.reduceat(values, starts[present])
+
+    results = {
+        "count": counts,
+        "sum": np.where(present, sums, np.nan),
+        "mean": means,
+        "std": stds,
+        "min": minima,
+        "max": maxima,
+    }
+    wanted = [statistic for statistic, q in quantiles.items() if q is not None]
+    if wanted and exact:
+        for statistic in wanted:
+            results[statistic] = exact_quantiles(values, starts, counts, quantiles[statistic])
+    elif wanted and present.any():
+        estimates = histogram_quantiles(
+            values, groups, counts, minima, maxima, [quantiles[s] for s in wanted], bins
+        )
+        results.update(zip(wanted, estimates))
+    elif wanted:
+        results.update((statistic, np.full(n_groups, np.nan)) for statistic in wanted)
+    return {statistic: results[statistic] for statistic in statistics}
+
+
+def group_statistics(
+    df,
+    keys,
+    fields,
+    statistics=STATISTICS,
+    visible_items=None,
+    filter_fields=None,
+    approximate=False,
+    bins=QUANTILE_BINS,
+):
+    """
+    Statistics of the numeric ``fields`` of ``df`` for each group of ``keys``.
+
+    Args:
+        df (pd.DataFrame): The data, e.g. the processed SharePoint frame.
+        keys (list): Columns to group by; no keys gives the grand total.
+        fields (list): Numeric columns to describe; other values are missing.
+        statistics (list): Names from ``count``, ``sum``, ``mean``, ``std``,
+            ``min``, ``max``, ``median`` and percentiles such as ``p90``.
+        visible_items (dict): Items hidden from the groups, as for pivot
+            tables (see ``autoexcel.main.pivot_table``).
+        filter_fields (list): Fields whose hidden items filter the rows;
+            defaults to ``keys``. A grand total filters on the keys of the
+            table it totals.
+        approximate (bool): Estimate quantiles from per-group histograms of
+            ``bins`` bins instead of sorting each group's values.
+
+    Returns:
+        pd.DataFrame: A row per group, in pivot table order, and a column per
+        field and statistic (``(field, statistic)`` column MultiIndex).
+    """
+    rows, ids, index = group_ids(df, list(keys), visible_items, filter_fields)
+    columns = {}
+    for field in fields:
+        values = pd.to_numeric(df[field].iloc[rows], errors="coerce")
+        values = values.to_numpy(dtype="float64", na_value=np.nan)
+        results = field_statistics(values, ids, len(index), statistics, approximate, bins)
+        columns.update(((field, statistic), result) for statistic, result in results.items())
+    result = pd.DataFrame(columns, index=index)
+    result.columns = pd.MultiIndex.from_tuples(result.columns, names=["field", "statistic"])
+    return result
+
+
+def statistics_rows(table, totals=None):
+    """
+    Header and rows of a ``group_statistics`` table as written to a sheet.
+
+    The group keys come first, then a column per statistic, captioned
+    ``"<caption> of <field>"`` when the table describes several fields.
+    ``totals`` (the table over no keys) adds a grand total row.
+
+    Returns:
+        tuple: ``(header, rows, statistics)``; the statistic of each value column.
+    """
+    keys = [name or "Row Labels" for name in table.index.names]
+    fields = table.columns.get_level_values("field").unique()
+    captions = [statistic_caption(statistic) for _, statistic in table.columns]
+    if len(fields) > 1:
+        captions = [f"{caption} of {field}" for caption, (field, _) in zip(captions, table.columns)]
+    header = keys + captions
+    statistics = list(table.columns.get_level_values("statistic"))
+
+    def cell(value):
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float) and np.isnan(value):
+            return None
+        return value
+
+    rows = []
+    for labels, values in zip(table.index, table.to_numpy(dtype=object)):
+        labels = labels if isinstance(labels, tuple) else (labels,)
+        rows.append([cell(label) for label in labels] + [cell(value) for value in values])
+    if totals is not None:
+        values = totals.to_numpy(dtype=object)[0]
+        label_cells = [GRAND_TOTAL] + [None] * (len(keys) - 1)
+        rows.append(label_cells + [cell(value) for value in values])
+    return header, rows, statistics
+
+
+def write_statistics(
+    pt_ws,
+    table,
+    title,
+    start_row=1,
+    start_col=1,
+    totals=None,
+    number_format="0.0",
+    footer_text=None,
+):
+    """
+    Write a ``group_statistics`` table to openpyxl worksheet ``pt_ws``.
+
+    The table gets the title header, borders and footer of the pivot tables;
+    counts are whole numbers and other statistics use ``number_format``.
+
+    Returns:
+        tuple: ``(width, height)`` of the table, title and footer included.
+    """
+    header, rows, statistics = statistics_rows(table, totals)
+    n_keys = len(header) - len(statistics)
+    width = len(header)
+    style = cell_styler()
+
+    row = start_row + 2
+    for offset, value in enumerate(header):
+        style(pt_ws.cell(row=row, column=start_col + offset, value=value), bold=True)
+    for values in rows:
+        row += 1
+        is_total = values[0] == GRAND_TOTAL
+        for offset, value in enumerate(values):
+            cell = pt_ws.cell(row=row, column=start_col + offset, value=value)
+            if offset < n_keys:
+                style(cell, bold=is_total)
+            elif statistics[offset - n_keys] == "count":
+                style(cell, bold=is_total, number_format="0")
+            else:
+                style(cell, bold=is_total, number_format=number_format)
+
+    write_title(pt_ws, title, start_row, start_col, width)
+    height = len(rows) + 3
+    if footer_text:
+        write_footer(pt_ws, footer_text, start_row + height, start_col, width)
+        height += 1
+
+    logger.debug(f"Statistics table dim: {width} x {height}")
+    return (width, height)
@@ -0,0 +1,201 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from autoexcel import config
+
+logger = logging.getLogger(__name__)
+timing_logger = logging.getLogger("timing")
+
+# Stages running on this thread, innermost last, and the run they belong to
+local = threading.local()
+
+
+def get_timing_settings():
+    """
+    Stage timing settings from ``autoexcel_config.timing``.
+
+    Returns:
+        ConfigDict or None: None when stage timing is off.
+    """
+    settings = None
+    if config.autoexcel_config is not None:
+        settings = config.autoexcel_config.timing
+    if settings is None or not settings.enabled:
+        return None
+    return settings
+
+
+def peak_rss_bytes():
+    """Peak resident set size of the process so far, None without resource or psutil."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def frame_shapes(value):
+    """``[rows, columns]`` of each DataFrame or Series (one column) in ``value`` or its items."""
+    if isinstance(value, pd.DataFrame):
+        return [list(value.shape)]
+    if isinstance(value, pd.Series):
+        return [[len(value), 1]]
+    if isinstance(value, (tuple, list)):
+        return [shape for item in value for shape in frame_shapes(item)]
+    if isinstance(value, dict):
+        return frame_shapes(list(value.values()))
+    return []
+
+
+def format_shapes(shapes):
+    return ", ".join(f"{rows:,}x{cols}" for rows, cols in shapes) or "-"
+
+
+@contextmanager
+def stage(name, inputs=None):
+    """
+    Time the block as pipeline stage ``name``.
+
+    Records its wall and CPU time, the growth of the process's peak RSS
+    while it ran, and the ``[rows, columns]`` of its input frames and of
+    the ones set in the yielded record's ``"out"``. The record is logged to
+    the ``timing`` logger, indented by nesting, and kept in the metrics of
+    the enclosing run (see ``timed_run``). Does nothing but yield a record
+    when timing is off.
+    """
+    record = {"stage": name, "in": inputs or [], "out": []}
+    if get_timing_settings() is None:
+        yield record
+        return
+
+    stack = local.__dict__.setdefault("stack", [])
+    record["depth"] = len(stack)
+    record["parent"] = stack[-1]["stage"] if stack else None
+    stack.append(record)
+    run = getattr(local, "run", None)
+    if run is not None:
+        # In the order the stages start; the record is completed below
+        run["stages"].append(record)
+    peak_before = peak_rss_bytes()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record["wall_seconds"] = time.perf_counter() - wall_start
+        record["cpu_seconds"] = time.process_time() - cpu_start
+        peak_after = peak_rss_bytes()
+        record["peak_rss_bytes"] = peak_after
+        record["peak_rss_delta_bytes"] = (
+            None if peak_after is None else peak_after - peak_before
+        )
+        stack.pop()
+        log_stage(record)
+
+
+def log_stage(record):
+    delta = record["peak_rss_delta_bytes"]
+    memory = "" if delta is None else f", peak RSS +{delta / 2**20:,.1f} MiB"
+    failed = f", failed: {record['error']}" if "error" in record else ""
+    timing_logger.info(
+        f"{'  ' * record['depth']}{record['stage']}: {record['wall_seconds']:.3f} s wall, "
+        f"{record['cpu_seconds']:.3f} s CPU{memory}, "
+        f"in {format_shapes(record['in'])}, out {format_shapes(record['out'])}{failed}"
+    )
+
+
+def timed_stage(function=None, detail=None):
+    """
+    Decorator timing each call of ``function`` as a pipeline stage (see ``stage``).
+
+    The frames among its arguments are the stage's input, the frames it
+    returns (alone, or in a tuple, list or dict) its output. With ``detail``,
+    the value of that argument is added to the stage name, e.g.
+    ``create_report_ws(fy_analytics)``.
+    """
+    if function is None:
+        return functools.partial(timed_stage, detail=detail)
+    signature = inspect.signature(function) if detail else None
+
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        if get_timing_settings() is None:
+            return function(*args, **kwargs)
+        name = function.__name__
+        if detail:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            name = f"{name}({bound.arguments[detail]})"
+        inputs = frame_shapes(list(args) + list(kwargs.values()))
+        with stage(name, inputs) as record:
+            result = function(*args, **kwargs)
+            record["out"] = frame_shapes(result)
+        return result
+
+    return timed
+
+
+def timed_run(function):
+    """
+    Decorator timing ``function`` as a pipeline run: a stage whose stages are saved.
+
+    The stages run inside it, on its thread, are written with the run's
+    start time to ``<metrics_dir>/<function>-<YYYYmmdd-HHMMSS-ffffff>.json`` (see
+    ``autoexcel_config.timing``), also when the run fails.
+    """
+
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        settings = get_timing_settings()
+        if settings is None or getattr(local, "run", None) is not None:
+            return timed_stage(function)(*args, **kwargs)
+
+        started = datetime.now()
+        run = local.run = {
+            "run": function.__name__,
+            "started": started.isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "pandas": pd.__version__,
+            "stages": [],
+        }
+        try:
+            return timed_stage(function)(*args, **kwargs)
+        finally:
+            local.run = None
+            if settings.metrics_dir:
+                write_metrics(run, settings.metrics_dir, started)
+
+    return timed
+
+
+def write_metrics(run, metrics_dir, started):
+    """Write the metrics of ``run`` to a JSON file in ``metrics_dir``."""
+    path = os.path.join(metrics_dir, f"{run['run']}-{started:%Y%m%d-%H%M%S-%f}.json")
+    try:
+        os.makedirs(metrics_dir, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(run, f, indent=2)
+    except OSError as e:
+        logger.warning(f"Could not write run metrics to {path}: {e}")
+        return None
+    timing_logger.info(f"Run metrics: {path}")
+    return path
@@ -1,83 +1,219 @@
 import os
 import logging
 
+import numpy as np
 import pandas as pd
 from openpyxl import load_workbook
 
+from autoexcel import config
+from autoexcel.timing import timed_stage
+
 logger = logging.getLogger(__name__)
 
-def extract_disjoint_tables(file_path, sheet_name=None):
+DELINQUENCY_THRESHOLDS = (30, 60, 90)
+DELINQUENCY_FILL_COLORS = ("FFFFFFFF", "FFFFFF00", "FFFFA500", "FFFF0000")
+
+
+def get_delinquency_settings():
+    """
+    Delinquency thresholds and fill colors from ``autoexcel_config.delinquency``.
+
+    Returns:
+        tuple: ``(thresholds, fill_colors)``; one fill color per bucket, lowest
+        bucket first.
+    """
+    settings = None
+    if config.autoexcel_config is not None:
+        settings = config.autoexcel_config.delinquency
+    if settings is None:
+        return DELINQUENCY_THRESHOLDS, DELINQUENCY_FILL_COLORS
+
+    thresholds = tuple(settings.thresholds or DELINQUENCY_THRESHOLDS)
+    fill_colors = tuple(settings.fill_colors or DELINQUENCY_FILL_COLORS)
+    if len(fill_colors) != len(thresholds) + 1:
+        raise ValueError(
+            f"Expected {len(thresholds) + 1} delinquency fill colors, got {len(fill_colors)}"
+        )
+    return thresholds, fill_colors
+
+
+def delinquency_labels(thresholds=None):
+    """Bucket labels for ``thresholds``, lowest bucket first (e.g. ``"< 30 Days"``)."""
+    if thresholds is None:
+        thresholds, _ = get_delinquency_settings()
+    return [f"< {thresholds[0]} Days"] + [f">= {t} Days" for t in thresholds]
+
+
+def categorize_delinquency(days, thresholds=None):
+    """
+    Bucket days since assignment into delinquency categories in one pass.
+
+    Args:
+        days (pd.Series): Business days since assignment; missing values stay missing.
+        thresholds (list, optional): Ascending bucket edges. Defaults to the
+            configured thresholds.
+
+    Returns:
+        pd.Series: Ordered categorical series aligned with ``days``.
+    """
+    if thresholds is None:
+        thresholds, _ = get_delinquency_settings()
+
+    values = pd.to_numeric(days).to_numpy(dtype="float64", na_value=np.nan)
+    buckets = pd.cut(
+        values,
+        bins=[-np.inf, *thresholds, np.inf],
+        labels=delinquency_labels(thresholds),
+        right=False,
+        ordered=True,
+    )
+    return pd.Series(buckets, index=days.index, name=days.name)
+
+
+def label_tables(mask, connectivity=4):
+    """
+    Label the connected regions of filled cells of a sheet.
+
+    Cells are first grouped into runs, the filled cells side by side in a
+    row; runs touching across adjacent rows are then merged with array
+    operations (minimum-label hooking and pointer jumping), never cell by
+    cell. Regions are numbered in the order a row-by-row scan of the sheet
+    reaches them.
+
+    Args:
+        mask (np.ndarray): 2D boolean array, True for filled cells.
+        connectivity (int): 4 to join cells sharing an edge, 8 to also join
+            cells touching at a corner.
+
+    Returns:
+        tuple: ``(labels, count)``; ``labels`` is an int array shaped like
+        ``mask``, 0 for empty cells and 1 to ``count`` for the regions.
+    """
+    if connectivity not in (4, 8):
+        raise ValueError(f"Connectivity must be 4 or 8, got {connectivity}")
+    mask = np.asarray(mask, dtype=bool)
+    if mask.size == 0:
+        return np.zeros(mask.shape, dtype=np.int64), 0
+
+    # Runs, numbered from 1 in row-major order; every cell gets its run's number
+    starts = mask.copy()
+    starts[:, 1:] &= ~mask[:, :-1]
+    runs = np.cumsum(starts.ravel()).reshape(mask.shape)
+    runs[~mask] = 0
+    n_runs = int(runs.max())
+
+    # Pairs of runs touching across two rows: below and above (and diagonally)
+    neighbors = [(runs[1:], runs[:-1])]
+    if connectivity == 8:
+        neighbors += [(runs[1:, 1:], runs[:-1, :-1]), (runs[1:, :-1], runs[:-1, 1:])]
+    pairs = []
+    for lower, upper in neighbors:
+        touching = (lower > 0) & (upper > 0)
+        pairs.append(np.stack([lower[touching], upper[touching]], axis=1))
+    pairs = np.concatenate(pairs)
+    # Runs are contiguous: drop the pairs repeated on consecutive cells
+    if len(pairs):
+        pairs = pairs[np.r_[True, (pairs[1:] != pairs[:-1]).any(axis=1)]]
+    lower, upper = pairs[:, 0], pairs[:, 1]
+
+    # Each run points at the smallest run of its region: hook the larger root
+    # of every touching pair onto the smaller one, then flatten the trees
+    parent = np.arange(n_runs + 1)
+    while True:
+        lower_root, upper_root = parent[lower], parent[upper]
+        apart = lower_root != upper_root
+        if not apart.any():
+            break
+        lower_root, upper_root = lower_root[apart], upper_root[apart]
+        np.minimum.at(
+            parent,
+            np.maximum(lower_root, upper_root),
+            np.minimum(lower_root, upper_root),
+        )
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    # A region's smallest run is the first the scan reaches: number them in that order
+    roots = np.unique(parent[1:])
+    region = np.zeros(n_runs + 1, dtype=np.int64)
+    region[1:] = np.searchsorted(roots, parent[1:]) + 1
+    return region[runs], len(roots)
+
+
+def table_bounds(labels, count):
+    """
+    Bounding boxes of the labeled regions, in one pass over the filled cells.
+
+    Returns:
+        np.ndarray: ``(count, 4)`` array of ``[top, bottom, left, right]``
+        row and column indices (inclusive), the row of region ``i`` at ``i - 1``.
+    """
+    rows, cols = np.nonzero(labels)
+    region = labels[rows, cols] - 1
+    bounds = np.empty((count, 4), dtype=np.int64)
+    bounds[:, [0, 2]] = np.iinfo(np.int64).max
+    bounds[:, [1, 3]] = -1
+    np.minimum.at(bounds[:, 0], region, rows)
+    np.maximum.at(bounds[:, 1], region, rows)
+    np.minimum.at(bounds[:, 2], region, cols)
+    np.maximum.at(bounds[:, 3], region, cols)
+    return bounds
+
+
+@timed_stage(detail="sheet_name")
+def extract_disjoint_tables(file_path, sheet_name=None, connectivity=4):
+    """
+    Read the tables of a sheet: the regions of filled cells, apart from each other.
+
+    Merged cells count as filled with their value. Tables are found by
+    labeling the connected regions of the sheet's filled cells (see
+    ``label_tables``) and cut at their bounding boxes, top to bottom, then
+    left to right, as a row-by-row scan reaches them.
+
+    Args:
+        file_path (str): Path to the workbook.
+        sheet_name (str, optional): Sheet to read. Defaults to the first sheet.
+        connectivity (int): 4 to split tables that only touch at a corner,
+            8 to keep them together.
+
+    Returns:
+        list: A DataFrame per table, without empty rows and columns and
+        with repeated header and footer rows dropped.
+    """
     # Load the workbook using openpyxl
     wb = load_workbook(file_path, data_only=True)
-    
+
     # If no sheet name provided, default to the first sheet
     if sheet_name is None:
         sheet_name = wb.sheetnames[0]
-    
+
     sheet = wb[sheet_name]
-    
-    # List to store the tables as dataframes
-    tables = []
-    
+
     # Convert sheet to a pandas DataFrame, expanding merged cells
-    data = []
-    for row in sheet.iter_rows(values_only=True):
-        data.append([cell if cell is not None else None for cell in row])
-    df = pd.DataFrame(data)
-    
+    df = pd.DataFrame(list(sheet.iter_rows(values_only=True)))
+
     # Find the merged cells and apply the values to all merged ranges
     for merged_cells in sheet.merged_cells.ranges:
         merged_value = sheet.cell(merged_cells.min_row, merged_cells.min_col).value
-        df.iloc[merged_cells.min_row-1:merged_cells.max_row, merged_cells.min_col-1:merged_cells.max_col] = merged_value
-
-    df_mask = df.notna()
+        df.iloc[
+            merged_cells.min_row - 1 : merged_cells.max_row,
+            merged_cells.min_col - 1 : merged_cells.max_col,
+        ] = merged_value
 
+    labels, count = label_tables(df.notna().to_numpy(), connectivity)
 
-    # Initialize variables
     tables = []
-    visited = pd.DataFrame(False, index=df.index, columns=df.columns)
-    
-    # Function to find contiguous non-NaN regions
-    def find_table(start_row, start_col):
-        from collections import deque
-        q = deque()
-        q.append((start_row, start_col))
-        table_cells = []
-        
-        while q:
-            row, col = q.popleft()
-            if (0 <= row < df.shape[0] and
-                0 <= col < df.shape[1] and
-                df_mask.iloc[row, col] and
-                not visited.iloc[row, col]):
-                visited.iloc[row, col] = True
-                table_cells.append((row, col))
-                
-                # Explore neighbors
-                q.extend([
-                    (row+1, col),
-                    (row-1, col),
-                    (row, col+1),
-                    (row, col-1)
-                ])
-        return table_cells
-    
-    # Iterate over the DataFrame to find tables
-    for row in range(df.shape[0]):
-        for col in range(df.shape[1]):
-            if df_mask.iloc[row, col] and not visited.iloc[row, col]:
-                # Found a new table
-                table_cells = find_table(row, col)
-                # Extract the table data
-                rows = [r for r, c in table_cells]
-                cols = [c for r, c in table_cells]
-                table_df = df.iloc[min(rows):max(rows)+1, min(cols):max(cols)+1]
-                # Clean up the table (remove all-NaN rows and columns)
-                table_df = table_df.dropna(axis=0, how='all').dropna(axis=1, how='all')
-
-                table_df = clean_header(table_df)
-                table_df = clean_footer(table_df)
-                tables.append(table_df.reset_index(drop=True))
+    for top, bottom, left, right in table_bounds(labels, count):
+        table_df = df.iloc[top : bottom + 1, left : right + 1]
+        # Clean up the table (remove all-NaN rows and columns)
+        table_df = table_df.dropna(axis=0, how="all").dropna(axis=1, how="all")
+
+        table_df = clean_header(table_df)
+        table_df = clean_footer(table_df)
+        tables.append(table_df.reset_index(drop=True))
     return tables
 
 
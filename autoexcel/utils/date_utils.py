@@ -0,0 +1,213 @@
+import functools
+import logging
+
+import numpy as np
+import pandas as pd
+
+from autoexcel import config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WEEKMASK = "1111100"
+
+
+class BusinessCalendar:
+    """
+    Business-day calendar backed by ``np.busdaycalendar`` plus a cumulative
+    business-day lookup table.
+
+    Over the configured fiscal years the lookup table turns a business-day
+    difference into two array indexes instead of a calendar walk. Dates outside
+    that span fall back to ``np.busday_count`` with the default weekmask and
+    every configured holiday.
+
+    Args:
+        weekmask (str): Default weekmask, Monday first (e.g. ``"1111100"``).
+        fiscal_years (tuple): ``(start, stop, weekmask, holidays)`` tuples, one
+            per fiscal year. ``weekmask`` may be None to use the default.
+    """
+
+    def __init__(self, weekmask=DEFAULT_WEEKMASK, fiscal_years=()):
+        holidays = sorted({day for _, _, _, days in fiscal_years for day in days})
+        self.busdaycal = np.busdaycalendar(
+            weekmask=weekmask, holidays=np.array(holidays, dtype="datetime64[D]")
+        )
+        self.origin = None
+        self.cumulative = None
+
+        if fiscal_years:
+            self.origin = min(np.datetime64(start, "D") for start, *_ in fiscal_years)
+            stop = max(np.datetime64(stop, "D") for _, stop, *_ in fiscal_years)
+            days = np.arange(self.origin, stop, dtype="datetime64[D]")
+            is_busday = np.is_busday(days, busdaycal=self.busdaycal)
+
+            # Fiscal years with their own weekmask override their slice of the table
+            for start, stop, fy_weekmask, fy_holidays in fiscal_years:
+                if fy_weekmask is None or fy_weekmask == weekmask:
+                    continue
+                fy_cal = np.busdaycalendar(
+                    weekmask=fy_weekmask,
+                    holidays=np.array(fy_holidays, dtype="datetime64[D]"),
+                )
+                i = (np.datetime64(start, "D") - self.origin).astype(np.int64)
+                j = (np.datetime64(stop, "D") - self.origin).astype(np.int64)
+                is_busday[i:j] = np.is_busday(days[i:j], busdaycal=fy_cal)
+
+            self.cumulative = np.concatenate(([0], np.cumsum(is_busday, dtype=np.int64)))
+
+    def busday_count(self, start, end):
+        """
+        Vectorized ``np.busday_count`` over this calendar.
+
+        Args:
+            start (array-like): ``datetime64[D]`` start dates (no NaT).
+            end (array-like): ``datetime64[D]`` end dates (no NaT), exclusive.
+
+        Returns:
+            np.ndarray: Business days in ``[start, end)``, or minus those in
+            ``(end, start]`` if ``end < start``.
+        """
+        start = np.asarray(start, dtype="datetime64[D]")
+        end = np.asarray(end, dtype="datetime64[D]")
+        if self.cumulative is None:
+            return np.busday_count(start, end, busdaycal=self.busdaycal)
+
+        start, end = np.broadcast_arrays(np.atleast_1d(start), np.atleast_1d(end))
+        i = (start - self.origin).astype(np.int64)
+        j = (end - self.origin).astype(np.int64)
+        # numpy counts (end, start] when the range is reversed
+        reversed_range = j < i
+        i[reversed_range] += 1
+        j[reversed_range] += 1
+        n_days = len(self.cumulative) - 1
+        inside = (i >= 0) & (i <= n_days) & (j >= 0) & (j <= n_days)
+
+        counts = np.empty(i.shape, dtype=np.int64)
+        counts[inside] = self.cumulative[j[inside]] - self.cumulative[i[inside]]
+        if not inside.all():
+            outside = ~inside
+            counts[outside] = np.busday_count(
+                start[outside], end[outside], busdaycal=self.busdaycal
+            )
+        return counts
+
+
+def fiscal_year_bounds(fiscal_year, start_month=10):
+    """
+    First day of ``fiscal_year`` and first day of the next fiscal year.
+
+    Fiscal year N starts on the first of ``start_month`` in year N-1, matching
+    ``get_current_fiscal_year`` (a January start means the calendar year).
+    """
+    first_year = fiscal_year - 1 if start_month > 1 else fiscal_year
+    start = np.datetime64(f"{first_year}-{start_month:02d}", "M")
+    return start.astype("datetime64[D]"), (start + 12).astype("datetime64[D]")
+
+
+@functools.lru_cache(maxsize=None)
+def build_business_calendar(weekmask, fiscal_years):
+    """Memoized ``BusinessCalendar`` constructor; arguments must be hashable."""
+    logger.debug(f"Building business calendar for {len(fiscal_years)} fiscal years")
+    return BusinessCalendar(weekmask=weekmask, fiscal_years=fiscal_years)
+
+
+def get_business_calendar(fiscal_years=None):
+    """
+    Business calendar described by ``autoexcel_config.business_calendar``.
+
+    Calendars are memoized, so repeated calls with the same configuration
+    return the same object.
+
+    Args:
+        fiscal_years (list, optional): Fiscal years to include. Defaults to
+            every fiscal year in the configuration.
+
+    Returns:
+        BusinessCalendar: The calendar.
+    """
+    settings = None
+    if config.autoexcel_config is not None:
+        settings = config.autoexcel_config.business_calendar
+    if settings is None:
+        return build_business_calendar(DEFAULT_WEEKMASK, ())
+
+    settings = settings.to_dict()
+    weekmask = settings.get("weekmask") or DEFAULT_WEEKMASK
+    start_month = settings.get("fiscal_year_start_month") or 10
+    fy_settings = settings.get("fiscal_years") or {}
+    if fiscal_years is None:
+        fiscal_years = fy_settings.keys()
+
+    segments = []
+    for fiscal_year in sorted(int(fy) for fy in fiscal_years):
+        fy_config = fy_settings.get(fiscal_year) or fy_settings.get(str(fiscal_year)) or {}
+        start, stop = fiscal_year_bounds(fiscal_year, start_month)
+        holidays = tuple(
+            str(np.datetime64(day, "D")) for day in fy_config.get("holidays") or []
+        )
+        segments.append((str(start), str(stop), fy_config.get("weekmask"), holidays))
+
+    return build_business_calendar(weekmask, tuple(segments))
+
+
+def to_datetime64_days(dates):
+    """
+    Convert a date-like column (or scalar) to day-resolution datetime64 values.
+
+    Args:
+        dates (pd.Series, array-like or scalar): Values accepted by ``pd.to_datetime``.
+
+    Returns:
+        tuple: ``(days, is_nat)`` where ``days`` is a ``datetime64[D]`` array
+        (0-d for scalar input) and ``is_nat`` is the matching boolean mask of
+        missing values.
+    """
+    if np.ndim(dates) == 0:
+        days = np.asarray(pd.Timestamp(dates).to_datetime64(), dtype="datetime64[D]")
+    else:
+        days = np.asarray(pd.to_datetime(dates), dtype="datetime64[ns]").astype(
+            "datetime64[D]"
+        )
+    return days, np.isnat(days)
+
+
+def networkdays_columns(start_dates, end_dates, mask=None, calendar=None):
+    """
+    Column-wise equivalent of ``networkdays``.
+
+    Counts business days between ``start_dates`` and ``end_dates`` for every
+    row in one vectorized calendar lookup. As in Excel's NETWORKDAYS the
+    end date is included in the count. Rows where either date is missing, or
+    where ``mask`` is False, are returned as ``<NA>``.
+
+    Args:
+        start_dates (pd.Series or array-like): Start dates.
+        end_dates (pd.Series, array-like or scalar): End dates. A scalar is
+            broadcast against ``start_dates``.
+        mask (array-like of bool, optional): Rows to compute. Defaults to all rows.
+        calendar (BusinessCalendar, optional): Calendar to count with. Defaults
+            to ``get_business_calendar()``.
+
+    Returns:
+        pd.Series: Nullable ``Int64`` series aligned with ``start_dates``.
+    """
+    index = start_dates.index if isinstance(start_dates, pd.Series) else None
+
+    start, start_nat = to_datetime64_days(start_dates)
+    end, end_nat = to_datetime64_days(end_dates)
+    end = np.broadcast_to(end, start.shape)
+    end_nat = np.broadcast_to(end_nat, start.shape)
+
+    valid = ~(start_nat | end_nat)
+    if mask is not None:
+        valid &= np.asarray(mask, dtype=bool)
+
+    if calendar is None:
+        calendar = get_business_calendar()
+
+    counts = np.zeros(start.shape, dtype=np.int64)
+    if valid.any():
+        # Include end date
+        counts[valid] = calendar.busday_count(start[valid], end[valid]) + 1
+
+    return pd.Series(pd.arrays.IntegerArray(counts, ~valid), index=index)
@@ -0,0 +1,358 @@
+import logging
+import os
+import re
+import uuid
+import zipfile
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import CellIsRule
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
+
+from autoexcel import config
+from autoexcel.utils.dataframe_utils import delinquency_labels, get_delinquency_settings
+
+logger = logging.getLogger(__name__)
+
+EXCEL_DATE_FORMAT = "mm/dd/yyyy"
+# Number format pandas' Excel writer gives datetime cells (its default datetime_format)
+DATETIME_FORMAT = "YYYY-MM-DD HH:MM:SS"
+HEADER_FILL_COLOR = "C0E6F4"
+ROW_HEIGHT = 15
+STREAM_CHUNK_ROWS = 10_000
+# Excel's standard column width (8.43 characters of Calibri 11 plus padding);
+# a column style needs an explicit width
+STANDARD_COLUMN_WIDTH = 9.140625
+
+HEADER_STYLE = "AutoExcel Header"
+DATA_STYLE = "AutoExcel Data"
+DATE_STYLE = "AutoExcel Date"
+
+DEFAULT_COMPRESS_LEVEL = 6
+COMPACT_BLOCK_BYTES = 4 * 1024**2
+SHARED_STRINGS_PART = "xl/sharedStrings.xml"
+WORKSHEET_PART = re.compile(r"xl/worksheets/sheet\d+\.xml")
+# Plain inline strings as openpyxl writes them; rich text runs are left alone
+INLINE_STRING = re.compile(
+    rb'<c ([^>]*?)t="inlineStr"><is>(<t(?: xml:space="preserve")?>.*?</t>)</is></c>',
+    re.DOTALL,
+)
+SHARED_STRING_ITEM = re.compile(rb"<si>(.*?)</si>", re.DOTALL)
+RELATIONSHIP_ID = re.compile(rb'Id="rId(\d+)"')
+
+
+def header_style():
+    """
+    Header cell style of the data sheets.
+
+    pandas before 3.0 writes headers centered with thin borders; the fill,
+    non-bold font and wrap text are ours.
+    """
+    style = NamedStyle(
+        HEADER_STYLE,
+        font=Font(bold=False),
+        fill=PatternFill(
+            start_color=HEADER_FILL_COLOR, end_color=HEADER_FILL_COLOR, fill_type="solid"
+        ),
+        alignment=Alignment(wrap_text=True),
+    )
+    if int(pd.__version__.split(".")[0]) < 3:
+        thin = Side(style="thin")
+        style.alignment = Alignment(horizontal="center", vertical="top", wrap_text=True)
+        style.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    return style
+
+
+def named_styles():
+    """Named styles shared by every cell of the data sheets."""
+    wrap = Alignment(wrap_text=True)
+    return [
+        header_style(),
+        NamedStyle(DATA_STYLE, font=DEFAULT_FONT, alignment=wrap),
+        NamedStyle(
+            DATE_STYLE, font=DEFAULT_FONT, alignment=wrap, number_format=DATETIME_FORMAT
+        ),
+    ]
+
+
+def register_named_styles(wb):
+    """Add the data sheet named styles to ``wb`` unless already there."""
+    for style in named_styles():
+        if style.name not in wb.named_styles:
+            wb.add_named_style(style)
+
+
+def column_styles(df):
+    """Named style of the data cells of each column of ``df``."""
+    return [
+        DATE_STYLE if pd.api.types.is_datetime64_any_dtype(df[col]) else DATA_STYLE
+        for col in df.columns
+    ]
+
+
+def delinquency_rules(thresholds=None, fill_colors=None):
+    """
+    Conditional-formatting rules filling each Delinquency bucket.
+
+    The fills follow the values, so they stay right when the sheet is
+    re-sorted or filtered in Excel.
+    """
+    if thresholds is None or fill_colors is None:
+        thresholds, fill_colors = get_delinquency_settings()
+    return [
+        CellIsRule(
+            operator="equal",
+            formula=[f'"{label}"'],
+            fill=PatternFill(start_color=color, end_color=color, fill_type="solid"),
+        )
+        for label, color in zip(delinquency_labels(thresholds), fill_colors)
+    ]
+
+
+def format_sheet(ws, df, n_rows):
+    """
+    Apply the sheet, column and range level formatting of a data sheet.
+
+    Sets a single fixed row height, the header autofilter, a style per column
+    and the Delinquency conditional formatting; the cost depends on the
+    number of columns only. Write-only sheets must be formatted before their
+    first row is appended.
+
+    Args:
+        ws (Worksheet): Data sheet, regular or write-only.
+        df (pd.DataFrame): Data written to ``ws``, header in row 1.
+        n_rows (int): Number of data rows below the header.
+    """
+    ws.sheet_format.defaultRowHeight = ROW_HEIGHT
+    ws.sheet_format.customHeight = True
+
+    n_cols = len(df.columns)
+    if n_cols == 0:
+        return
+    ws.auto_filter.ref = f"A1:{get_column_letter(n_cols)}1"
+
+    # Column styles cover the cells users add below the data
+    wrap = Alignment(wrap_text=True)
+    for col_idx, style in enumerate(column_styles(df), start=1):
+        dimension = ws.column_dimensions[get_column_letter(col_idx)]
+        dimension.width = STANDARD_COLUMN_WIDTH
+        dimension.alignment = wrap
+        if style == DATE_STYLE:
+            dimension.number_format = DATETIME_FORMAT
+
+    if "Delinquency" in df.columns and n_rows > 0:
+        letter = get_column_letter(df.columns.get_loc("Delinquency") + 1)
+        cell_range = f"{letter}2:{letter}{n_rows + 1}"
+        for rule in delinquency_rules():
+            ws.conditional_formatting.add(cell_range, rule)
+
+
+def column_values(series):
+    """
+    Python values of ``series`` as ``DataFrame.to_excel`` writes them.
+
+    Missing values become ``""`` (pandas' default ``na_rep``), categoricals
+    their labels and NumPy scalars plain Python scalars.
+    """
+    missing = series.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = np.array(series.dt.to_pydatetime(), dtype=object)
+    elif isinstance(series.dtype, pd.CategoricalDtype):
+        values = np.array(series.astype(object), dtype=object)
+    else:
+        values = np.empty(len(series), dtype=object)
+        values[:] = [
+            v.item() if isinstance(v, np.generic) else v
+            for v in series.to_numpy(dtype=object)
+        ]
+    values[missing] = ""
+    return values
+
+
+def write_sheet_streaming(wb, sheet_name, df, rows=None, chunk_rows=STREAM_CHUNK_ROWS):
+    """
+    Write ``df`` to a new write-only worksheet in one forward pass.
+
+    Values and cell styles are emitted together, ``chunk_rows`` rows at a
+    time, so memory stays bounded regardless of the row count.
+
+    Args:
+        wb (Workbook): A ``Workbook(write_only=True)``.
+        sheet_name (str): Name of the new worksheet.
+        df (pd.DataFrame): Data to write.
+        rows (pd.Series or np.ndarray, optional): Boolean mask selecting the
+            rows of ``df`` to write. Defaults to every row.
+        chunk_rows (int): Rows converted to Python values at a time.
+    """
+    logger.debug(f"Streaming worksheet {sheet_name}.")
+    ws = wb.create_sheet(sheet_name)
+    n_cols = len(df.columns)
+
+    positions = np.arange(len(df)) if rows is None else np.flatnonzero(np.asarray(rows))
+
+    register_named_styles(wb)
+    format_sheet(ws, df, len(positions))
+    styles = column_styles(df)
+
+    header = []
+    for name in df.columns:
+        cell = WriteOnlyCell(ws, value=name)
+        cell.style = HEADER_STYLE
+        header.append(cell)
+    ws.append(header)
+
+    for start in range(0, len(positions), chunk_rows):
+        chunk = positions[start : start + chunk_rows]
+        values = [column_values(df[col].iloc[chunk]) for col in df.columns]
+
+        for i in range(len(chunk)):
+            cells = []
+            for j in range(n_cols):
+                cell = WriteOnlyCell(ws, value=values[j][i])
+                cell.style = styles[j]
+                cells.append(cell)
+            ws.append(cells)
+
+    logger.debug(f"Streaming worksheet {sheet_name} complete.")
+
+
+def write_workbook_streaming(sheets, output_filename):
+    """
+    Write several data sheets to ``output_filename`` with a write-only workbook.
+
+    Args:
+        sheets (list): ``(sheet_name, df, rows)`` tuples, ``rows`` being an
+            optional boolean mask over ``df``.
+        output_filename (str): Path of the workbook to write.
+    """
+    wb = Workbook(write_only=True)
+    for sheet_name, df, rows in sheets:
+        write_sheet_streaming(wb, sheet_name, df, rows=rows)
+    wb.save(output_filename)
+
+
+def get_output_settings():
+    """
+    Compact-output settings from ``autoexcel_config.output``.
+
+    Returns:
+        tuple: ``(compact, compress_level)``.
+    """
+    settings = None
+    if config.autoexcel_config is not None:
+        settings = config.autoexcel_config.output
+    if settings is None:
+        return False, DEFAULT_COMPRESS_LEVEL
+
+    compress_level = settings.compress_level
+    if compress_level is None:
+        compress_level = DEFAULT_COMPRESS_LEVEL
+    return bool(settings.compact), int(compress_level)
+
+
+def compact_workbook(path, compress_level=DEFAULT_COMPRESS_LEVEL):
+    """
+    Rewrite the workbook at ``path`` in place in compact form.
+
+    openpyxl writes every string as an inline string, so a Negotiator or
+    Status value is repeated in full in every row of every sheet. Here each
+    distinct string is stored once in the shared-strings table and cells
+    refer to it by index; all parts are then recompressed at
+    ``compress_level``. Worksheets are rewritten block by block, so memory
+    stays bounded by the number of distinct strings.
+
+    Args:
+        path (str): Path of the ``.xlsx`` file.
+        compress_level (int): Deflate level, 0 (stored) to 9 (smallest).
+
+    Returns:
+        int: Size of the compacted file in bytes.
+    """
+    logger.debug(f"Compacting workbook {path}.")
+    compression = zipfile.ZIP_STORED if compress_level == 0 else zipfile.ZIP_DEFLATED
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+
+    strings = {}
+    references = 0
+    try:
+        with zipfile.ZipFile(path) as src, zipfile.ZipFile(
+            tmp_path, "w", compression=compression, compresslevel=compress_level
+        ) as dst:
+            names = src.namelist()
+            if SHARED_STRINGS_PART in names:
+                # Keep existing indices valid
+                for body in SHARED_STRING_ITEM.findall(src.read(SHARED_STRINGS_PART)):
+                    strings.setdefault(body, len(strings))
+
+            def shared(match):
+                nonlocal references
+                references += 1
+                index = strings.setdefault(match.group(2), len(strings))
+                return b'<c %st="s"><v>%d</v></c>' % (match.group(1), index)
+
+            for name in names:
+                if name == SHARED_STRINGS_PART:
+                    continue
+                if name == "[Content_Types].xml" and SHARED_STRINGS_PART not in names:
+                    dst.writestr(name, add_shared_strings_content_type(src.read(name)))
+                elif name == "xl/_rels/workbook.xml.rels" and SHARED_STRINGS_PART not in names:
+                    dst.writestr(name, add_shared_strings_relationship(src.read(name)))
+                elif WORKSHEET_PART.fullmatch(name):
+                    with src.open(name) as f, dst.open(name, "w", force_zip64=True) as out:
+                        buffer = b""
+                        for block in iter(lambda: f.read(COMPACT_BLOCK_BYTES), b""):
+                            buffer += block
+                            # Only rewrite whole rows so no cell is split
+                            end = buffer.rfind(b"</row>")
+                            if end < 0:
+                                continue
+                            end += len(b"</row>")
+                            out.write(INLINE_STRING.sub(shared, buffer[:end]))
+                            buffer = buffer[end:]
+                        out.write(INLINE_STRING.sub(shared, buffer))
+                else:
+                    dst.writestr(name, src.read(name))
+
+            dst.writestr(SHARED_STRINGS_PART, shared_strings_xml(strings, references))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    size = os.path.getsize(path)
+    logger.debug(
+        f"Compacted workbook {path}: {len(strings)} shared strings, {size} bytes."
+    )
+    return size
+
+
+def shared_strings_xml(strings, references):
+    """Shared-strings part holding the ``<t>`` bodies of ``strings`` in index order."""
+    items = b"".join(b"<si>%s</si>" % body for body in strings)
+    return (
+        b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        b'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+        b' count="%d" uniqueCount="%d">%s</sst>' % (references, len(strings), items)
+    )
+
+
+def add_shared_strings_content_type(content_types):
+    override = (
+        b'<Override PartName="/xl/sharedStrings.xml" ContentType="application/'
+        b'vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+    )
+    return content_types.replace(b"</Types>", override + b"</Types>")
+
+
+def add_shared_strings_relationship(relationships):
+    ids = [int(i) for i in RELATIONSHIP_ID.findall(relationships)]
+    relationship = (
+        b'<Relationship Id="rId%d" Type="http://schemas.openxmlformats.org/'
+        b'officeDocument/2006/relationships/sharedStrings" Target="sharedStrings.xml"/>'
+        % (max(ids, default=0) + 1)
+    )
+    return relationships.replace(b"</Relationships>", relationship + b"</Relationships>")
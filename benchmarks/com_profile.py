@@ -0,0 +1,87 @@
+"""
+COM call profile of the analytics sheets built through Excel.
+
+Builds the FY analytics and caseload sheets as ``pivot_caches.py`` does,
+against the recording stand-in of ``com_standin`` with ``--latency``
+seconds per round-trip, once directly and once through a ``ComProfiler``
+proxy of the application. Prints the hot-spot report, writes the JSON
+trace (open it in Perfetto or chrome://tracing) and compares the calls
+the profiler recorded with the stand-in's round-trips. The two builds time
+the proxy's overhead. Works without Excel or pywin32.
+
+    python benchmarks/com_profile.py --rows 2000 --trace com_trace.json
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import com_standin
+from synthetic import make_sharepoint_export
+
+com_standin.install()
+
+from autoexcel.com_profiler import ComProfiler  # noqa: E402
+from autoexcel.main import (  # noqa: E402
+    create_caseload_analysis_ws,
+    create_fy_analytics_ws,
+    excel_session,
+    format_text_dates,
+    get_frame_years,
+    get_fy_sheet_name,
+    preprocess_data,
+    release_excel_pivot_caches,
+)
+
+
+def build(excel, frames, years):
+    wb = excel.Workbooks.Add(frames)
+    with excel_session(excel):
+        create_fy_analytics_ws(wb, years=years)
+        create_caseload_analysis_ws(wb)
+    release_excel_pivot_caches(wb)
+    wb.Close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--latency", type=float, default=0.0001, help="seconds per round-trip")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--trace", default=os.path.join(tempfile.gettempdir(), "com_trace.json"))
+    args = parser.parse_args()
+
+    df, df_active = preprocess_data(
+        make_sharepoint_export(args.rows), [datetime(2023, 7, 1), None]
+    )
+    # The data sheets as write_output leaves them
+    frames = {
+        get_fy_sheet_name(): format_text_dates(df),
+        "Active Assignments": format_text_dates(df_active),
+    }
+    years = get_frame_years(df, ["FE Date", "Date Assigned"])
+
+    session = com_standin.ComSession(args.latency)
+    start = time.perf_counter()
+    build(session.application(), frames, years)
+    direct = time.perf_counter() - start
+
+    session = com_standin.ComSession(args.latency)
+    profiler = ComProfiler()
+    start = time.perf_counter()
+    with profiler.span("build"):
+        build(profiler.wrap(session.application()), frames, years)
+    profiled = time.perf_counter() - start
+
+    print(f"rows: {args.rows:,}, latency {args.latency * 1e6:.0f} us per round-trip")
+    print(profiler.report(args.top))
+    print(f"trace: {profiler.write_trace(args.trace)} ({len(profiler.events):,} events)")
+    # The stand-in also counts the members its own objects read from each other
+    print(f"recorded calls {profiler.total_calls:,}, stand-in round-trips {session.round_trips:,}")
+    print(f"build {direct:.2f} s direct, {profiled:.2f} s profiled")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,465 @@
+"""
+Recording stand-in for Excel automation, to measure COM builds on any platform.
+
+The objects mimic the parts of the Excel object model autoexcel drives
+(workbooks, worksheets, ranges, pivot caches and tables) and count every
+round-trip a pywin32 early-bound (``gencache``) client makes: one per
+property get, property set or method call. Data sheets are backed by a
+DataFrame, so ``UsedRange`` and ``Cells(...).Value`` see the real data.
+
+    session = ComSession()
+    wb = session.workbook({"Active Assignments": df_active})
+    create_fy_analytics_ws(wb)
+    session.report()
+
+``install()`` registers stand-in ``win32com`` modules when pywin32 is not
+importable, so the Excel constants of ``autoexcel.automation`` resolve on
+Linux.
+"""
+
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from openpyxl.utils import get_column_letter, range_boundaries
+
+# Excel constants used by autoexcel (XlPivotFieldOrientation, XlConsolidationFunction, ...)
+CONSTANTS = {
+    "xlDatabase": 1,
+    "xlHidden": 0,
+    "xlRowField": 1,
+    "xlColumnField": 2,
+    "xlPageField": 3,
+    "xlDataField": 4,
+    "xlSum": -4157,
+    "xlCount": -4112,
+    "xlAverage": -4106,
+    "xlAscending": 1,
+    "xlDescending": 2,
+    "xlCenter": -4108,
+    "xlLeft": -4131,
+    "xlContinuous": 1,
+    "xlThin": 2,
+    "xlThemeColorAccent6": 10,
+    "xlCalculationAutomatic": -4105,
+    "xlCalculationManual": -4135,
+}
+
+
+def install():
+    """Register stand-in ``win32com`` modules if pywin32 is not installed."""
+    try:
+        import win32com.client  # noqa: F401
+    except ImportError:
+        win32com = types.ModuleType("win32com")
+        win32com.__gen_path__ = tempfile.mkdtemp(prefix="gen_py_")
+        client = types.ModuleType("win32com.client")
+        client.constants = types.SimpleNamespace(**CONSTANTS)
+        client.Dispatch = client.DispatchEx = lambda prog_id: ComSession().application()
+        client.gencache = types.SimpleNamespace(EnsureDispatch=client.Dispatch)
+        win32com.client = client
+        sys.modules["win32com"] = win32com
+        sys.modules["win32com.client"] = client
+
+
+class ComError(Exception):
+    """Raised by the objects of an application that has quit, as COM calls to a dead Excel."""
+
+
+class ComSession:
+    """
+    Counts the round-trips made through the stand-in objects of one run.
+
+    Each round-trip takes ``latency`` seconds (busy-waited), the cost of a
+    cross-process call to Excel; 0 by default.
+    """
+
+    def __init__(self, latency=0.0):
+        self.calls = Counter()
+        self.pivot_caches = []
+        self.pivot_tables = []
+        self.quit = False
+        self.latency = latency
+
+    def round_trip(self, name):
+        if self.quit:
+            raise ComError(f"The RPC server is unavailable ({name})")
+        self.calls[name] += 1
+        if self.latency:
+            end = time.perf_counter() + self.latency
+            while time.perf_counter() < end:
+                pass
+
+    @property
+    def round_trips(self):
+        return sum(self.calls.values())
+
+    def application(self):
+        return Application(self)
+
+    def workbook(self, frames=None):
+        """A workbook with a data sheet per ``{name: DataFrame}`` of ``frames``."""
+        return self.application().Workbooks.Add(frames)
+
+    def report(self, top=10):
+        print(f"  pivot tables {len(self.pivot_tables)}, pivot caches {len(self.pivot_caches)}")
+        print(f"  round-trips  {self.round_trips:,}")
+        for name, count in self.calls.most_common(top):
+            print(f"    {count:>10,}  {name}")
+
+
+class ComObject:
+    """
+    Stand-in dispatch object.
+
+    Attributes starting with an upper-case letter are Excel members: reading
+    one (which is also how a method is reached) counts a round-trip, and so
+    does setting one. Members a subclass does not define are generic child
+    objects (``Font``, ``Borders``, ...) or the values set on them.
+    """
+
+    def __init__(self, session, name=None):
+        object.__setattr__(self, "_session", session)
+        object.__setattr__(self, "_name", name or type(self).__name__)
+        object.__setattr__(self, "_members", {})
+
+    def __getattribute__(self, name):
+        if name[:1].isupper():
+            session = object.__getattribute__(self, "_session")
+            session.round_trip(f"{object.__getattribute__(self, '_name')}.{name}")
+        return object.__getattribute__(self, name)
+
+    def __getattr__(self, name):
+        if not name[:1].isupper():
+            raise AttributeError(name)
+        if name not in self._members:
+            self._members[name] = ComObject(self._session, name)
+        return self._members[name]
+
+    def __setattr__(self, name, value):
+        if name[:1].isupper():
+            self._session.round_trip(f"{self._name}.{name}")
+            if isinstance(getattr(type(self), name, None), property):
+                object.__setattr__(self, name, value)
+                return
+            self._members[name] = value
+        else:
+            object.__setattr__(self, name, value)
+
+    def __call__(self, *args, **kwargs):
+        return ComObject(self._session, self._name)
+
+    def __iter__(self):
+        return iter(())
+
+
+class Application(ComObject):
+    def __init__(self, session):
+        super().__init__(session)
+        self._members.update(
+            Workbooks=Workbooks(session, self),
+            Visible=False,
+            ScreenUpdating=True,
+            EnableEvents=True,
+            Calculation=CONSTANTS["xlCalculationAutomatic"],
+        )
+
+    def Quit(self):
+        """Every later call through this application's objects raises ``ComError``."""
+        self._session.quit = True
+
+
+class Workbooks(ComObject):
+    def __init__(self, session, application):
+        super().__init__(session)
+        object.__setattr__(self, "_open", [])
+        self._members["Application"] = application
+
+    def Add(self, frames=None):
+        wb = Workbook(self._session, self.Application, frames)
+        self._open.append(wb)
+        return wb
+
+    def Open(self, Filename=None, *args, **kwargs):
+        return self.Add()
+
+    def __call__(self, index):
+        return self._open[index - 1]
+
+    def __iter__(self):
+        return iter(list(self._open))
+
+    @property
+    def Count(self):
+        return len(self._open)
+
+
+class Workbook(ComObject):
+    def __init__(self, session, application, frames=None):
+        super().__init__(session)
+        self._members["Application"] = application
+        self._members["Sheets"] = self._members["Worksheets"] = Sheets(session, self)
+        for name, df in (frames or {}).items():
+            self._members["Sheets"]._add(name, df)
+
+    def PivotCaches(self):
+        return PivotCaches(self._session, self)
+
+    def Save(self, *args, **kwargs):
+        pass
+
+    def Close(self, *args, **kwargs):
+        self.Application.Workbooks._open.remove(self)
+
+
+class Sheets(ComObject):
+    def __init__(self, session, workbook):
+        super().__init__(session)
+        object.__setattr__(self, "_workbook", workbook)
+        object.__setattr__(self, "_sheets", [])
+
+    def _add(self, name, df=None):
+        ws = Worksheet(self._session, self._workbook, name, df)
+        self._sheets.insert(0, ws)
+        return ws
+
+    def __call__(self, key):
+        if isinstance(key, int):
+            return self._sheets[key - 1]
+        return next(ws for ws in self._sheets if ws._members["Name"] == key)
+
+    def __iter__(self):
+        return iter(list(self._sheets))
+
+    def Add(self, *args, **kwargs):
+        return self._add(f"Sheet{len(self._sheets) + 1}")
+
+    @property
+    def Count(self):
+        return len(self._sheets)
+
+
+class Worksheet(ComObject):
+    def __init__(self, session, workbook, name, df=None):
+        super().__init__(session)
+        object.__setattr__(self, "_df", df)
+        object.__setattr__(self, "_pivot_tables", {})
+        self._members.update(Name=name, Parent=workbook)
+
+    @property
+    def UsedRange(self):
+        if self._df is None:
+            return Range(self._session, self, 1, 1, 1, 1)
+        return Range(self._session, self, 1, 1, len(self._df) + 1, len(self._df.columns))
+
+    def Cells(self, row, col):
+        return Range(self._session, self, row, col, row, col)
+
+    def Range(self, first, last=None):
+        if isinstance(first, str):
+            min_col, min_row, max_col, max_row = range_boundaries(first)
+            return Range(self._session, self, min_row, min_col, max_row, max_col)
+        last = last or first
+        return Range(self._session, self, first._row, first._col, last._last_row, last._last_col)
+
+    def PivotTables(self, name=None):
+        if name is None:
+            return list(self._pivot_tables.values())
+        return self._pivot_tables[name]
+
+    def Select(self):
+        pass
+
+    def Copy(self, *args, **kwargs):
+        pass
+
+
+class Range(ComObject):
+    def __init__(self, session, ws, row, col, last_row, last_col):
+        super().__init__(session)
+        object.__setattr__(self, "_ws", ws)
+        object.__setattr__(self, "_row", row)
+        object.__setattr__(self, "_col", col)
+        object.__setattr__(self, "_last_row", last_row)
+        object.__setattr__(self, "_last_col", last_col)
+        self._members["Worksheet"] = ws
+
+    @property
+    def Address(self):
+        return (
+            f"${get_column_letter(self._col)}${self._row}:"
+            f"${get_column_letter(self._last_col)}${self._last_row}"
+        )
+
+    @property
+    def Row(self):
+        return self._row
+
+    @property
+    def Column(self):
+        return self._col
+
+    @property
+    def Rows(self):
+        return Count(self._session, "Rows", self._last_row - self._row + 1)
+
+    @property
+    def Columns(self):
+        return Count(self._session, "Columns", self._last_col - self._col + 1)
+
+    @property
+    def Value(self):
+        values = self._values()
+        if values.size == 1:
+            return values[0, 0]
+        return tuple(map(tuple, values))
+
+    @Value.setter
+    def Value(self, value):
+        pass
+
+    def _values(self):
+        """The cells of the range as a 2D object array, blanks as None."""
+        values = np.full(
+            (self._last_row - self._row + 1, self._last_col - self._col + 1), None, dtype=object
+        )
+        df = self._ws._df
+        if df is None:
+            return values
+        if values.size == 1 and self._col <= len(df.columns):
+            if self._row == 1:
+                values[0, 0] = df.columns[self._col - 1]
+            elif self._row - 2 < len(df):
+                value = df.iat[self._row - 2, self._col - 1]
+                values[0, 0] = None if pd.isna(value) else value
+            return values
+        cols = slice(self._col - 1, min(self._last_col, len(df.columns)))
+        if self._row == 1:
+            values[0, : cols.stop - cols.start] = df.columns[cols]
+        first = max(self._row, 2)
+        block = df.iloc[first - 2 : self._last_row - 1, cols].to_numpy(dtype=object, copy=True)
+        block[pd.isna(block)] = None
+        values[first - self._row : first - self._row + len(block), : block.shape[1]] = block
+        return values
+
+    def Merge(self):
+        pass
+
+
+class Count(ComObject):
+    def __init__(self, session, name, count):
+        super().__init__(session, name)
+        object.__setattr__(self, "_count", count)
+
+    @property
+    def Count(self):
+        return self._count
+
+    def AutoFit(self):
+        pass
+
+
+class PivotCaches(ComObject):
+    def __init__(self, session, workbook):
+        super().__init__(session)
+        object.__setattr__(self, "_workbook", workbook)
+
+    def Create(self, SourceType=None, SourceData=None, *args, **kwargs):
+        cache = PivotCache(self._session, self._workbook, SourceData)
+        self._session.pivot_caches.append(cache)
+        return cache
+
+
+class PivotCache(ComObject):
+    def __init__(self, session, workbook, source):
+        super().__init__(session)
+        object.__setattr__(self, "_workbook", workbook)
+        object.__setattr__(self, "_source", source)
+
+    def CreatePivotTable(self, TableDestination=None, TableName=None, *args, **kwargs):
+        sheet_name, location = TableDestination.split("!")
+        row, col = (int(n) for n in location[1:].split("C"))
+        ws = self._workbook._members["Sheets"](sheet_name)
+        table = PivotTable(self._session, self, ws, TableName, row, col)
+        ws._pivot_tables[TableName] = table
+        self._session.pivot_tables.append(table)
+        return table
+
+
+class PivotTable(ComObject):
+    def __init__(self, session, cache, ws, name, row, col):
+        super().__init__(session)
+        object.__setattr__(self, "_ws", ws)
+        object.__setattr__(self, "_row", row)
+        object.__setattr__(self, "_col", col)
+        object.__setattr__(self, "_fields", {})
+        self._members.update(Name=name, PivotCache=cache)
+
+    def PivotFields(self, name=None):
+        if name is None:
+            return list(self._fields.values())
+        if name not in self._fields:
+            self._fields[name] = PivotField(self._session, name)
+        return self._fields[name]
+
+    @property
+    def VisibleFields(self):
+        return [field for field in self._fields.values() if field._members.get("Orientation")]
+
+    def AddDataField(self, field, caption=None, function=None):
+        return ComObject(self._session, "DataField")
+
+    def _size(self):
+        rows = [f for f in self._fields.values() if f._members.get("Orientation") == 1]
+        return max(len(rows), 1) + 2, 2
+
+    @property
+    def TableRange1(self):
+        height, width = self._size()
+        row, col = self._row, self._col
+        return Range(self._session, self._ws, row, col, row + height - 1, col + width - 1)
+
+    @property
+    def TableRange2(self):
+        return self.TableRange1
+
+
+class PivotField(ComObject):
+    def __init__(self, session, name):
+        super().__init__(session)
+        self._members["Name"] = name
+
+    def AutoGroup(self):
+        pass
+
+    def AutoSort(self, order, field):
+        pass
+
+    def PivotItems(self, name=None):
+        return ComObject(self._session, "PivotItem")
+
+
+class ExcelServer:
+    """
+    Stand-in automation server for ``autoexcel.excel_pool.ExcelPool``.
+
+    ``start`` returns a new stand-in application after ``startup_seconds``,
+    the cold start of a real Excel; pass it as the pool's ``start``, with
+    ``contextlib.nullcontext`` as its ``apartment``.
+    """
+
+    def __init__(self, startup_seconds=2.0):
+        self.startup_seconds = startup_seconds
+        self.started = 0
+        self.lock = threading.Lock()
+
+    def start(self):
+        time.sleep(self.startup_seconds)
+        with self.lock:
+            self.started += 1
+        return ComSession().application()
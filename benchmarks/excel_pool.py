@@ -0,0 +1,137 @@
+"""
+Report builds on pooled Excel instances against starting Excel per build.
+
+Each job builds the FY analytics and caseload sheets on a workbook of the
+processed synthetic export and closes it, as ``fy_analysis`` does, through
+the recording stand-in of ``com_standin``. Its automation server takes
+``--startup`` seconds to start an instance, as Excel's cold start does, and
+each job waits ``--work`` seconds for the stand-in Excel to build its tables.
+
+Times the jobs run one after another, each starting and quitting its own
+instance, then on an ``ExcelPool`` of each ``--size``: a first batch as the
+pool starts and a second one on the warm pool. Finally checks that the pool
+replaces an instance that quits in the middle of a job and closes a
+workbook a job leaves open before the next job. Works without Excel or
+pywin32.
+
+    python benchmarks/excel_pool.py --jobs 8 --startup 2 --size 1 2 4
+"""
+
+import argparse
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+import com_standin
+from synthetic import make_sharepoint_export
+
+com_standin.install()
+
+from autoexcel.excel_pool import ExcelPool  # noqa: E402
+from autoexcel.main import (  # noqa: E402
+    create_caseload_analysis_ws,
+    create_fy_analytics_ws,
+    excel_session,
+    format_text_dates,
+    get_frame_years,
+    get_fy_sheet_name,
+    preprocess_data,
+    release_excel_pivot_caches,
+)
+
+
+def report_job(frames, years, work_seconds):
+    """A job building the analytics sheets on a new workbook of ``frames``."""
+
+    def build(excel):
+        assert excel.Workbooks.Count == 0, "a workbook of an earlier job is open"
+        wb = excel.Workbooks.Add(frames)
+        try:
+            with excel_session(excel):
+                create_fy_analytics_ws(wb, years=years)
+                create_caseload_analysis_ws(wb)
+                time.sleep(work_seconds)
+            wb.Save()
+        finally:
+            release_excel_pivot_caches(wb)
+        wb.Close()
+
+    return build
+
+
+def crash(excel):
+    excel.Quit()
+    raise com_standin.ComError("Excel stopped responding")
+
+
+def leave_open(excel):
+    excel.Workbooks.Add()
+
+
+def run_batch(pool, job, jobs):
+    start = time.perf_counter()
+    for future in [pool.submit(job) for _ in range(jobs)]:
+        future.result()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--startup", type=float, default=2.0, help="Excel start seconds")
+    parser.add_argument("--work", type=float, default=0.5, help="Excel seconds per job")
+    parser.add_argument("--size", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--max-jobs", type=int, default=20)
+    args = parser.parse_args()
+
+    df, df_active = preprocess_data(
+        make_sharepoint_export(args.rows), [datetime(2023, 7, 1), None]
+    )
+    # The data sheets as write_output leaves them
+    frames = {
+        get_fy_sheet_name(): format_text_dates(df),
+        "Active Assignments": format_text_dates(df_active),
+    }
+    job = report_job(frames, get_frame_years(df, ["FE Date", "Date Assigned"]), args.work)
+    print(
+        f"rows: {args.rows:,}, jobs: {args.jobs}, "
+        f"Excel start: {args.startup:.1f} s, Excel work: {args.work:.1f} s per job"
+    )
+
+    server = com_standin.ExcelServer(args.startup)
+    start = time.perf_counter()
+    for _ in range(args.jobs):
+        excel = server.start()
+        job(excel)
+        excel.Quit()
+    print(f"  Excel per job            {time.perf_counter() - start:7.2f} s")
+
+    for size in args.size:
+        server = com_standin.ExcelServer(args.startup)
+        with ExcelPool(size, args.max_jobs, start=server.start, apartment=nullcontext) as pool:
+            first = run_batch(pool, job, args.jobs)
+            warm = run_batch(pool, job, args.jobs)
+        print(
+            f"  pool of {size}  first {first:7.2f} s, warm {warm:7.2f} s"
+            f"  ({server.started} instances started)"
+        )
+
+    server = com_standin.ExcelServer(0)
+    with ExcelPool(1, args.max_jobs, start=server.start, apartment=nullcontext) as pool:
+        pool.run(job)
+        try:
+            pool.run(crash)
+        except com_standin.ComError as e:
+            print(f"  crashed job raised       {e}")
+        pool.run(job)
+        pool.run(leave_open)
+        pool.run(job)
+    print(
+        f"  after crash and leftover {server.started} instances started, "
+        f"{pool.recycled} recycled"
+    )
+
+
+if __name__ == "__main__":
+    main()
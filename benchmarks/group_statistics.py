@@ -0,0 +1,84 @@
+"""
+Time statistics per group: ``group_statistics`` against pandas groupby.
+
+Computes count, mean, std, min, max, median and p90 of "Time to Assignment"
+and "Time to Execution" by negotiator and by negotiator and agreement type
+over the processed synthetic export, with exact and histogram quantiles,
+and with pandas ``groupby().agg`` plus a ``quantile`` per percentile as a
+separate pandas session would. Each run starts without the item codes
+shared with the pivot tables. Checks the exact results against pandas and
+reports the largest error of the approximate quantiles.
+
+    python benchmarks/group_statistics.py --rows 1000000
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+from synthetic import make_sharepoint_export
+
+from autoexcel.main import preprocess_data
+from autoexcel.pivot import frame_results
+from autoexcel.stats import group_statistics
+
+FIELDS = ["Time to Assignment", "Time to Execution"]
+STATISTICS = ["count", "mean", "std", "min", "max", "median", "p90"]
+GROUPINGS = [["Negotiator"], ["Negotiator", "Agreement Type"]]
+
+
+def pandas_statistics(df, keys):
+    """The same statistics with pandas, blank keys dropped as groupby does."""
+    grouped = df.astype({field: "float64" for field in FIELDS}).groupby(keys)[FIELDS]
+    result = grouped.agg(["count", "mean", "std", "min", "max", "median"])
+    p90 = grouped.quantile(0.9)
+    for field in FIELDS:
+        result[(field, "p90")] = p90[field]
+    return result[[(field, statistic) for field in FIELDS for statistic in STATISTICS]]
+
+
+def timed(function, repeat):
+    """Best time of ``repeat`` runs, each without the field codes of earlier ones."""
+    best = float("inf")
+    for _ in range(repeat):
+        frame_results.clear()
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df, _ = preprocess_data(make_sharepoint_export(args.rows), [datetime(2023, 7, 1), None])
+    print(f"rows: {len(df):,}")
+    for keys in GROUPINGS:
+        exact_seconds, exact = timed(
+            lambda: group_statistics(df, keys, FIELDS, STATISTICS), args.repeat
+        )
+        approximate_seconds, approximate = timed(
+            lambda: group_statistics(df, keys, FIELDS, STATISTICS, approximate=True), args.repeat
+        )
+        pandas_seconds, expected = timed(lambda: pandas_statistics(df, keys), args.repeat)
+
+        expected = expected.reindex(exact.index)
+        assert np.allclose(
+            exact.to_numpy(dtype=float), expected.to_numpy(dtype=float), equal_nan=True
+        ), "exact statistics differ from pandas"
+        quantiles = [(f, s) for f in FIELDS for s in ("median", "p90")]
+        error = (approximate[quantiles] - exact[quantiles]).abs().to_numpy(dtype=float)
+
+        print(f"  by {', '.join(keys)} ({len(exact)} groups)")
+        print(f"    group_statistics  exact {exact_seconds * 1000:8.1f} ms")
+        print(f"    group_statistics  approx {approximate_seconds * 1000:7.1f} ms")
+        print(f"    pandas groupby          {pandas_seconds * 1000:8.1f} ms")
+        print(f"    approx quantile error   {np.nanmax(error):8.3f} days")
+
+
+if __name__ == "__main__":
+    main()
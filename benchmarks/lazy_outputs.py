@@ -0,0 +1,72 @@
+"""
+Headless ``fy_analysis`` runs that produce only some of the outputs.
+
+Writes a synthetic raw export, then runs ``fy_analysis`` headless for each
+set of target outputs, with the ingest cache off so every run parses the
+raw file. Reports the wall time of each run and its plan (see
+``autoexcel.pipeline.plan_outputs``): the raw columns read, the derived
+columns computed and the data sheets written.
+
+    python benchmarks/lazy_outputs.py --rows 50000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from openpyxl import Workbook
+
+from synthetic import write_sharepoint_export
+
+from autoexcel import config
+from autoexcel.main import fy_analysis, get_fy_sheet_name
+from autoexcel.pipeline import plan_outputs
+
+TARGETS = [
+    None,
+    ["fy_analytics", "caseload_analysis"],
+    ["Caseload Analysis"],
+    ["Time_Statistics"],
+    ["Active Assignments"],
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--low-memory", action="store_true")
+    args = parser.parse_args()
+    config.autoexcel_config.ingest_cache.enabled = False
+
+    sheet_names = {"fy": get_fy_sheet_name(), "active": "Active Assignments"}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        raw_dir = os.path.join(tmp_dir, "raw")
+        os.makedirs(raw_dir)
+        write_sharepoint_export(os.path.join(raw_dir, "Raw Data 01-02-2025.xlsx"), args.rows)
+
+        print(f"rows: {args.rows:,}")
+        for outputs in TARGETS:
+            # fy_analysis expects the previous week's workbook
+            processed_dir = tempfile.mkdtemp(dir=tmp_dir)
+            Workbook().save(os.path.join(processed_dir, "Data Analysis 01-01-2025.xlsx"))
+
+            start = time.perf_counter()
+            fy_analysis(
+                raw_dir,
+                processed_dir,
+                headless=True,
+                low_memory=args.low_memory,
+                outputs=outputs,
+            )
+            seconds = time.perf_counter() - start
+
+            plan = plan_outputs(outputs, sheet_names=sheet_names, pivot_sheets=False)
+            print(f"  {', '.join(outputs) if outputs else 'default outputs'}: {seconds:.2f} s")
+            for label, columns in (("raw", plan["usecols"]), ("derived", plan["derived"])):
+                print(f"    {label + ' columns':<16} {'all' if columns is None else columns}")
+            print(f"    data sheets      {list(plan['sheets']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Peak-RSS comparison of the default and low-memory FY analysis data stages.
+
+Each mode runs ``read_data`` -> ``preprocess_data`` -> ``write_output`` in a
+fresh process on the same seeded synthetic export (``synthetic.py``);
+low-memory mode writes with the streaming writer, as
+``fy_analysis(low_memory=True)`` does. For every stage it reports the stage's
+own allocation peak (``tracemalloc``, which also tracks NumPy buffers) and the
+process's peak resident set size so far (cumulative, so it covers that stage
+and everything before it).
+
+    python benchmarks/low_memory.py --rows 100000
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from synthetic import write_sharepoint_export
+
+
+def peak_rss_bytes():
+    """Peak resident set size of the current process."""
+    try:
+        import resource
+    except ImportError:
+        import psutil
+
+        return psutil.Process().memory_info().peak_wset
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_stages(raw_xlsx, output_dir, low_memory, results):
+    from autoexcel.main import preprocess_data, read_data, write_output
+
+    stages = []
+    tracemalloc.start()
+
+    def record(stage, start):
+        _, traced_peak = tracemalloc.get_traced_memory()
+        stages.append((stage, time.perf_counter() - start, traced_peak, peak_rss_bytes()))
+        tracemalloc.reset_peak()
+
+    start = time.perf_counter()
+    df = read_data(raw_xlsx)
+    record("read_data", start)
+
+    start = time.perf_counter()
+    df_processed, df_active = preprocess_data(df, [datetime(2023, 7, 1), None])
+    del df
+    record("preprocess_data", start)
+
+    start = time.perf_counter()
+    write_output(
+        df_processed,
+        df_active,
+        os.path.join(output_dir, f"Data Analysis low_memory={low_memory}.xlsx"),
+        streaming=low_memory,
+    )
+    record("write_output", start)
+
+    results[low_memory] = stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        raw_xlsx = os.path.join(tmp_dir, "Raw Data 01-01-2025.xlsx")
+        write_sharepoint_export(raw_xlsx, args.rows)
+
+        results = ctx.Manager().dict()
+        for low_memory in (False, True):
+            process = ctx.Process(
+                target=run_stages, args=(raw_xlsx, tmp_dir, low_memory, results)
+            )
+            process.start()
+            process.join()
+
+    print(f"rows: {args.rows:,}")
+    for low_memory, stages in sorted(results.items()):
+        print(f"low_memory={low_memory}")
+        for stage, seconds, traced_peak, peak_rss in stages:
+            print(
+                f"  {stage:<16} {seconds:7.1f} s  stage peak {traced_peak / 2**20:7.1f} MiB"
+                f"  process peak RSS {peak_rss / 2**20:7.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
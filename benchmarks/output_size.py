@@ -0,0 +1,83 @@
+"""
+Size and open time of the output workbook, current writer vs compact output.
+
+Writes the processed synthetic export with ``write_output`` once as is and
+once compacted at each compression level, then reports the file size, the
+write time and the time to open the file again with every available reader
+engine.
+
+    python benchmarks/output_size.py --rows 20000 --levels 1 6 9
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from synthetic import make_sharepoint_export
+
+from autoexcel.main import preprocess_data, write_output
+from autoexcel.readers import available_engines
+from autoexcel.writers import compact_workbook
+
+
+def open_time(path, engine):
+    from openpyxl import load_workbook
+
+    start = time.perf_counter()
+    if engine == "openpyxl":
+        load_workbook(path).close()
+    elif engine == "openpyxl_readonly":
+        wb = load_workbook(path, read_only=True)
+        for ws in wb.worksheets:
+            for _ in ws.iter_rows(values_only=True):
+                pass
+        wb.close()
+    else:
+        from python_calamine import CalamineWorkbook
+
+        wb = CalamineWorkbook.from_path(path)
+        for name in wb.sheet_names:
+            wb.get_sheet_by_name(name).to_python()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 6, 9])
+    args = parser.parse_args()
+
+    df, df_active = preprocess_data(
+        make_sharepoint_export(args.rows), [datetime(2023, 7, 1), None]
+    )
+    engines = available_engines()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        current = os.path.join(tmp_dir, "current.xlsx")
+        start = time.perf_counter()
+        write_output(df, df_active, current, compact=False)
+        write_seconds = time.perf_counter() - start
+        results = [("current", os.path.getsize(current), write_seconds, current)]
+
+        for level in args.levels:
+            path = os.path.join(tmp_dir, f"compact-{level}.xlsx")
+            start = time.perf_counter()
+            write_output(df, df_active, path, compact=False)
+            compact_workbook(path, compress_level=level)
+            results.append(
+                (f"compact level {level}", os.path.getsize(path), time.perf_counter() - start, path)
+            )
+
+        print(f"rows: {args.rows:,}")
+        print(f"  {'writer':<16} {'size':>10} {'write':>8}  " + "  ".join(
+            f"{'open ' + engine:>22}" for engine in engines
+        ))
+        for label, size, seconds, path in results:
+            opens = "  ".join(f"{open_time(path, engine):20.2f} s" for engine in engines)
+            print(f"  {label:<16} {size / 2**20:7.2f} MiB {seconds:6.2f} s  {opens}")
+
+
+if __name__ == "__main__":
+    main()
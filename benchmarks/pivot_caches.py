@@ -0,0 +1,101 @@
+"""
+PivotCaches and COM round-trips of the analytics sheets built through Excel.
+
+Runs ``create_fy_analytics_ws`` and ``create_caseload_analysis_ws`` inside
+``excel_session`` with the years and old negotiators prepared from the
+processed frame, as ``fy_analysis`` does, against the recording stand-in
+of ``com_standin`` over the processed synthetic export. Reports the pivot
+tables and caches created, the round-trips (in total and per ``pivot_table``
+call) and the members they went to, and checks that the session restored
+the application settings. Works without Excel or pywin32.
+
+    python benchmarks/pivot_caches.py --rows 2000
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+import com_standin
+from synthetic import make_sharepoint_export
+
+com_standin.install()
+
+import autoexcel.main  # noqa: E402
+from autoexcel.main import (  # noqa: E402
+    create_caseload_analysis_ws,
+    create_fy_analytics_ws,
+    excel_session,
+    format_text_dates,
+    get_frame_years,
+    get_fy_sheet_name,
+    preprocess_data,
+    release_excel_pivot_caches,
+)
+from autoexcel.pivot import present_items  # noqa: E402
+
+
+def count_pivot_table_round_trips(session):
+    """Record the round-trips of each ``pivot_table`` call in ``session.per_table``."""
+    pivot_table = autoexcel.main.pivot_table
+    session.per_table = []
+
+    def counted(*args, **kwargs):
+        before = session.round_trips
+        result = pivot_table(*args, **kwargs)
+        session.per_table.append(session.round_trips - before)
+        return result
+
+    autoexcel.main.pivot_table = counted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--top", type=int, default=10, help="members to list")
+    parser.add_argument(
+        "--old-negotiators",
+        nargs="*",
+        default=["Negotiator 0", "Negotiator 1", "Former Negotiator"],
+        help="negotiators hidden in the pivot tables",
+    )
+    args = parser.parse_args()
+
+    df, df_active = preprocess_data(
+        make_sharepoint_export(args.rows), [datetime(2023, 7, 1), None]
+    )
+    # The data sheets as write_output leaves them
+    frames = {
+        get_fy_sheet_name(): format_text_dates(df),
+        "Active Assignments": format_text_dates(df_active),
+    }
+    session = com_standin.ComSession()
+    wb = session.workbook(frames)
+    excel = wb.Application
+    settings = ("ScreenUpdating", "EnableEvents", "Calculation")
+    before = [getattr(excel, name) for name in settings]
+    count_pivot_table_round_trips(session)
+
+    start = time.perf_counter()
+    years = get_frame_years(df, ["FE Date", "Date Assigned"])
+    old_negotiators = present_items(df["Negotiator"], args.old_negotiators)
+    with excel_session(excel):
+        create_fy_analytics_ws(wb, old_negotiators=old_negotiators, years=years)
+        create_caseload_analysis_ws(wb, old_negotiators=old_negotiators)
+    seconds = time.perf_counter() - start
+    release_excel_pivot_caches(wb)
+    restored = [getattr(excel, name) for name in settings] == before
+
+    print(f"rows: {args.rows:,}")
+    session.report(top=args.top)
+    per_table = session.per_table
+    print(
+        f"  per table    {sum(per_table) / len(per_table):.0f} round-trips on average, "
+        f"{min(per_table)} to {max(per_table)}"
+    )
+    print(f"  settings     {'restored' if restored else 'NOT restored'}")
+    print(f"  client time  {seconds:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
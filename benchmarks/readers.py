@@ -0,0 +1,51 @@
+"""
+Reader engine benchmark for ``read_excel`` on synthetic raw exports.
+
+Times every available engine on each export size, reading all columns and
+reading only ``PIPELINE_COLUMNS``, and reports the fastest engine per size.
+
+    python benchmarks/readers.py --rows 10000 100000 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from synthetic import write_sharepoint_export
+
+from autoexcel.main import PIPELINE_COLUMNS
+from autoexcel.readers import available_engines, read_excel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    engines = available_engines()
+    print(f"engines: {', '.join(engines)}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in args.rows:
+            path = os.path.join(tmp_dir, f"Raw Data {n_rows}.xlsx")
+            write_sharepoint_export(path, n_rows)
+            print(f"\nrows: {n_rows:,}  file: {os.path.getsize(path) / 2**20:.1f} MiB")
+
+            timings = {}
+            for engine in engines:
+                for label, usecols in (("all", None), ("pruned", PIPELINE_COLUMNS)):
+                    best = float("inf")
+                    for _ in range(args.repeat):
+                        start = time.perf_counter()
+                        read_excel(path, engine=engine, usecols=usecols)
+                        best = min(best, time.perf_counter() - start)
+                    timings[engine, label] = best
+                    print(f"  {engine:<18} {label:<7} {best:8.2f} s")
+
+            fastest = min(timings, key=timings.get)
+            print(f"  fastest: {fastest[0]} ({fastest[1]} columns)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Startup time: importing ``autoexcel.main`` and dispatching Excel.
+
+Times ``import autoexcel.main`` in fresh interpreters and reports whether it
+imported win32com. With pywin32 installed (Windows with Excel) it also
+times ``excel_application()`` in fresh interpreters, starting from an empty
+gencache and then from the one the first run left, which later runs reuse.
+``--standin`` registers the recording COM stand-in first (and times it
+with the import), so trees that import win32com at module load can be
+timed without pywin32.
+
+    python benchmarks/startup.py --repeat 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT = """
+import sys, time
+start = time.perf_counter()
+{setup}
+import autoexcel.main
+print(time.perf_counter() - start, "win32com" in sys.modules)
+"""
+
+DISPATCH = """
+import time
+from autoexcel import config
+config.autoexcel_config.automation.gencache_dir = {gencache_dir!r}
+from autoexcel.automation import excel_application
+start = time.perf_counter()
+excel = excel_application()
+print(time.perf_counter() - start)
+excel.Quit()
+"""
+
+
+def run(code):
+    """Output of ``code`` run in a fresh interpreter, as its whitespace-separated fields."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [BENCHMARKS_DIR, os.path.dirname(BENCHMARKS_DIR), env.get("PYTHONPATH", "")]
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True
+    )
+    return result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--standin", action="store_true")
+    args = parser.parse_args()
+
+    setup = "import com_standin; com_standin.install()" if args.standin else ""
+    seconds = []
+    for _ in range(args.repeat):
+        elapsed, win32com_imported = run(IMPORT.format(setup=setup))
+        seconds.append(float(elapsed))
+    print(f"import autoexcel.main  median {statistics.median(seconds) * 1000:7.1f} ms")
+    print(f"  win32com imported    {win32com_imported}")
+
+    try:
+        import win32com  # noqa: F401
+    except ImportError:
+        print("excel_application     skipped, pywin32 is not installed")
+        return
+
+    with tempfile.TemporaryDirectory() as gencache_dir:
+        code = DISPATCH.format(gencache_dir=gencache_dir)
+        (first,) = run(code)
+        later = [float(run(code)[0]) for _ in range(args.repeat)]
+    print(f"excel_application     empty gencache {float(first) * 1000:9.1f} ms")
+    print(f"                      reused, median {statistics.median(later) * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+End-to-end benchmark suite on synthetic SharePoint exports, checked against a stored baseline.
+
+For each size, writes a seeded synthetic export (see ``synthetic``) and
+times the stages of the FY analysis on it, headless:
+
+- ``read_data`` of the export, with the ingest cache off;
+- ``preprocess_data``;
+- ``write_output`` of the data sheets (default writer);
+- ``format_worksheet`` of the FY data sheet, once pandas has written it;
+- ``extract_disjoint_tables`` of the FY analytics and caseload report
+  sheets (built headless, alone in a workbook), and of an Active
+  Assignments sheet of at most ``--extract-rows`` rows.
+
+Each stage reports the best wall time of ``--repeat`` runs and the shape of
+its output. Both are compared with ``baseline.json``: a stage more than
+``--tolerance`` times (and ``--min-seconds``) slower than its baseline, or
+whose output shape changed, is a regression, and the suite exits with
+status 1. ``--save-baseline`` stores the results as the new baseline.
+Timings only compare on the machine the baseline was measured on; it is
+recorded in the file. Needs neither Excel nor Windows.
+
+    python benchmarks/suite.py --sizes 1000 10000 100000 --repeat 3
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+from openpyxl import Workbook
+from synthetic import write_sharepoint_export
+
+from autoexcel import config
+from autoexcel.main import (
+    create_report_ws,
+    format_text_dates,
+    format_worksheet,
+    get_frame_years,
+    preprocess_data,
+    read_data,
+    write_output,
+)
+from autoexcel.utils.dataframe_utils import extract_disjoint_tables
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+REPORTS = ["fy_analytics", "caseload_analysis"]
+ASSIGNED_DATE_FILTER = [datetime(2023, 7, 1), None]
+
+
+def best_of(repeat, function):
+    """Best wall time of ``repeat`` calls of ``function``, and its last result."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return round(best, 4), result
+
+
+def tables_shape(tables):
+    """``[tables, cells]`` of the frames ``extract_disjoint_tables`` returns."""
+    return [len(tables), sum(table.size for table in tables)]
+
+
+def format_data_sheet(df):
+    """Format a sheet pandas wrote from ``df``, and return its ``[rows, columns]``."""
+    writer = pd.ExcelWriter(io.BytesIO(), engine="openpyxl")
+    df.to_excel(writer, index=False, sheet_name="Data")
+    worksheet = writer.sheets["Data"]
+    # Only the formatting is timed; the workbook is never saved
+    start = time.perf_counter()
+    format_worksheet(worksheet, df)
+    return time.perf_counter() - start, [worksheet.max_row, worksheet.max_column]
+
+
+def run_size(n_rows, seed, repeat, extract_rows, work_dir):
+    """
+    Time the stages on an export of ``n_rows``.
+
+    Returns:
+        dict: ``{stage: {"seconds": best wall time, "shape": output shape}}``.
+    """
+    raw_xlsx = os.path.join(work_dir, f"Raw Data {n_rows}.xlsx")
+    if not os.path.exists(raw_xlsx):
+        write_sharepoint_export(raw_xlsx, n_rows, seed)
+    results = {}
+
+    seconds, df = best_of(repeat, lambda: read_data(raw_xlsx, use_cache=False))
+    results["read_data"] = {"seconds": seconds, "shape": list(df.shape)}
+
+    seconds, (df_processed, df_active) = best_of(
+        repeat, lambda: preprocess_data(df, ASSIGNED_DATE_FILTER)
+    )
+    results["preprocess_data"] = {
+        "seconds": seconds,
+        "shape": [list(df_processed.shape), list(df_active.shape)],
+    }
+
+    output = os.path.join(work_dir, f"Data Analysis {n_rows}.xlsx")
+    seconds, _ = best_of(repeat, lambda: write_output(df_processed, df_active, output))
+    results["write_output"] = {"seconds": seconds, "shape": [len(df_processed), len(df_active)]}
+
+    fy_sheet = format_text_dates(df_processed)
+    timings = [format_data_sheet(fy_sheet) for _ in range(repeat)]
+    results["format_worksheet"] = {
+        "seconds": round(min(seconds for seconds, _ in timings), 4),
+        "shape": timings[-1][1],
+    }
+
+    # The report sheets alone: their pivot tables read the frames, not data sheets
+    reports_xlsx = os.path.join(work_dir, f"Reports {n_rows}.xlsx")
+    wb = Workbook()
+    wb.remove(wb.active)
+    frames = {"fy": df_processed, "active": df_active}
+    years = get_frame_years(df_processed, ["FE Date", "Date Assigned"])
+    for name in REPORTS:
+        create_report_ws(wb, name, years=years, date="01-02-2025", frames=frames)
+    wb.save(reports_xlsx)
+
+    def extract_reports():
+        tables = []
+        for name in wb.sheetnames:
+            tables.extend(extract_disjoint_tables(reports_xlsx, sheet_name=name))
+        return tables
+
+    seconds, tables = best_of(repeat, extract_reports)
+    results["extract_disjoint_tables(reports)"] = {
+        "seconds": seconds,
+        "shape": tables_shape(tables),
+    }
+
+    active_xlsx = os.path.join(work_dir, f"Active Assignments {n_rows}.xlsx")
+    active = format_text_dates(df_active.head(extract_rows))
+    active.to_excel(active_xlsx, index=False, sheet_name="Active Assignments")
+    seconds, tables = best_of(
+        repeat, lambda: extract_disjoint_tables(active_xlsx, sheet_name="Active Assignments")
+    )
+    results["extract_disjoint_tables(active)"] = {
+        "seconds": seconds,
+        "shape": tables_shape(tables),
+    }
+    return results
+
+
+def compare(results, baseline, tolerance, min_seconds):
+    """
+    Lines comparing ``results`` with ``baseline``, and the regressions among them.
+
+    Returns:
+        tuple: ``(lines, regressions)``.
+    """
+    lines = [f"{'rows':>9}  {'stage':<34} {'seconds':>9} {'baseline':>9} {'ratio':>6}"]
+    regressions = []
+    for size, stages in results.items():
+        for name, result in stages.items():
+            base = baseline.get(size, {}).get(name)
+            seconds = result["seconds"]
+            if base is None:
+                lines.append(f"{int(size):>9,}  {name:<34} {seconds:9.3f} {'-':>9} {'-':>6}")
+                continue
+            ratio = seconds / base["seconds"] if base["seconds"] else float("inf")
+            flags = []
+            if ratio > tolerance and seconds - base["seconds"] > min_seconds:
+                flags.append("SLOWER")
+            if result["shape"] != base["shape"]:
+                flags.append(f"output {result['shape']} != {base['shape']}")
+            if flags:
+                regressions.append((size, name, flags))
+            lines.append(
+                f"{int(size):>9,}  {name:<34} {seconds:9.3f} {base['seconds']:9.3f} "
+                f"{ratio:6.2f}  {', '.join(flags)}".rstrip()
+            )
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--extract-rows",
+        type=int,
+        default=2_000,
+        help="rows of the Active Assignments sheet extract_disjoint_tables reads",
+    )
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=1.25, help="slowdown ratio allowed")
+    parser.add_argument(
+        "--min-seconds", type=float, default=0.05, help="slowdowns below this are noise"
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--work-dir", help="keep the exports here to reuse them across runs")
+    args = parser.parse_args()
+
+    # Time the stages alone: no stage logging, ingest cache or output compaction
+    config.autoexcel_config.timing.enabled = False
+    config.autoexcel_config.ingest_cache.enabled = False
+    config.autoexcel_config.output.compact = False
+
+    # Sizes in an earlier baseline are kept when others are measured
+    baseline = {"sizes": {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = args.work_dir or tmp_dir
+        os.makedirs(work_dir, exist_ok=True)
+        for n_rows in args.sizes:
+            print(f"{n_rows:,} rows...", file=sys.stderr)
+            results[str(n_rows)] = run_size(
+                n_rows, args.seed, args.repeat, args.extract_rows, work_dir
+            )
+
+    machine = baseline.get("machine")
+    if machine:
+        print(f"baseline: {machine} (python {baseline['python']}, pandas {baseline['pandas']})")
+    lines, regressions = compare(results, baseline["sizes"], args.tolerance, args.min_seconds)
+    print("\n".join(lines))
+
+    if args.save_baseline:
+        baseline = {
+            "machine": f"{platform.system()} {platform.machine()} {platform.processor()}".strip(),
+            "python": sys.version.split()[0],
+            "pandas": pd.__version__,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "extract_rows": args.extract_rows,
+            "sizes": {**baseline["sizes"], **results},
+        }
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"baseline saved to {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} regression(s) against {args.baseline}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
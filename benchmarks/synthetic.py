@@ -0,0 +1,204 @@
+"""
+Seeded synthetic SharePoint "Raw Data" exports, without confidential case data.
+
+``make_sharepoint_export`` reproduces the columns of the export that
+``preprocess_data`` and the reports read, with realistic distributions:
+
+- Negotiator, Sponsor, Department and Agreement Type workloads are skewed
+  (a few take most of the cases), and some cases belong to the COE, NCE
+  and OGC queues that ``preprocess_data`` drops;
+- each case is received at WVU, then at OSP a few days later, and assigned
+  a few weeks after that. Older cases are mostly Completed, Withdrawn or
+  Duplicate, and recent ones are still open;
+- dates are missing (NaT) at realistic rates: unassigned cases have no Date
+  Assigned, FE Date is set for most completed cases plus a few open ones
+  (the SharePoint errors ``preprocess_data`` flags), and few cases have a
+  Deadline Date;
+- High Priority is "Yes" or blank, and Comments are free text of varying
+  length, often blank.
+
+Every column is drawn from one seeded generator, so a size and seed always
+give the same export. It scales from 1k to 1M rows (1M rows in a few
+seconds in memory; writing them to a workbook takes minutes).
+
+    python benchmarks/synthetic.py --rows 100000 --seed 0 "Raw Data 01-02-2025.xlsx"
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+NEGOTIATORS = [f"Negotiator {i}" for i in range(14)] + ["Former Negotiator"]
+EXCLUDED_NEGOTIATORS = ["COE", "NCE", "OGC"]
+AGREEMENT_TYPES = {
+    "NDA": 0.24,
+    "DUA": 0.16,
+    "MTA": 0.14,
+    "SRA": 0.12,
+    "CTA": 0.1,
+    "CDA": 0.08,
+    "Subaward": 0.07,
+    "Amendment": 0.05,
+    "Other": 0.04,
+}
+OPEN_STATUSES = {
+    "Assigned": 0.3,
+    "In Progress": 0.25,
+    "Out for Redline": 0.15,
+    "Out for Signature": 0.12,
+    "Other Internal Department": 0.08,
+    "Initial Review": 0.1,
+}
+COLLEGES = [
+    "Arts and Sciences",
+    "Engineering",
+    "Medicine",
+    "Pharmacy",
+    "Dentistry",
+    "Public Health",
+    "Agriculture",
+    "Business",
+    "Law",
+    "Nursing",
+    "Physical Activity",
+    "Creative Arts",
+]
+COMMENT_WORDS = (
+    "sponsor sent redlines PI requested review budget indemnification clause "
+    "publication rights IP terms awaiting signature countersigned OGC legal "
+    "export control data security amendment extension pending department "
+    "approval revised draft template negotiated confidentiality term "
+    "effective date invoice subrecipient compliance IRB protocol"
+).split()
+
+# Share of cases missing each date, on top of those not reached yet
+MISSING_RECEIVED = 0.03
+MISSING_ASSIGNED = 0.02
+DEADLINE_RATE = 0.15
+HIGH_PRIORITY_RATE = 0.08
+BLANK_COMMENT_RATE = 0.35
+SHAREPOINT_ERROR_RATE = 0.02
+
+
+def zipf_weights(n, exponent=1.1):
+    """Skewed weights of ``n`` items, the first the most likely."""
+    weights = 1 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def choice(rng, items, n_rows, weights=None):
+    """``n_rows`` of ``items`` drawn by ``weights``, as a category-free object array."""
+    items = np.asarray(items, dtype=object)
+    return items[rng.choice(len(items), n_rows, p=weights)]
+
+
+def make_comments(rng, n_rows, pool_size=20_000):
+    """Free-text comments: sentences of 3 to 40 words, drawn from a seeded pool."""
+    lengths = rng.integers(3, 41, pool_size)
+    words = np.asarray(COMMENT_WORDS, dtype=object)[
+        rng.integers(0, len(COMMENT_WORDS), lengths.sum())
+    ]
+    pool = [
+        " ".join(sentence).capitalize() + "."
+        for sentence in np.split(words, np.cumsum(lengths)[:-1])
+    ]
+    comments = choice(rng, pool, n_rows)
+    comments[rng.random(n_rows) < BLANK_COMMENT_RATE] = None
+    return comments
+
+
+def make_sharepoint_export(n_rows, seed=0, start="2022-07-01", end="2025-06-30"):
+    """
+    Synthetic SharePoint "Raw Data" export of ``n_rows`` cases received from ``start`` to ``end``.
+
+    Returns:
+        pd.DataFrame: The export's columns, dates as datetime64 with NaT for
+        missing dates, blanks as None.
+    """
+    rng = np.random.default_rng(seed)
+    start, end = np.datetime64(start, "D"), np.datetime64(end, "D")
+    span = int((end - start) / np.timedelta64(1, "D"))
+    days = lambda values: np.asarray(values).astype("timedelta64[D]")  # noqa: E731
+
+    received_wvu = start + days(rng.integers(0, span + 1, n_rows))
+    received_osp = received_wvu + days(rng.geometric(0.3, n_rows) - 1)
+    assigned = received_osp + days(rng.gamma(1.5, 6, n_rows).round())
+    age = (end - assigned) / np.timedelta64(1, "D")
+
+    # Older cases are closed: completed mostly, some withdrawn or duplicates
+    closed = rng.random(n_rows) < np.clip(age / 240, 0.05, 0.95)
+    status = choice(rng, list(OPEN_STATUSES), n_rows, list(OPEN_STATUSES.values()))
+    closing = choice(rng, ["Completed", "Withdrawn", "Duplicate"], n_rows, [0.88, 0.08, 0.04])
+    status[closed] = closing[closed]
+
+    unassigned = rng.random(n_rows) < MISSING_ASSIGNED
+    status[unassigned] = "Initial Review"
+    assigned = pd.Series(assigned).mask(unassigned)
+
+    executed = assigned + pd.to_timedelta(rng.gamma(2.0, 22, n_rows).round() + 1, unit="D")
+    has_fe_date = (status == "Completed") & (rng.random(n_rows) < 0.97)
+    # SharePoint errors: open cases with an FE Date
+    has_fe_date |= ~closed & ~unassigned & (rng.random(n_rows) < SHAREPOINT_ERROR_RATE)
+    fe_date = executed.where(has_fe_date)
+
+    deadline = assigned + pd.to_timedelta(rng.integers(14, 120, n_rows), unit="D")
+    deadline = deadline.where(rng.random(n_rows) < DEADLINE_RATE)
+
+    missing_received = rng.random(n_rows) < MISSING_RECEIVED
+    received_wvu = pd.Series(received_wvu).mask(missing_received)
+    received_osp = pd.Series(received_osp).mask(missing_received)
+
+    departments = [f"Department {i}" for i in range(60)]
+    department_index = rng.choice(len(departments), n_rows, p=zipf_weights(len(departments)))
+    negotiators = NEGOTIATORS + EXCLUDED_NEGOTIATORS
+    negotiator_weights = np.concatenate(
+        [zipf_weights(len(NEGOTIATORS), 0.6) * 0.97, np.full(len(EXCLUDED_NEGOTIATORS), 0.01)]
+    )
+    high_priority = np.where(rng.random(n_rows) < HIGH_PRIORITY_RATE, "Yes", None)
+
+    return pd.DataFrame(
+        {
+            "#": np.ones(n_rows, dtype=np.int64),
+            "Negotiator": choice(rng, negotiators, n_rows, negotiator_weights),
+            "Status": status,
+            "Agreement Type": choice(
+                rng, list(AGREEMENT_TYPES), n_rows, list(AGREEMENT_TYPES.values())
+            ),
+            "Sponsor": choice(rng, [f"Sponsor {i}" for i in range(500)], n_rows, zipf_weights(500)),
+            "Department": np.asarray(departments, dtype=object)[department_index],
+            "College": np.asarray(COLLEGES, dtype=object)[department_index % len(COLLEGES)],
+            "High Priority": high_priority.astype(object),
+            "Date Received at WVU": received_wvu,
+            "Date Received at OSP": received_osp,
+            "Date Assigned": assigned,
+            "Deadline Date": deadline,
+            "FE Date": fe_date,
+            "Comments": make_comments(rng, n_rows),
+        }
+    )
+
+
+def write_sharepoint_export(path, n_rows, seed=0):
+    """Write a synthetic export to ``path`` (xlsxwriter when installed, it is faster)."""
+    try:
+        import xlsxwriter  # noqa: F401
+
+        engine = "xlsxwriter"
+    except ImportError:
+        engine = "openpyxl"
+    make_sharepoint_export(n_rows, seed).to_excel(path, index=False, engine=engine)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_sharepoint_export(args.path, args.rows, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Reading the years of a date column: per cell, in bulk, or from memory.
+
+``create_fy_analytics_ws`` needs the years of "FE Date" and "Date Assigned"
+of the FY data sheet. Reads them from the recording stand-in of
+``com_standin`` one cell at a time (as it used to), with two bulk
+``Range.Value`` reads (``get_worksheet_years``), and computes them from the
+processed DataFrame (``get_frame_years``, what ``fy_analysis`` does), and
+reports the time and COM round-trips of each.
+
+    python benchmarks/worksheet_years.py --rows 50000
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+import com_standin
+from synthetic import make_sharepoint_export
+
+com_standin.install()
+
+from autoexcel.main import (  # noqa: E402
+    format_text_dates,
+    get_frame_years,
+    get_fy_sheet_name,
+    get_worksheet_years,
+    preprocess_data,
+)
+
+COLUMNS = ["FE Date", "Date Assigned"]
+
+
+def per_cell_years(ws, column_name):
+    """The former cell-by-cell read."""
+    years = set()
+    col = None
+    for c in range(1, ws.UsedRange.Columns.Count + 1):
+        if ws.Cells(1, c).Value == column_name:
+            col = c
+            break
+
+    if col:
+        for row in range(2, ws.UsedRange.Rows.Count + 1):
+            date_val = ws.Cells(row, col).Value
+            if date_val:
+                years.add(str(date_val.year))
+    return years
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    df, _ = preprocess_data(make_sharepoint_export(args.rows), [datetime(2023, 7, 1), None])
+    sheet_name = get_fy_sheet_name()
+    frames = {sheet_name: format_text_dates(df)}
+
+    results = []
+    for label, read in (
+        ("per cell", lambda ws: {name: per_cell_years(ws, name) for name in COLUMNS}),
+        ("bulk", lambda ws: {name: get_worksheet_years(ws, name) for name in COLUMNS}),
+        ("in memory", lambda ws: get_frame_years(df, COLUMNS)),
+    ):
+        session = com_standin.ComSession()
+        ws = session.workbook(frames).Sheets(sheet_name)
+        session.calls.clear()
+        start = time.perf_counter()
+        years = read(ws)
+        results.append((label, time.perf_counter() - start, session.round_trips, years))
+
+    print(f"rows: {len(df):,}")
+    for label, seconds, round_trips, years in results:
+        print(f"  {label:<10} {seconds * 1000:9.1f} ms {round_trips:>9,} round-trips")
+    assert all(years == results[0][3] for *_, years in results), "years differ"
+
+
+if __name__ == "__main__":
+    main()